@@ -0,0 +1,14 @@
+# build_apispec.py
+# Generate the OpenAPI specs once (build/deploy time) for SWAGGER_MODE=static|lazy.
+#   python build_apispec.py                 -> main_server.apispec.json, micro_server.apispec.json
+#   python build_apispec.py micro_server    -> micro_server.apispec.json only
+import importlib
+import sys
+
+import swagger_spec
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or ["main_server", "micro_server"]:
+        mod = importlib.import_module(name)
+        path = swagger_spec.build(mod.app, mod.SWAGGER_TEMPLATE, name)
+        print("Wrote", path, "(+ .gz)")
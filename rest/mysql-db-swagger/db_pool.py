@@ -0,0 +1,138 @@
+# db_pool.py
+# Connection pool with per-connection prepared statements for the hot queries.
+#
+# Connections come from a small pool per database server and go back to it on
+# close(). The session is not reset on the way back (as with mysql.connector's
+# pool_reset_session=False), so a statement prepared on a connection stays
+# prepared for every later request that gets the same connection:
+#
+#   conn = pool.get()
+#   row = conn.query_one("student_by_id", (ID,))   # tuple row or None
+#   conn.execute("student_insert", (ID, name, dept_name, tot_cred)); conn.commit()
+#   conn.close()                                     # back to the pool
+#
+# Each name in STATEMENTS gets one prepared cursor per connection, created on
+# first use. Everything else (cursor(), commit(), ...) passes through to the
+# mysql.connector connection unchanged. Since autocommit is off, even a plain
+# SELECT leaves a transaction open: close() rolls it back so the next user
+# does not inherit it (or its snapshot). Connections idle for longer than
+# RECYCLE_SECS are replaced instead of being pinged on every checkout.
+# max_execution_time is session state too: get() sets it from the calling
+# thread's deadline on every checkout (deadline.bound(); no limit without a
+# deadline), so no connection keeps an earlier request's limit. It is
+# remembered per connection and only sent when the value changes.
+import queue
+import time
+
+import deadline
+
+STATEMENTS = {
+    "student_by_id": "SELECT ID, name, dept_name, tot_cred FROM student WHERE ID=%s",
+    "student_insert": "INSERT INTO student (ID, name, dept_name, tot_cred) VALUES (%s, %s, %s, %s)",
+    "course_by_id": "SELECT course_id, title, dept_name, credits FROM course WHERE course_id=%s",
+    "course_credits": "SELECT COALESCE(credits, 0) FROM course WHERE course_id=%s",
+    "course_insert": "INSERT INTO course (course_id, title, dept_name, credits) VALUES (%s, %s, %s, %s)",
+}
+POOL_SIZE = 32
+RECYCLE_SECS = 300.0
+
+class _Slot:
+    __slots__ = ("raw", "stmts", "idle_since", "max_exec_ms")
+
+    def __init__(self, raw):
+        self.raw, self.stmts, self.idle_since = raw, {}, time.monotonic()
+        self.max_exec_ms = 0
+
+    def discard(self):
+        try:
+            self.raw.close()
+        except Exception:
+            pass
+
+class PooledConnection:
+    """A connection checked out of a ConnectionPool; close() returns it."""
+    def __init__(self, pool, slot):
+        self._pool, self._slot = pool, slot
+
+    def __getattr__(self, name):
+        return getattr(self._slot.raw, name)
+
+    def close(self):
+        slot, self._slot = self._slot, None
+        if slot is not None:
+            self._pool.put(slot)
+
+    def discard(self):
+        """Close the connection for good instead of returning it to the pool."""
+        slot, self._slot = self._slot, None
+        if slot is not None:
+            slot.discard()
+
+    def max_execution_time(self, ms):
+        """SET SESSION max_execution_time (SELECT time limit in ms, 0 = none) unless already set."""
+        ms = int(ms)
+        if self._slot.max_exec_ms != ms:
+            cur = self._slot.raw.cursor()
+            cur.execute("SET SESSION max_execution_time = %s", (ms,))
+            cur.close()
+            self._slot.max_exec_ms = ms
+
+    def _prepared(self, name):
+        cur = self._slot.stmts.get(name)
+        if cur is None:
+            cur = self._slot.stmts[name] = self._slot.raw.cursor(prepared=True)
+        return cur
+
+    def query(self, name, params=()):
+        """All rows (tuples) of prepared statement `name`."""
+        cur = self._prepared(name)
+        cur.execute(STATEMENTS[name], params)
+        return cur.fetchall()
+
+    def query_one(self, name, params=()):
+        rows = self.query(name, params)
+        return rows[0] if rows else None
+
+    def execute(self, name, params=()):
+        """Run prepared statement `name` (no commit); returns the affected row count."""
+        cur = self._prepared(name)
+        cur.execute(STATEMENTS[name], params)
+        return cur.rowcount
+
+class ConnectionPool:
+    def __init__(self, connect, size=POOL_SIZE, recycle=RECYCLE_SECS):
+        """connect() -> new mysql.connector connection. Never blocks: an empty pool
+        opens another connection and a full pool closes the returned one.
+        Checked-out connections are bound to the caller's deadline."""
+        self._connect = connect
+        self.size, self.recycle = int(size), float(recycle)
+        self._idle = queue.LifoQueue(maxsize=self.size)   # most recently used first
+        self.opened = self.reused = 0
+
+    def get(self):
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                self.opened += 1
+                return deadline.bound(PooledConnection(self, _Slot(self._connect())))
+            if time.monotonic() - slot.idle_since <= self.recycle:
+                self.reused += 1
+                return deadline.bound(PooledConnection(self, slot))
+            slot.discard()
+
+    def put(self, slot):
+        try:
+            if slot.raw.in_transaction:
+                slot.raw.rollback()
+        except Exception:   # broken connection or unread result: do not reuse it
+            slot.discard()
+            return
+        slot.idle_since = time.monotonic()
+        try:
+            self._idle.put_nowait(slot)
+        except queue.Full:
+            slot.discard()
+
+    def stats(self):
+        return {"idle": self._idle.qsize(), "opened": self.opened, "reused": self.reused}
@@ -0,0 +1,25 @@
+# http_cache.py
+# Conditional GET support for entity reads.
+#
+# The ETag is a hash of the response body, so it describes the rows this
+# read actually returned, whichever server process, replica, SOAP flavor or
+# tool (bulk_load, reshard) wrote them: a client or caching proxy holding
+# the current ETag gets a 304 without the body. The read itself still runs.
+# No Last-Modified is sent: the rows carry no modification time, and one
+# kept in process would be wrong as soon as anything else writes.
+import hashlib
+from flask import Response, request
+
+ENTITY_CACHE_CONTROL = "no-cache"   # may be stored, must be revalidated
+
+def etag_of(body):
+    return hashlib.sha256(body).hexdigest()[:32]
+
+def conditional(resp):
+    """Tag entity response `resp` with its body's ETag; a 304 instead when the client has it."""
+    etag = etag_of(resp.get_data())
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = ENTITY_CACHE_CONTROL
+    return resp
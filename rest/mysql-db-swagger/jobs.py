@@ -0,0 +1,136 @@
+# jobs.py
+# Background job queue for slow task endpoints (async mode).
+#
+# submit() only validates capacity, records the job and puts it on a bounded
+# queue, so the HTTP request returns 202 right away; a fixed pool of worker
+# threads drains the queue and stores each job's (result, http_status).
+# A full queue rejects the job instead of growing without bound.
+#
+# With a store path the jobs are also kept in a local SQLite table: finished
+# jobs stay queryable after they fall out of memory, and jobs that were
+# queued/running when the process stopped are queued again on start.
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import access_log
+from access_log import log_error
+
+class JobStore:
+    """jobs(id, name, status, payload, result, http_status, created, started, finished) in SQLite."""
+    COLS = ("id", "name", "status", "payload", "result", "http_status", "created", "started", "finished")
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, name TEXT, status TEXT, payload TEXT, "
+            "result TEXT, http_status INTEGER, created REAL, started REAL, finished REAL)"
+        )
+
+    def save(self, job):
+        row = dict(job, payload=json.dumps(job["payload"]), result=json.dumps(job["result"]))
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(self.COLS)}) VALUES ({', '.join('?' * len(self.COLS))})",
+                [row[c] for c in self.COLS],
+            )
+
+    def _to_job(self, row):
+        job = dict(zip(self.COLS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"])
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(self.COLS)} FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def unfinished(self, name):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(self.COLS)} FROM jobs WHERE name=? AND status IN ('queued', 'running') "
+                "ORDER BY created", (name,)).fetchall()
+        return [self._to_job(r) for r in rows]
+
+class JobQueue:
+    def __init__(self, name, fn, workers=4, maxsize=1000, store=None, keep=10000):
+        """fn(payload) -> (result dict, http status); runs on one of `workers` threads."""
+        self.name, self.fn, self.keep = name, fn, keep
+        self.store = JobStore(store) if store else None
+        self._q = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()   # id -> job, oldest first
+        if self.store:
+            for job in self.store.unfinished(name):   # interrupted by a restart
+                job["status"] = "queued"
+                self._track(job)
+                self._q.put(job["id"])                # may exceed maxsize once; only at start-up
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"job-{name}-{i}", daemon=True).start()
+
+    def submit(self, payload):
+        """Queue a job; returns its public view, or None when the queue is full."""
+        job = {"id": uuid.uuid4().hex, "name": self.name, "status": "queued", "payload": payload,
+               "result": None, "http_status": None, "created": time.time(), "started": None, "finished": None}
+        with self._lock:
+            if self._q.full():
+                return None
+            if self.store:
+                self.store.save(job)   # before a worker can pick it up
+            self._track(job)
+            accepted = self.view(job)
+            self._q.put_nowait(job["id"])
+        return accepted
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None and self.store:
+            job = self.store.get(job_id)
+        return self.view(job) if job else None
+
+    @staticmethod
+    def view(job):
+        return {k: job[k] for k in ("id", "status", "result", "http_status", "created", "started", "finished")}
+
+    def depth(self):
+        return self._q.qsize()
+
+    def _track(self, job):
+        self._jobs[job["id"]] = job
+        # forget the oldest finished jobs (the store, if any, still has them)
+        while len(self._jobs) > self.keep:
+            oldest = next(iter(self._jobs.values()))
+            if oldest["status"] not in ("done", "failed"):
+                break
+            self._jobs.popitem(last=False)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get(self._q.get())
+            if job is None:
+                continue
+            job["status"], job["started"] = "running", time.time()
+            if self.store:
+                self.store.save(job)
+            access_log.begin_request(f"job {self.name}")
+            try:
+                job["result"], job["http_status"] = self.fn(job["payload"])
+                job["status"] = "done"
+            except Exception as e:
+                log_error(f"job.{self.name}", e)
+                job["result"], job["http_status"], job["status"] = {"error": str(e)}, 500, "failed"
+            job["finished"] = time.time()
+            access_log.end_request(job["http_status"], job_id=job["id"],
+                                   queued_ms=round((job["started"] - job["created"]) * 1000.0, 3))
+            if self.store:
+                try:
+                    self.store.save(job)
+                except Exception as e:
+                    log_error(f"job.{self.name}.store", e)
@@ -0,0 +1,101 @@
+# json_codec.py
+# Pluggable JSON encoder + negotiated response compression (REST servers).
+#
+#   JSON_ENCODER=auto|orjson|stdlib   auto = orjson when it is installed
+#   COMPRESS_MIN_BYTES=1024           bodies below this are sent as-is; 0 disables
+#
+# Compression prefers brotli (if installed) over gzip, following Accept-Encoding.
+import gzip
+import json
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+# ---------------------------------------------------
+# Encoders: obj -> bytes (same output shape as Flask's default provider)
+# ---------------------------------------------------
+def encode_stdlib(obj):
+    return json.dumps(obj, default=DefaultJSONProvider.default, ensure_ascii=True,
+                      sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def encode_orjson(obj):
+    return orjson.dumps(obj, default=DefaultJSONProvider.default,
+                        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+
+ENCODERS = {"stdlib": encode_stdlib}
+if orjson is not None:
+    ENCODERS["orjson"] = encode_orjson
+
+def get_encoder(name="auto"):
+    if name == "auto":
+        name = "orjson" if orjson is not None else "stdlib"
+    if name not in ENCODERS:
+        raise ValueError(f"JSON encoder {name!r} not available (have: {', '.join(ENCODERS)})")
+    return name, ENCODERS[name]
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that renders jsonify() bodies with a pluggable encoder."""
+    encode = staticmethod(encode_stdlib)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+# ---------------------------------------------------
+# Compression
+# ---------------------------------------------------
+def compress_body(body, accept_encodings):
+    """Return (encoding, data) for the best accepted coding, or (None, body)."""
+    if brotli is not None and accept_encodings.quality("br") > 0:
+        return "br", brotli.compress(body, quality=BROTLI_QUALITY)
+    if accept_encodings.quality("gzip") > 0:
+        return "gzip", gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return None, body
+
+def install(app, encoder="auto", min_bytes=1024):
+    name, fn = get_encoder(encoder)
+    provider = FastJSONProvider(app)
+    provider.encode = fn
+    app.json = provider
+
+    if min_bytes <= 0:
+        return name
+
+    @app.after_request
+    def _compress(resp):
+        if (resp.status_code < 200 or resp.status_code in (204, 304)
+                or resp.direct_passthrough or resp.is_streamed
+                or "Content-Encoding" in resp.headers):
+            return resp
+        body = resp.get_data()
+        if len(body) < min_bytes:
+            return resp
+        resp.vary.add("Accept-Encoding")
+        coding, data = compress_body(body, request.accept_encodings)
+        if coding is None:
+            return resp
+        resp.set_data(data)
+        resp.headers["Content-Encoding"] = coding
+        etag, weak = resp.get_etag()
+        if etag and not weak:
+            resp.set_etag(etag, weak=True)  # representation differs per coding
+        return resp
+
+    return name
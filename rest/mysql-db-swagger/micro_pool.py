@@ -0,0 +1,165 @@
+# micro_pool.py
+# Client-side load balancing across micro server replicas.
+#
+#   MICRO_URLS=http://localhost:8001,http://localhost:8011
+#
+# Each call goes to the healthy replica with the fewest requests in flight
+# (ties rotate). A replica that fails `eject_after` calls in a row is
+# ejected for `eject_secs`, then gets traffic again; with every replica
+# ejected the pool still tries them rather than failing outright.
+#
+# Hedging (idempotent calls only): when the first request has not answered
+# within the pool's recent `hedge_pct` latency percentile, the same call is
+# sent to a second replica and whichever succeeds first wins. A first
+# request that fails before that point is retried on another replica at
+# once. So a single slow or dead replica no longer sets the p99.
+#
+# fn(url, timeout) does the actual request. Hedged calls run on pool
+# threads, so thread-locals of the caller (e.g. its deadline) are not
+# visible there: pass the timeout in.
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 0.05   # seconds, until enough latencies were seen
+HEDGE_MIN_DELAY = 0.002
+
+class Endpoint:
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.outstanding = self.failures = self.calls = self.errors = 0
+        self.down_until = 0.0
+
+    def stats(self):
+        return {"outstanding": self.outstanding, "calls": self.calls, "errors": self.errors,
+                "ejected": self.down_until > time.monotonic()}
+
+def parse_urls(spec):
+    return [u.strip() for u in (spec or "").split(",") if u.strip()]
+
+class MicroPool:
+    def __init__(self, urls, eject_after=3, eject_secs=10.0, hedge=False, hedge_pct=95.0,
+                 window=500, workers=32):
+        self.endpoints = [Endpoint(u) for u in urls]
+        if not self.endpoints:
+            raise ValueError("MicroPool needs at least one micro server URL")
+        self.eject_after, self.eject_secs = int(eject_after), float(eject_secs)
+        self.hedge, self.hedge_pct = bool(hedge), float(hedge_pct)
+        self.hedged = 0
+        self._lock = threading.Lock()
+        self._rr = itertools.count()
+        self._lat = deque(maxlen=window)   # recent successful latencies (seconds)
+        self._exec = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="micro") if hedge else None
+
+    # ---- balancing / health ----
+    def pick(self, exclude=()):
+        now = time.monotonic()
+        with self._lock:
+            eps = [e for e in self.endpoints if e not in exclude] or list(self.endpoints)
+            up = [e for e in eps if e.down_until <= now] or eps
+            start = next(self._rr) % len(up)
+            ep = min(up[start:] + up[:start], key=lambda e: e.outstanding)
+            ep.outstanding += 1
+        return ep
+
+    def _done(self, ep, seconds, ok):
+        with self._lock:
+            ep.outstanding -= 1
+            ep.calls += 1
+            if ok:
+                ep.failures = 0
+                self._lat.append(seconds)
+            else:
+                ep.errors += 1
+                ep.failures += 1
+                if ep.failures >= self.eject_after:
+                    ep.failures = 0
+                    ep.down_until = time.monotonic() + self.eject_secs
+
+    def _attempt(self, ep, fn, timeout):
+        t0 = time.perf_counter()
+        try:
+            out = fn(ep.url, timeout)
+        except BaseException:
+            self._done(ep, 0.0, False)
+            raise
+        self._done(ep, time.perf_counter() - t0, True)
+        return out
+
+    def hedge_delay(self):
+        with self._lock:
+            lat = sorted(self._lat)
+        if len(lat) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        i = min(len(lat) - 1, int(self.hedge_pct / 100.0 * len(lat)))
+        return max(HEDGE_MIN_DELAY, lat[i])
+
+    # ---- calls ----
+    def call(self, fn, timeout, idempotent=False):
+        """fn(url, timeout) on the least-loaded replica; hedged when enabled and idempotent."""
+        if not (self.hedge and idempotent and len(self.endpoints) > 1):
+            return self._attempt(self.pick(), fn, timeout)
+        t_end = time.monotonic() + timeout
+        first = self.pick()
+        pending = {self._exec.submit(self._attempt, first, fn, timeout)}
+        done, pending = wait(pending, timeout=min(self.hedge_delay(), timeout), return_when=FIRST_COMPLETED)
+        for f in done:
+            if f.exception() is None:
+                return f.result()
+        # first one is slow (or already failed): ask a second replica
+        self.hedged += 1
+        second = self.pick(exclude=(first,))
+        pending.add(self._exec.submit(self._attempt, second, fn, max(0.0, t_end - time.monotonic())))
+        error = next((f.exception() for f in done), None)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, t_end - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for f in done:
+                if f.exception() is None:
+                    return f.result()
+                error = f.exception()
+        raise error or TimeoutError("micro call timed out")
+
+    def stats(self):
+        delay = self.hedge_delay() if self.hedge else None
+        with self._lock:
+            return {"endpoints": {e.url: e.stats() for e in self.endpoints}, "hedged": self.hedged,
+                    "hedge_delay_ms": round(delay * 1000.0, 3) if delay is not None else None}
+
+# ---- SOAP flavors ----
+# One zeep Client per replica URL for the whole process (the WSDL is fetched
+# and parsed once, on first use); calls from any thread share it. The
+# operation timeout is per call: it lives in a thread-local of the transport,
+# so concurrent callers with different deadlines do not see each other's.
+_zeep_clients = {}
+_zeep_lock = threading.Lock()
+_call = threading.local()
+
+def _transport_class():
+    from zeep.transports import Transport
+
+    class CallTimeoutTransport(Transport):
+        @property
+        def operation_timeout(self):
+            return getattr(_call, "timeout", None)
+
+        @operation_timeout.setter
+        def operation_timeout(self, value):
+            _call.timeout = value
+    return CallTimeoutTransport
+
+def zeep_service(url, timeout):
+    """zeep service proxy for `url` (shared client); `timeout` applies to this thread's next operation."""
+    client = _zeep_clients.get(url)
+    if client is None:
+        with _zeep_lock:
+            client = _zeep_clients.get(url)
+            if client is None:
+                from zeep import Client
+                client = _zeep_clients[url] = Client(wsdl=f"{url}/?wsdl", transport=_transport_class()(timeout=timeout))
+    _call.timeout = timeout
+    return client.service
@@ -0,0 +1,76 @@
+# prereq_index.py
+# In-memory transitive closure of the prereq(course_id, prereq_id) graph.
+#
+# closure(c) is every course that must be passed before c (direct or
+# indirect), so an eligibility check is a single set difference against the
+# student's passed courses instead of a recursive SQL walk per request.
+# Adding an edge updates the affected closures in place; removing one only
+# recomputes the courses whose closure went through the changed course.
+# NOTE: the index is per process; it sees prereq changes made through this
+# server and is reloaded from the DB on restart.
+import threading
+
+class PrereqCycleError(ValueError):
+    pass
+
+class PrereqIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._direct = {}    # course_id -> set(prereq_id)
+        self._closure = {}   # course_id -> frozenset(all prereq_ids)
+        self.loaded = False
+
+    def load(self, edges):
+        """Rebuild from (course_id, prereq_id) rows."""
+        direct = {}
+        for course_id, prereq_id in edges:
+            direct.setdefault(course_id, set()).add(prereq_id)
+        closure = {}
+        for c in direct:
+            self._compute(c, direct, closure, set())
+        with self._lock:
+            self._direct, self._closure, self.loaded = direct, closure, True
+
+    @staticmethod
+    def _compute(c, direct, closure, visiting):
+        if c in closure:
+            return closure[c]
+        if c in visiting:            # cycle in stored data; do not recurse forever
+            return frozenset()
+        visiting.add(c)
+        out = set()
+        for p in direct.get(c, ()):
+            out.add(p)
+            out |= PrereqIndex._compute(p, direct, closure, visiting)
+        visiting.discard(c)
+        closure[c] = frozenset(out)
+        return closure[c]
+
+    def closure(self, course_id):
+        return self._closure.get(course_id, frozenset())
+
+    def missing(self, course_id, passed):
+        """Prereqs of course_id (transitively) not in the `passed` set."""
+        return self.closure(course_id) - passed
+
+    def check_add(self, course_id, prereq_id):
+        if course_id == prereq_id or course_id in self.closure(prereq_id):
+            raise PrereqCycleError(f"{prereq_id} already requires {course_id}")
+
+    def add(self, course_id, prereq_id):
+        with self._lock:
+            self.check_add(course_id, prereq_id)
+            self._direct.setdefault(course_id, set()).add(prereq_id)
+            gained = self._closure.get(prereq_id, frozenset()) | {prereq_id}
+            affected = [course_id] + [c for c, cl in self._closure.items() if course_id in cl]
+            for c in affected:
+                self._closure[c] = self._closure.get(c, frozenset()) | gained
+
+    def remove(self, course_id, prereq_id):
+        with self._lock:
+            self._direct.get(course_id, set()).discard(prereq_id)
+            affected = {course_id} | {c for c, cl in self._closure.items() if course_id in cl}
+            keep = {c: cl for c, cl in self._closure.items() if c not in affected}
+            for c in affected:
+                self._compute(c, self._direct, keep, set())
+            self._closure = keep
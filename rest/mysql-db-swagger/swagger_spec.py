@@ -0,0 +1,107 @@
+# swagger_spec.py
+# Precomputed OpenAPI spec + lazily mounted Swagger UI.
+#
+#   SWAGGER_MODE=dynamic  flasgger builds the spec from the handler docstrings (default)
+#   SWAGGER_MODE=static   serve <name>.apispec.json built by build_apispec.py as a static,
+#                         ETag-tagged, gzip-compressed file; UI mounted at startup
+#   SWAGGER_MODE=lazy     same as static, but the flasgger UI is only built when
+#                         /apidocs is first hit
+import gzip
+import hashlib
+import os
+import threading
+from flask import Flask, Response, request
+from flasgger import Swagger
+
+SPEC_ROUTE = "/apispec.json"
+UI_PREFIXES = ("/apidocs", "/flasgger_static")
+
+def spec_path(name):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{name}.apispec.json")
+
+def build(app, template, name):
+    """Generate the spec once from the docstrings and write <name>.apispec.json (+ .gz)."""
+    if "flasgger" not in app.blueprints:
+        Swagger(app, template=template)
+    with app.test_client() as c:
+        resp = c.get("/apispec_1.json")
+        body = resp.get_data()
+    if resp.status_code != 200:
+        raise RuntimeError(f"spec generation failed: HTTP {resp.status_code}")
+    path = spec_path(name)
+    with open(path, "wb") as f:
+        f.write(body)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(body, compresslevel=9, mtime=0))
+    return path
+
+def install(app, template, name, mode="dynamic"):
+    """Wire the Swagger spec/UI into `app` according to `mode` (see module comment)."""
+    if mode == "dynamic":
+        return Swagger(app, template=template)
+    path = spec_path(name)
+    if not os.path.exists(path):
+        print(f"{os.path.basename(path)} not found (run: python build_apispec.py); "
+              f"falling back to SWAGGER_MODE=dynamic")
+        return Swagger(app, template=template)
+
+    with open(path, "rb") as f:
+        body = f.read()
+    if os.path.exists(path + ".gz"):
+        with open(path + ".gz", "rb") as f:
+            body_gz = f.read()
+    else:
+        body_gz = gzip.compress(body, compresslevel=9, mtime=0)
+    etag = hashlib.sha256(body).hexdigest()[:32]
+
+    def static_apispec():
+        if request.if_none_match.contains_weak(etag):
+            resp = Response(status=304)
+        elif request.accept_encodings.quality("gzip") > 0:
+            resp = Response(body_gz, mimetype="application/json")
+            resp.headers["Content-Encoding"] = "gzip"
+        else:
+            resp = Response(body, mimetype="application/json")
+        resp.set_etag(etag, weak=True)  # same tag for the gzip and identity bodies
+        resp.headers["Cache-Control"] = "public, max-age=300"
+        resp.vary.add("Accept-Encoding")
+        return resp
+
+    app.add_url_rule(SPEC_ROUTE, "static_apispec", static_apispec, methods=["GET"])
+    app.wsgi_app = DocsMiddleware(app.wsgi_app, template, lazy=(mode == "lazy"))
+    return None
+
+class DocsMiddleware:
+    """
+    Forwards the Swagger UI paths to a small flasgger-only Flask app whose
+    UI points at the static SPEC_ROUTE. The spec itself is never generated
+    by this app. With lazy=True the app is only created on first use.
+    """
+    def __init__(self, wsgi_app, template, lazy=False):
+        self.wsgi_app = wsgi_app
+        self.template = template
+        self._docs = None
+        self._lock = threading.Lock()
+        if not lazy:
+            self._docs = self._build()
+
+    def _build(self):
+        docs = Flask(__name__)
+        config = dict(Swagger.DEFAULT_CONFIG)
+        config["specs"] = [{
+            "endpoint": "apispec",
+            "route": SPEC_ROUTE,
+            "rule_filter": lambda rule: False,
+            "model_filter": lambda tag: False,
+        }]
+        Swagger(docs, template=self.template, config=config)
+        return docs
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO", "").startswith(UI_PREFIXES):
+            if self._docs is None:
+                with self._lock:
+                    if self._docs is None:
+                        self._docs = self._build()
+            return self._docs(environ, start_response)
+        return self.wsgi_app(environ, start_response)
@@ -0,0 +1,119 @@
+# access_log.py
+# Structured (JSON lines) access + error log.
+#
+# Request threads only put a small dict on a bounded in-memory queue; a
+# background writer thread drains it and writes the records in batches.
+# When the queue is full the record is dropped and counted instead of
+# blocking the request (the count is written out as its own record).
+import json
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class AccessLog:
+    def __init__(self, stream=None, maxsize=10000, batch_size=256, flush_interval=0.5):
+        self.stream = stream or sys.stdout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._q = queue.Queue(maxsize=maxsize)
+        self._writer = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+        self._writer.start()
+
+    def emit(self, record):
+        """Queue one record; never blocks the caller."""
+        try:
+            self._q.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1  # racy increment is fine for a counter
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._q.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            dropped = self.dropped
+            if dropped != self._reported_dropped:
+                batch.append({"ts": time.time(), "type": "log_dropped",
+                              "dropped_total": dropped})
+                self._reported_dropped = dropped
+            if not batch:
+                continue
+            try:
+                self.stream.write("".join(json.dumps(r, default=str) + "\n" for r in batch))
+                self.stream.flush()
+            except Exception:
+                pass
+
+
+# ---------------------------------------------------
+# Per-request record (thread-local; Flask and wsgiref both
+# run one request per thread at a time)
+# ---------------------------------------------------
+_log = None
+_local = threading.local()
+
+def configure(path=None, maxsize=10000, batch_size=256):
+    """Start the background writer. path=None (or '-') writes to stdout."""
+    global _log
+    stream = open(path, "a", buffering=1) if path and path != "-" else sys.stdout
+    _log = AccessLog(stream=stream, maxsize=int(maxsize), batch_size=int(batch_size))
+    return _log
+
+def _get_log():
+    return _log or configure()
+
+def begin_request(route):
+    _local.rec = {"route": route, "start": time.perf_counter(), "timings": {}}
+
+def add_timing(kind, seconds):
+    rec = getattr(_local, "rec", None)
+    if rec is not None:
+        rec["timings"][kind] = rec["timings"].get(kind, 0.0) + seconds
+
+@contextmanager
+def timed(kind):
+    """Accumulate the wall time of the block under `kind` (e.g. 'db', 'micro')."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(kind, time.perf_counter() - t0)
+
+def end_request(status, **extra):
+    rec = getattr(_local, "rec", None)
+    if rec is None:
+        return
+    _local.rec = None
+    out = {
+        "ts": time.time(),
+        "type": "access",
+        "route": rec["route"],
+        "status": status,
+        "latency_ms": round((time.perf_counter() - rec["start"]) * 1000.0, 3),
+    }
+    for kind, secs in rec["timings"].items():
+        out[kind + "_ms"] = round(secs * 1000.0, 3)
+    out.update(extra)
+    _get_log().emit(out)
+
+def log_error(where, err):
+    """Replacement for print(where, err) on error paths."""
+    rec = getattr(_local, "rec", None)
+    _get_log().emit({
+        "ts": time.time(),
+        "type": "error",
+        "where": where,
+        "route": rec["route"] if rec else None,
+        "error": str(err),
+    })
@@ -0,0 +1,110 @@
+# admission.py
+# Admission control: per-route concurrency limits with a bounded wait queue.
+#
+# Each route (REST rule or SOAP Service.method) gets its own limiter, so a
+# slow route cannot take the worker threads of the others. A request that
+# finds its route at the limit waits in a short, bounded queue; when the
+# queue is full or the wait runs out it is rejected immediately (503 /
+# SOAP fault with Retry-After) instead of joining an unbounded backlog.
+#
+# Limits adapt to observed latency (AIMD): after every `window` completions
+# the average latency is compared with the route's baseline (the best recent
+# average). Well above it -> the limit is cut multiplicatively; healthy and
+# actually saturated -> it grows by one. Exempt routes (cheap, no I/O) skip
+# all of this.
+import fnmatch
+import threading
+import time
+
+class RouteLimiter:
+    def __init__(self, route, initial, min_limit, max_limit, queue_size, max_wait,
+                 tolerance=2.0, window=20, decrease=0.8):
+        self.route = route
+        self.limit = float(initial)
+        self.min_limit, self.max_limit = min_limit, max_limit
+        self.queue_size, self.max_wait = queue_size, max_wait
+        self.tolerance, self.window, self.decrease = tolerance, window, decrease
+        self.inflight = self.waiting = self.rejected = 0
+        self.baseline = None
+        self._cond = threading.Condition()
+        self._n = 0
+        self._sum = 0.0
+        self._peak = 0
+
+    def acquire(self):
+        """True when admitted (caller must release()); False = reject now."""
+        with self._cond:
+            if self.inflight < int(self.limit):
+                return self._admit()
+            if self.waiting >= self.queue_size:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while self.inflight >= int(self.limit):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self._cond.wait(remaining)
+                return self._admit()
+            finally:
+                self.waiting -= 1
+
+    def _admit(self):
+        self.inflight += 1
+        self._peak = max(self._peak, self.inflight)
+        return True
+
+    def release(self, seconds):
+        with self._cond:
+            self.inflight -= 1
+            self._observe(seconds)
+            self._cond.notify()
+
+    def _observe(self, seconds):
+        self._n += 1
+        self._sum += seconds
+        if self._n < self.window:
+            return
+        avg, peak = self._sum / self._n, self._peak
+        self._n, self._sum, self._peak = 0, 0.0, self.inflight
+        if self.baseline is None or avg < self.baseline:
+            self.baseline = avg
+        else:
+            self.baseline += (avg - self.baseline) * 0.01   # follow lasting workload changes slowly
+        if avg > self.baseline * self.tolerance:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+        elif peak >= int(self.limit):
+            self.limit = min(self.max_limit, self.limit + 1)
+        self._cond.notify_all()   # a raised limit may admit several waiters
+
+    def stats(self):
+        return {"limit": int(self.limit), "inflight": self.inflight, "waiting": self.waiting,
+                "rejected": self.rejected,
+                "baseline_ms": round(self.baseline * 1000.0, 3) if self.baseline is not None else None}
+
+class Admission:
+    def __init__(self, initial=32, min_limit=2, max_limit=256, queue_size=64, max_wait=0.5,
+                 retry_after=1, exempt=()):
+        self.initial, self.min_limit, self.max_limit = int(initial), int(min_limit), int(max_limit)
+        self.queue_size, self.max_wait = int(queue_size), float(max_wait)
+        self.retry_after = int(retry_after)
+        self.exempt_patterns = tuple(exempt)
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def exempt(self, route):
+        return any(fnmatch.fnmatchcase(route, p) for p in self.exempt_patterns)
+
+    def limiter(self, route):
+        lim = self._routes.get(route)
+        if lim is None:
+            with self._lock:
+                lim = self._routes.setdefault(route, RouteLimiter(
+                    route, self.initial, self.min_limit, self.max_limit, self.queue_size, self.max_wait))
+        return lim
+
+    def stats(self):
+        return {route: lim.stats() for route, lim in sorted(self._routes.items())}
@@ -0,0 +1,193 @@
+# api_client.py (REST)
+# Client library for the main and micro REST APIs, for scripts and batch jobs.
+#
+#   api = ApiClient()                                   # localhost:8000 / :8001
+#   res = api.onboard("S9009", "alice smith", "Inf. Sys.", 0, "CS-909")
+#   results = api.onboard_many(rows)                    # same order as rows
+#
+# Every call goes through one requests.Session whose connection pool holds
+# `concurrency` connections, so connections are kept alive and reused. The
+# *_many helpers schedule their calls on an asyncio loop with a semaphore of
+# `concurrency` calls in flight (the blocking calls run on a thread pool of
+# that size): a batch costs about len(rows) / concurrency round trips instead
+# of len(rows). The *_many_async forms can be awaited from a running loop.
+# A failed item does not stop the batch: its slot in the result list holds
+# the exception.
+#
+# Transient failures (connection errors, timeouts, 429/502/503/504) are
+# retried with exponential backoff, or after Retry-After when the server sent
+# one. POSTs carry an Idempotency-Key, the same on every retry, so a retried
+# create or onboarding is not run twice by the server.
+import asyncio
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAIN = "http://localhost:8000"
+MICRO = "http://localhost:8001"
+RETRY_STATUS = (429, 502, 503, 504)
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout)
+TUITION_CHUNK = 10000   # credits per calc_tuition_batch request
+
+class ApiError(Exception):
+    """Non-success answer (after retries); status is the HTTP status code."""
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status, self.body = status, body
+
+class ApiClient:
+    def __init__(self, main=MAIN, micro=MICRO, concurrency=16, timeout=10.0, retries=3, backoff=0.2):
+        self.main, self.micro = main.rstrip("/"), micro.rstrip("/")
+        self.concurrency, self.timeout = int(concurrency), float(timeout)
+        self.retries, self.backoff = int(retries), float(backoff)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._exec = None
+
+    def close(self):
+        if self._exec is not None:
+            self._exec.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- transport ----
+    def _delay(self, attempt, retry_after=None):
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _request(self, method, url, **kw):
+        if method != "GET":
+            kw.setdefault("headers", {})["Idempotency-Key"] = uuid.uuid4().hex
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                resp = self.session.request(method, url, timeout=self.timeout, **kw)
+            except RETRY_ERRORS:
+                if last:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            if resp.status_code in RETRY_STATUS and not last:
+                time.sleep(self._delay(attempt, resp.headers.get("Retry-After")))
+                continue
+            return resp
+
+    def _json(self, resp, ok=(200, 201)):
+        if resp.status_code not in ok:
+            raise ApiError(resp.status_code, resp.text)
+        return resp.json() if resp.content else None
+
+    # ---- entity ----
+    def create_student(self, ID, name, dept_name=None, tot_cred=0):
+        return self._json(self._request("POST", f"{self.main}/entity/students", json={
+            "ID": ID, "name": name, "dept_name": dept_name, "tot_cred": tot_cred}))
+
+    def get_student(self, ID):
+        """Student dict, or None when there is no such student."""
+        resp = self._request("GET", f"{self.main}/entity/students/{ID}")
+        return None if resp.status_code == 404 else self._json(resp)
+
+    def list_students(self, after=None, limit=None):
+        params = {k: v for k, v in (("after", after), ("limit", limit)) if v}
+        return self._json(self._request("GET", f"{self.main}/entity/students", params=params))
+
+    def iter_students(self, page=1000):
+        """Every student, fetched `page` rows at a time (keyset pages)."""
+        after = None
+        while True:
+            rows = self.list_students(after, page)
+            yield from rows
+            if len(rows) < page:
+                return
+            after = rows[-1]["ID"]
+
+    def create_course(self, course_id, title, dept_name=None, credits=0):
+        return self._json(self._request("POST", f"{self.main}/entity/courses", json={
+            "course_id": course_id, "title": title, "dept_name": dept_name, "credits": credits}))
+
+    def get_course(self, course_id):
+        """Course dict, or None when there is no such course."""
+        resp = self._request("GET", f"{self.main}/entity/courses/{course_id}")
+        return None if resp.status_code == 404 else self._json(resp)
+
+    def list_courses(self, dept_name=None, min_credits=None, after=None, limit=None):
+        """One page: {"items": [...], "next_after": course_id or None}."""
+        params = {k: v for k, v in (("dept_name", dept_name), ("min_credits", min_credits),
+                                    ("after", after), ("limit", limit)) if v}
+        return self._json(self._request("GET", f"{self.main}/entity/courses", params=params))
+
+    # ---- task ----
+    def onboard(self, student_id, name, dept_name=None, init_credits=0, course_id=""):
+        """Onboarding result {"success", "normalized_name", "tuition_estimate", "message"};
+        a refused onboarding (bad ID, missing prerequisite, ...) is a result too."""
+        resp = self._request("POST", f"{self.main}/task/onboard_student_into_course", json={
+            "student_id": student_id, "name": name, "dept_name": dept_name,
+            "init_credits": init_credits, "course_id": course_id})
+        try:
+            body = resp.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict) or "success" not in body:
+            raise ApiError(resp.status_code, resp.text)
+        return body
+
+    # ---- policy (micro) ----
+    def max_credits(self):
+        return self._json(self._request("GET", f"{self.micro}/policy/max_credits"))["max_credits"]
+
+    def calc_tuition(self, credits):
+        return self._json(self._request("GET", f"{self.micro}/policy/calc_tuition",
+                                        params={"credits": credits}))["tuition"]
+
+    # ---- bulk ----
+    def _executor(self):
+        if self._exec is None:
+            self._exec = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="api")
+        return self._exec
+
+    async def map_async(self, fn, items):
+        """[fn(item)] with at most `concurrency` calls in flight; exceptions are returned, not raised."""
+        loop = asyncio.get_running_loop()
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(item):
+            async with sem:
+                try:
+                    return await loop.run_in_executor(self._executor(), fn, item)
+                except Exception as e:
+                    return e
+        return await asyncio.gather(*(one(item) for item in items))
+
+    async def onboard_many_async(self, rows):
+        """rows: dicts with the onboard() arguments (student_id, name, dept_name, init_credits, course_id)."""
+        return await self.map_async(lambda row: self.onboard(**row), rows)
+
+    def onboard_many(self, rows):
+        return asyncio.run(self.onboard_many_async(rows))
+
+    async def tuition_many_async(self, credits):
+        """Tuition per credit count, in order (calc_tuition_batch, TUITION_CHUNK values per request)."""
+        credits = list(credits)
+        chunks = [credits[i:i + TUITION_CHUNK] for i in range(0, len(credits), TUITION_CHUNK)]
+        parts = await self.map_async(lambda chunk: self._json(self._request(
+            "POST", f"{self.micro}/policy/calc_tuition_batch", json={"credits": chunk}))["tuition"], chunks)
+        for part in parts:
+            if isinstance(part, Exception):
+                raise part
+        return [t for part in parts for t in part]
+
+    def tuition_many(self, credits):
+        return asyncio.run(self.tuition_many_async(credits))
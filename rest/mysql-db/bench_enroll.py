@@ -0,0 +1,70 @@
+# bench_enroll.py
+# Contention benchmark: many students race for the same section at once.
+# Needs main_server.py running (and data.sql loaded). Creates students
+# E0000..E{n-1} first (existing ones are reused), then fires all enrollments
+# concurrently and reports the seats left as seen by the last enrollment.
+#   python bench_enroll.py --students 2000 --threads 64 --section CS-101 1 Fall 2009
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+MAIN = "http://localhost:8000"
+
+def pct(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(p / 100.0 * len(sorted_vals)))]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--main", default=MAIN)
+    ap.add_argument("--students", type=int, default=2000)
+    ap.add_argument("--threads", type=int, default=64)
+    ap.add_argument("--section", nargs=4, metavar=("COURSE", "SEC", "SEMESTER", "YEAR"),
+                    default=["CS-101", "1", "Fall", "2009"])
+    args = ap.parse_args()
+    course_id, sec_id, semester, year = args.section
+    ids = [f"E{i:04d}" for i in range(args.students)]
+
+    local = threading.local()
+    def session():
+        if not hasattr(local, "s"):
+            local.s = requests.Session()
+        return local.s
+
+    def create(sid):
+        session().post(f"{args.main}/entity/students",
+                       json={"ID": sid, "name": f"Bench {sid}", "dept_name": None, "tot_cred": 0})
+
+    def enroll(sid):
+        t0 = time.perf_counter()
+        r = session().post(f"{args.main}/task/enroll_student_in_section", json={
+            "student_id": sid, "course_id": course_id, "sec_id": sec_id,
+            "semester": semester, "year": int(year)})
+        dt = time.perf_counter() - t0
+        return r.status_code, dt, (r.json().get("seats_left") if r.status_code == 200 else None)
+
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(create, ids))
+        barrier_start = time.perf_counter()
+        results = list(pool.map(enroll, ids))
+        elapsed = time.perf_counter() - barrier_start
+
+    by_status = {}
+    for status, _, _ in results:
+        by_status[status] = by_status.get(status, 0) + 1
+    lat = sorted(dt * 1000.0 for _, dt, _ in results)
+    left = [sl for _, _, sl in results if sl is not None]
+    print(f"section {course_id}-{sec_id} {semester} {year}: {len(results)} attempts, "
+          f"{args.threads} concurrent, {elapsed:.2f}s, {len(results) / elapsed:.0f} req/s")
+    print("status counts:", dict(sorted(by_status.items())),
+          "(200 enrolled, 409 full/already enrolled, 503 gave up after retries)")
+    if left:
+        print(f"enrolled {len(left)}, seats left afterwards: {min(left)}")
+    print(f"latency ms: p50={pct(lat, 50):.1f} p95={pct(lat, 95):.1f} p99={pct(lat, 99):.1f} max={lat[-1]:.1f}")
+
+if __name__ == "__main__":
+    main()
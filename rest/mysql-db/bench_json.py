@@ -0,0 +1,41 @@
+# bench_json.py
+# Microbenchmark: encode time and bytes on the wire for list_students payloads.
+#   python bench_json.py                  (sizes 1000, 10000, 100000)
+#   python bench_json.py 50000 200000
+import gzip
+import sys
+import time
+
+import json_codec
+
+def make_students(n):
+    depts = ["Comp. Sci.", "Physics", "Biology", "History", "Finance", "Music", None]
+    return [{"ID": f"S{i:04d}"[-5:], "name": f"Student Number {i}", "dept_name": depts[i % len(depts)],
+             "tot_cred": i % 130} for i in range(n)]
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def main(sizes):
+    print(f"{'rows':>8} {'encoder':>8} {'encode ms':>10} {'raw KB':>9} "
+          f"{'gzip ms':>8} {'gzip KB':>8} {'br ms':>7} {'br KB':>7}")
+    for n in sizes:
+        rows = make_students(n)
+        for name, fn in json_codec.ENCODERS.items():
+            t_enc, body = best_of(lambda: fn(rows))
+            t_gz, gz = best_of(lambda: gzip.compress(body, compresslevel=json_codec.GZIP_LEVEL), 3)
+            if json_codec.brotli is not None:
+                t_br, br = best_of(lambda: json_codec.brotli.compress(body, quality=json_codec.BROTLI_QUALITY), 3)
+                br_cols = f"{t_br * 1000:7.2f} {len(br) / 1024:7.1f}"
+            else:
+                br_cols = f"{'-':>7} {'-':>7}"
+            print(f"{n:>8} {name:>8} {t_enc * 1000:10.2f} {len(body) / 1024:9.1f} "
+                  f"{t_gz * 1000:8.2f} {len(gz) / 1024:8.1f} {br_cols}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
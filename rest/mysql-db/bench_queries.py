@@ -0,0 +1,106 @@
+# bench_queries.py
+# Per-query latency of the hot statements (db_pool.STATEMENTS), three ways:
+#   connect   new connection + dictionary cursor per call (the old request path;
+#             the time to close the connection is not included)
+#   text      pooled connection, new dictionary cursor, statement sent as text
+#   prepared  pooled connection, conn.query()/execute() on its prepared cursor
+# Needs the database from db.properties (data.sql loaded). The INSERTs run
+# inside a transaction that is rolled back, so nothing is written.
+#   python bench_queries.py                 (2000 calls per statement and mode)
+#   python bench_queries.py --calls 10000
+import argparse
+import time
+
+import mysql.connector
+
+from db_pool import STATEMENTS, ConnectionPool
+
+def load_db_config(filename="db.properties"):
+    cfg = {}
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, value = line.split("=", 1)
+            cfg[key.strip()] = value.strip()
+    return cfg
+
+def pct(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(p / 100.0 * len(sorted_vals)))]
+
+def sample_params(conn, calls):
+    """Parameter tuples per statement, cycling over keys that exist in the database."""
+    cur = conn.cursor()
+    cur.execute("SELECT ID FROM student ORDER BY ID LIMIT 200")
+    students = [r[0] for r in cur.fetchall()]
+    cur.execute("SELECT course_id FROM course ORDER BY course_id LIMIT 200")
+    courses = [r[0] for r in cur.fetchall()]
+    cur.close()
+    conn.rollback()
+    return {
+        "student_by_id": [(students[i % len(students)],) for i in range(calls)],
+        "course_by_id": [(courses[i % len(courses)],) for i in range(calls)],
+        "course_credits": [(courses[i % len(courses)],) for i in range(calls)],
+        "student_insert": [(f"#{i % 10000:04d}", "Bench Student", None, 0) for i in range(calls)],
+        "course_insert": [(f"#B{i % 100000:05d}", "Bench Course", None, 3) for i in range(calls)],
+    }
+
+def run_text(conn, sql, params):
+    cur = conn.cursor(dictionary=True)
+    cur.execute(sql, params)
+    if cur.with_rows:
+        cur.fetchall()
+    cur.close()
+
+def bench(mode, name, params, connect, pool):
+    sql, writes = STATEMENTS[name], not STATEMENTS[name].startswith("SELECT")
+    conn = pool.get()
+    lat = []
+    for p in params:
+        t0 = time.perf_counter()
+        if mode == "connect":
+            c = connect()
+            run_text(c, sql, p)
+        elif mode == "text":
+            run_text(conn, sql, p)
+        elif writes:
+            conn.execute(name, p)
+        else:
+            conn.query(name, p)
+        lat.append(time.perf_counter() - t0)
+        if mode == "connect":
+            c.rollback()
+            c.close()
+        elif writes:
+            conn.rollback()
+    conn.close()
+    return sorted(x * 1e6 for x in lat)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=2000, help="calls per statement and mode")
+    ap.add_argument("--config", default="db.properties")
+    args = ap.parse_args()
+    cfg = load_db_config(args.config)
+
+    def connect():
+        return mysql.connector.connect(host=cfg["DB_HOST"], user=cfg["DB_USER"],
+                                       password=cfg["DB_PASS"], database=cfg["DB_NAME"])
+
+    pool = ConnectionPool(connect, size=1)
+    conn = pool.get()
+    params = sample_params(conn, args.calls)
+    conn.close()
+
+    print(f"{'statement':<16} {'mode':<9} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8} {'mean us':>8}")
+    for name in STATEMENTS:
+        for mode in ("connect", "text", "prepared"):
+            lat = bench(mode, name, params[name], connect, pool)
+            print(f"{name:<16} {mode:<9} {pct(lat, 50):8.0f} {pct(lat, 95):8.0f} "
+                  f"{pct(lat, 99):8.0f} {sum(lat) / len(lat):8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,37 @@
 # client.py (REST client)
-import requests
 import json
-
-MAIN = "http://localhost:8000"
-MICRO = "http://localhost:8001"
+from api_client import ApiClient, ApiError
 
 def pp(title, obj):
     print(f"\n== {title} ==")
     print(json.dumps(obj, indent=2))
 
+api = ApiClient()   # main on http://localhost:8000, micro on http://localhost:8001
+
 # --- SETUP: create a course (Entity) ---
-r = requests.post(f"{MAIN}/entity/courses", json={
-    "course_id": "CS-909",
-    "title": "Intro to Database",
-    "dept_name": "Inf. Sys.",
-    "credits": 3
-})
-pp("SETUP create course CS-909", {"status": r.status_code, "body": r.json() if r.content else None})
+try:
+    pp("SETUP create course CS-909", api.create_course("CS-909", "Intro to Database", "Inf. Sys.", 3))
+except ApiError as e:
+    pp("SETUP create course CS-909", {"status": e.status, "body": e.body})
 
 # --- TASK: onboard a student into a course (business process) ---
-r = requests.post(f"{MAIN}/task/onboard_student_into_course", json={
-    "student_id": "S9009",
-    "name": "  alice smith ",
-    "dept_name": "Inf. Sys.",
-    "init_credits": 0,
-    "course_id": "CS-909"
-})
-res = r.json()
+res = api.onboard("S9009", "  alice smith ", "Inf. Sys.", 0, "CS-909")
 pp("TASK onboard_student_into_course", res)
 
+# --- TASK (bulk): onboard a batch, several requests in flight at once ---
+rows = [{"student_id": f"S90{i}", "name": f"  student {i} ", "dept_name": "Inf. Sys.",
+         "init_credits": 0, "course_id": "CS-909"} for i in range(10, 15)]
+results = api.onboard_many(rows)
+pp("TASK onboard_many", [r if isinstance(r, dict) else {"error": str(r)} for r in results])
+
 # --- POLICY: fixed rules (microservice) ---
-r1 = requests.get(f"{MICRO}/policy/max_credits")
-r2 = requests.get(f"{MICRO}/policy/calc_tuition", params={"credits": 3})
-pp("POLICY max_credits", r1.json())
-pp("POLICY tuition for 3 credits", r2.json())
+pp("POLICY max_credits", {"max_credits": api.max_credits()})
+pp("POLICY tuition for 3 credits", {"tuition": api.calc_tuition(3)})
+pp("POLICY tuition for 3, 4 and 30 credits (batch)", {"tuition": api.tuition_many([3, 4, 30])})
 
 # --- ENTITY: verify data created ---
-r = requests.get(f"{MAIN}/entity/students")
-pp("ENTITY list_students", r.json())
+pp("ENTITY list_students", api.list_students())
+
+pp("ENTITY get_course CS-909", api.get_course("CS-909"))
 
-r = requests.get(f"{MAIN}/entity/courses/CS-909")
-pp("ENTITY get_course CS-909", r.json())
+api.close()
@@ -0,0 +1,94 @@
+# deadline.py
+# End-to-end request deadlines.
+#
+# A request's budget comes from the X-Request-Timeout-Ms header (REST, or the
+# HTTP header on a SOAP call) or the route's default, whichever is shorter.
+# start() records the deadline for the current thread; the servers then
+#   - cap outgoing micro calls at remaining() seconds,
+#   - bound() every DB connection checked out of a pool (db_pool.py does it
+#     on get(), so shard, scatter and group-commit connections are covered
+#     too): SET SESSION max_execution_time to the time left rounded up to
+#     whole seconds (MySQL applies it to SELECTs only), 0 without a deadline,
+#     or DeadlineExceeded when nothing is left. The rounding keeps the value
+#     the same from one request to the next, so the pool rarely re-sends it,
+#   - check expired() between workflow steps and answer 504 instead of
+#     running the rest.
+# Threads without a deadline (job workers, flushers) are never limited;
+# worker threads that act for a request take its deadline with adopt().
+import fnmatch
+import math
+import threading
+import time
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+BOUND_STEP_MS = 1000   # max_execution_time granularity
+
+class DeadlineExceeded(Exception):
+    pass
+
+_local = threading.local()
+
+def parse_ms(value):
+    """Header / config value -> milliseconds (None when absent or not a positive number)."""
+    try:
+        ms = float(value)
+    except (TypeError, ValueError):
+        return None
+    return ms if ms > 0 else None
+
+def start(ms):
+    """Set (or with None, clear) this thread's deadline `ms` milliseconds from now."""
+    _local.at = time.monotonic() + ms / 1000.0 if ms else None
+
+def clear():
+    _local.at = None
+
+def current():
+    """This thread's deadline (for adopt() in a worker thread), or None."""
+    return getattr(_local, "at", None)
+
+def adopt(at):
+    """Run under deadline `at` from current() in another thread (None = no deadline)."""
+    _local.at = at
+
+def remaining():
+    """Seconds left (>= 0), or None without a deadline."""
+    at = getattr(_local, "at", None)
+    return None if at is None else max(0.0, at - time.monotonic())
+
+def expired():
+    left = remaining()
+    return left is not None and left <= 0
+
+def cap(timeout):
+    """`timeout` seconds, shortened to the time left."""
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+def check():
+    if expired():
+        raise DeadlineExceeded("Request deadline exceeded")
+
+def bound(conn):
+    """Limit SELECTs on `conn` (a db_pool connection) to the time left, or lift the
+    limit without a deadline; returns conn."""
+    left = remaining()
+    if left is not None and left <= 0:
+        conn.close()
+        raise DeadlineExceeded("Request deadline exceeded")
+    conn.max_execution_time(0 if left is None else BOUND_STEP_MS * math.ceil(left * 1000 / BOUND_STEP_MS))
+    return conn
+
+class Deadlines:
+    """Per-route default budgets: routes = {fnmatch pattern: ms}, first match wins;
+    patterns without a budget (unset) fall through to default_ms."""
+    def __init__(self, default_ms=None, routes=None):
+        self.default_ms = parse_ms(default_ms)
+        self.routes = [(p, parse_ms(ms)) for p, ms in (routes or {}).items() if parse_ms(ms) is not None]
+
+    def for_route(self, route, header=None):
+        ms = next((ms for p, ms in self.routes if fnmatch.fnmatchcase(route, p)), self.default_ms)
+        asked = parse_ms(header)
+        if asked is not None and (ms is None or asked < ms):
+            ms = asked
+        return ms
@@ -0,0 +1,105 @@
+# group_commit.py
+# Group commit for single-row INSERTs.
+#
+# Callers hand their row to insert() and block until it is committed. A
+# flusher thread collects the rows that arrive within `window` seconds of the
+# first one (or until `max_batch` rows are waiting) and writes them as one
+# multi-row INSERT and one commit, so N concurrent inserts pay for one commit
+# instead of N. If the batch statement fails (e.g. one duplicate key rejects
+# the whole statement), the rows are retried one by one so that every caller
+# gets its own row's outcome: None, or that row's exception raised again.
+# A caller waits no longer than its request deadline (deadline.py): then it
+# gets DeadlineExceeded, and its row is withdrawn if the flusher has not
+# taken it yet (a row already in a batch may still be committed).
+import threading
+import time
+
+import deadline
+
+class _Pending:
+    __slots__ = ("row", "done", "error")
+
+    def __init__(self, row):
+        self.row, self.done, self.error = row, threading.Event(), None
+
+def _rollback(conn):
+    try:
+        conn.rollback()
+    except Exception:
+        pass
+
+class GroupCommit:
+    def __init__(self, name, connect, table, cols, window=0.002, max_batch=100):
+        """connect() -> connection (closed after each batch); window in seconds."""
+        self.connect, self.window, self.max_batch = connect, float(window), int(max_batch)
+        self.sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES "
+        self.values = "(" + ", ".join(["%s"] * len(cols)) + ")"
+        self.batches = self.rows = self.fallbacks = 0
+        self._cond = threading.Condition()
+        self._pending = []
+        threading.Thread(target=self._run, name=f"group-commit-{name}", daemon=True).start()
+
+    def insert(self, row):
+        p = _Pending(tuple(row))
+        with self._cond:
+            self._pending.append(p)
+            if len(self._pending) in (1, self.max_batch):   # opens a window / fills a batch
+                self._cond.notify()
+        if not p.done.wait(deadline.remaining()):
+            with self._cond:
+                if p in self._pending:
+                    self._pending.remove(p)
+            raise deadline.DeadlineExceeded("Request deadline exceeded")
+        if p.error is not None:
+            raise p.error
+
+    def stats(self):
+        return {"batches": self.batches, "rows": self.rows, "fallbacks": self.fallbacks,
+                "rows_per_batch": round(self.rows / self.batches, 2) if self.batches else None}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                until = time.monotonic() + self.window
+                while len(self._pending) < self.max_batch:
+                    remaining = until - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            conn = self.connect(); cur = conn.cursor()
+        except Exception as e:
+            for p in batch:
+                p.error = e
+                p.done.set()
+            return
+        try:
+            cur.execute(self.sql + ", ".join([self.values] * len(batch)), [v for p in batch for v in p.row])
+            conn.commit()
+        except Exception as e:
+            _rollback(conn)
+            if len(batch) == 1:
+                batch[0].error = e
+            else:
+                self.fallbacks += 1
+                for p in batch:
+                    try:
+                        cur.execute(self.sql + self.values, p.row)
+                        conn.commit()
+                    except Exception as e1:
+                        _rollback(conn)
+                        p.error = e1
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+            self.batches += 1
+            self.rows += sum(1 for p in batch if p.error is None)
+            for p in batch:
+                p.done.set()
@@ -1,6 +1,26 @@
 # main_server.py (REST version)
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
+import functools
+import random
+import time
 import mysql.connector
+import access_log
+from access_log import timed, log_error
+from db_router import DBRouter, RYW_COOKIE
+from shards import ShardMap, merge_by_id
+from group_commit import GroupCommit
+from prereq_index import PrereqIndex, PrereqCycleError
+from timetable import TimeSlotIndex, Schedule, fmt_minutes
+from name_index import NameIndex
+import http_cache
+import json_codec
+import arrow_export
+import jobs
+import idempotency
+from idempotency import IdempotencyCache
+import deadline
+from micro_pool import MicroPool, parse_urls
+from admission import Admission
 
 # ---------------------------------------------------
 # Load DB config from external properties file
@@ -17,14 +37,39 @@ def load_db_config(filename="db.properties"):
     return cfg
 
 DB_CONFIG = load_db_config()
+access_log.configure(DB_CONFIG.get("ACCESS_LOG_FILE"), DB_CONFIG.get("ACCESS_LOG_QUEUE", 10000))
+
+DB = DBRouter(DB_CONFIG)
 
 def get_conn():
-    return mysql.connector.connect(
-        host=DB_CONFIG["DB_HOST"],
-        user=DB_CONFIG["DB_USER"],
-        password=DB_CONFIG["DB_PASS"],
-        database=DB_CONFIG["DB_NAME"],
-    )
+    with timed("db"):
+        return DB.connect_primary()
+
+def get_read_conn():
+    """Connection for reads that may lag slightly (replica, unless pinned to the primary)."""
+    with timed("db"):
+        return DB.connect_read()
+
+SHARDS = ShardMap(DB_CONFIG)   # no shards (student stays in DB_NAME) unless DB_SHARDS is set
+
+def get_student_conn(student_id, read=False):
+    """Connection to the database holding student `student_id` (its shard when sharded)."""
+    if not len(SHARDS):
+        return get_read_conn() if read else get_conn()
+    with timed("db"):
+        return SHARDS.connect_for(student_id)
+
+DB_UNAVAILABLE_ERRNOS = (1040, 1205, 1213, 2002, 2003, 2006, 2013, 2055)   # too many connections, lock wait, deadlock, server gone
+
+def db_unavailable(e):
+    """True when `e` means the database could not answer (down, connection lost, busy), not a bad request."""
+    if isinstance(e, (mysql.connector.InterfaceError, mysql.connector.OperationalError)):
+        return True
+    return getattr(e, "errno", None) in DB_UNAVAILABLE_ERRNOS
+
+def error_status(e):
+    """HTTP status for a failed write: 503 (retry later) when the database was unavailable, else 400."""
+    return 503 if db_unavailable(e) else 400
 
 # ---------------------------------------------------
 # Internal utilities (not necessarily exposed)
@@ -37,17 +82,649 @@ def validate_student_id(s: str) -> bool:
     s = (s or "").strip()
     return len(s) == 5 and s[0].isalpha() and s[1:].isdigit()
 
+# ---------------------------------------------------
+# Student directory (see shards.py)
+#   list_students_rows() is one ID-ordered query, or a parallel query per
+#   shard merged by ID when student is sharded; `after`/`limit` page by
+#   keyset so each shard returns at most `limit` rows.
+# ---------------------------------------------------
+STUDENT_PAGE_MAX = 1000
+
+def _fetch_students(conn, after, limit):
+    sql, params = "SELECT ID, name, dept_name, tot_cred FROM student", []
+    if after:
+        sql += " WHERE ID > %s"
+        params.append(after)
+    sql += " ORDER BY ID"
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, tuple(params))
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+def list_students_rows(after=None, limit=None):
+    """[(ID, name, dept_name, tot_cred)] ordered by ID."""
+    limit = min(int(limit), STUDENT_PAGE_MAX) if limit else None
+    if len(SHARDS):
+        with timed("db"):
+            return merge_by_id(SHARDS.scatter(lambda conn: _fetch_students(conn, after, limit)), limit)
+    conn = get_read_conn()
+    try:
+        with timed("db"):
+            return _fetch_students(conn, after, limit)
+    finally:
+        conn.close()
+
+def student_exists(student_id):
+    conn = get_student_conn(student_id, read=True)
+    try:
+        with timed("db"):
+            return conn.query_one("student_by_id", (student_id,)) is not None
+    finally:
+        conn.close()
+
+# ---------------------------------------------------
+# Student inserts (optional group commit, see group_commit.py)
+#   STUDENT_GROUP_COMMIT_MS > 0 merges concurrent inserts into one multi-row
+#   INSERT + commit per window (per shard when sharded); 0 commits each row.
+# ---------------------------------------------------
+STUDENT_GROUP_COMMIT_MS = float(DB_CONFIG.get("STUDENT_GROUP_COMMIT_MS", 0))
+STUDENT_GROUP_COMMIT_MAX = int(DB_CONFIG.get("STUDENT_GROUP_COMMIT_MAX", 100))
+STUDENT_COLS = ("ID", "name", "dept_name", "tot_cred")
+
+def _student_writer(name, connect):
+    return GroupCommit(name, connect, "student", STUDENT_COLS,
+                       STUDENT_GROUP_COMMIT_MS / 1000.0, STUDENT_GROUP_COMMIT_MAX)
+
+if STUDENT_GROUP_COMMIT_MS > 0:
+    STUDENT_WRITERS = ([_student_writer(f"student-{i}", functools.partial(SHARDS.connect, i))
+                        for i in range(len(SHARDS))] or [_student_writer("student", DB.connect_primary)])
+else:
+    STUDENT_WRITERS = []
+
+def insert_student(ID, name, dept_name, tot_cred):
+    """INSERT and commit one student row; raises the row's own error (e.g. duplicate ID)."""
+    row = (ID, name, dept_name if dept_name else None, int(tot_cred or 0))
+    if STUDENT_WRITERS:
+        with timed("db"):
+            STUDENT_WRITERS[SHARDS.index_of(ID) if len(SHARDS) else 0].insert(row)
+        return
+    conn = get_student_conn(ID)
+    try:
+        with timed("db"):
+            conn.execute("student_insert", row)
+            conn.commit()
+    finally:
+        conn.close()
+
+# ---------------------------------------------------
+# Course catalog listing (keyset pagination)
+#   Filters map onto course(dept_name, course_id, credits), so a dept filter
+#   is an index range already ordered by course_id and the lean projections
+#   (any subset of course_id/dept_name/credits) are answered from the index.
+# ---------------------------------------------------
+COURSE_FIELDS = ("course_id", "title", "dept_name", "credits")
+COURSE_PAGE_DEFAULT = 50
+COURSE_PAGE_MAX = 500
+
+def list_courses_page(dept_name=None, min_credits=None, after=None, limit=COURSE_PAGE_DEFAULT, fields=COURSE_FIELDS):
+    """Returns (rows, next_after); next_after is None on the last page."""
+    cols = ["course_id"] + [f for f in COURSE_FIELDS[1:] if f in fields]
+    limit = max(1, min(int(limit or COURSE_PAGE_DEFAULT), COURSE_PAGE_MAX))
+    where, params = [], []
+    if dept_name:
+        where.append("dept_name=%s"); params.append(dept_name)
+    if min_credits:
+        where.append("credits>=%s"); params.append(int(min_credits))
+    if after:
+        where.append("course_id>%s"); params.append(after)
+    sql = "SELECT " + ", ".join(cols) + " FROM course"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY course_id LIMIT %s"
+    params.append(limit + 1)
+    try:
+        conn = get_read_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(sql, tuple(params))
+            raw = cur.fetchall()
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+    rows = []
+    for r in raw[:limit]:
+        row = dict(zip(cols, r))
+        if "credits" in row:
+            row["credits"] = int(row["credits"] or 0)
+        rows.append(row)
+    next_after = rows[-1]["course_id"] if len(raw) > limit else None
+    return rows, next_after
+
+# ---------------------------------------------------
+# Prerequisite checks
+#   PREREQS holds the transitive closure of prereq (see prereq_index.py),
+#   loaded on first use and kept current by the prereq entity endpoints.
+# ---------------------------------------------------
+PREREQS = PrereqIndex()
+
+def prereq_index():
+    if not PREREQS.loaded:
+        try:
+            conn = get_conn(); cur = conn.cursor()
+            with timed("db"):
+                cur.execute("SELECT course_id, prereq_id FROM prereq")
+                PREREQS.load(cur.fetchall())
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+    return PREREQS
+
+def passed_courses(student_id):
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(
+                "SELECT DISTINCT course_id FROM takes WHERE ID=%s AND grade IS NOT NULL AND grade <> 'F'",
+                (student_id,),
+            )
+            return {r[0] for r in cur.fetchall()}
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+def missing_prereqs(student_id, course_id):
+    """Prereqs of course_id (transitively) the student has not passed; empty if eligible."""
+    required = prereq_index().closure(course_id)
+    if not required:
+        return set()
+    return required - passed_courses(student_id)
+
+# ---------------------------------------------------
+# Timetable conflicts
+#   TIMESLOTS indexes time_slot per day (see timetable.py); it is loaded on
+#   first use and updated by the time-slot entity endpoint.
+# ---------------------------------------------------
+TIMESLOTS = TimeSlotIndex()
+
+def timeslot_index():
+    if not TIMESLOTS.loaded:
+        try:
+            conn = get_conn(); cur = conn.cursor()
+            with timed("db"):
+                cur.execute("SELECT time_slot_id, day, start_time, end_time FROM time_slot")
+                TIMESLOTS.load(cur.fetchall())
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+    return TIMESLOTS
+
+def term_schedule(student_id, semester, year):
+    """Schedule of the sections the student takes in one term."""
+    index = timeslot_index()
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(
+                "SELECT t.course_id, t.sec_id, s.time_slot_id FROM takes t "
+                "JOIN section s ON s.course_id=t.course_id AND s.sec_id=t.sec_id "
+                "AND s.semester=t.semester AND s.year=t.year "
+                "WHERE t.ID=%s AND t.semester=%s AND t.year=%s",
+                (student_id, semester, int(year)),
+            )
+            rows = cur.fetchall()
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+    return Schedule(index, [(f"{c}-{sec}", slot) for c, sec, slot in rows if slot])
+
+def section_time_slot(course_id, sec_id, semester, year):
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute("SELECT time_slot_id FROM section WHERE " + SECTION_KEY,
+                        (course_id, sec_id, semester, int(year)))
+            row = cur.fetchone()
+        return row[0] if row else None
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+def schedule_clashes(student_id, course_id, sec_id, semester, year):
+    """Sections the student already takes that clash with the given section."""
+    slot_id = section_time_slot(course_id, sec_id, semester, year)
+    if not slot_id:
+        return []
+    return term_schedule(student_id, semester, year).conflicts_with(timeslot_index(), slot_id)
+
+def list_schedule_conflicts(student_id, semester, year):
+    return [{"day": day, "section_a": a, "section_b": b, "start": fmt_minutes(start), "end": fmt_minutes(end)}
+            for day, a, b, start, end in term_schedule(student_id, semester, year).all_conflicts()]
+
+# ---------------------------------------------------
+# Seat allocation for section enrollment
+#   section_seats(course_id, sec_id, semester, year, capacity, taken) keeps a
+#   per-section counter, so taking a seat is one conditional UPDATE of one row
+#   in a short transaction with the takes INSERT (no table locks, no COUNT(*)).
+#   Lock-wait timeouts / deadlocks on a hot section are retried with jittered
+#   backoff. Sections without a counter row get one seeded from classroom.capacity.
+# ---------------------------------------------------
+ENROLL_RETRIES = 5
+RETRYABLE_ERRNOS = (1205, 1213)   # lock wait timeout, deadlock
+SECTION_KEY = "course_id=%s AND sec_id=%s AND semester=%s AND year=%s"
+
+def _seed_seat_row(cur, key):
+    cur.execute(
+        "INSERT IGNORE INTO section_seats (course_id, sec_id, semester, year, capacity, taken) "
+        "SELECT s.course_id, s.sec_id, s.semester, s.year, COALESCE(c.capacity, 0), "
+        "(SELECT COUNT(*) FROM takes t WHERE t.course_id=s.course_id AND t.sec_id=s.sec_id "
+        "AND t.semester=s.semester AND t.year=s.year) "
+        "FROM section s LEFT JOIN classroom c ON c.building=s.building AND c.room_number=s.room_number "
+        "WHERE s.course_id=%s AND s.sec_id=%s AND s.semester=%s AND s.year=%s",
+        key,
+    )
+
+def enroll_in_section(student_id, course_id, sec_id, semester, year):
+    """Take a seat and write the takes row. Returns (status, message, seats_left)."""
+    key = (course_id, sec_id, semester, int(year))
+    try:
+        missing = missing_prereqs(student_id, course_id)
+    except Exception as e:
+        log_error("enroll_in_section.prereqs", e)
+        return error_status(e), str(e), 0
+    if missing:
+        return 409, "Missing prerequisites: " + ", ".join(sorted(missing)), 0
+    try:
+        clashes = schedule_clashes(student_id, course_id, sec_id, semester, year)
+    except Exception as e:
+        log_error("enroll_in_section.timetable", e)
+        return error_status(e), str(e), 0
+    if clashes:
+        return 409, "Schedule conflict with " + ", ".join(clashes), 0
+    if len(SHARDS) and not student_exists(student_id):   # no takes -> student FK across shards
+        return 404, "Student not found", 0
+    for attempt in range(ENROLL_RETRIES):
+        if deadline.expired():
+            return 504, "Request deadline exceeded", 0
+        conn = cur = None
+        try:
+            conn = get_conn(); cur = conn.cursor(buffered=True)
+            with timed("db"):
+                cur.execute("UPDATE section_seats SET taken = taken + 1 WHERE " + SECTION_KEY
+                            + " AND taken < capacity", key)
+                if cur.rowcount == 0:
+                    conn.rollback()
+                    cur.execute("SELECT capacity - taken FROM section_seats WHERE " + SECTION_KEY, key)
+                    if cur.fetchone() is not None:
+                        return 409, "Section is full", 0
+                    _seed_seat_row(cur, key)
+                    conn.commit()
+                    cur.execute("SELECT 1 FROM section_seats WHERE " + SECTION_KEY, key)
+                    if cur.fetchone() is None:
+                        return 404, "Section not found", 0
+                    continue
+                cur.execute(
+                    "INSERT INTO takes (ID, course_id, sec_id, semester, year, grade) "
+                    "VALUES (%s, %s, %s, %s, %s, NULL)",
+                    (student_id,) + key,
+                )
+                credits = int(conn.query_one("course_credits", (course_id,))[0])
+                cur.execute(SUMMARY_UPSERT, (student_id, credits, 0, 0))
+                cur.execute("SELECT capacity - taken FROM section_seats WHERE " + SECTION_KEY, key)
+                seats_left = int(cur.fetchone()[0])
+                conn.commit()
+            return 200, f"Student {student_id} enrolled in {course_id}-{sec_id} ({semester} {year}).", seats_left
+        except mysql.connector.Error as e:
+            try: conn.rollback()
+            except: pass
+            if e.errno in RETRYABLE_ERRNOS and attempt < ENROLL_RETRIES - 1:
+                time.sleep(random.uniform(0, 0.002 * (2 ** attempt)))
+                continue
+            if e.errno == 1062:
+                return 409, "Student already enrolled in this section", 0
+            if e.errno == 1452:
+                return 404, "Student not found", 0
+            log_error("enroll_in_section", e)
+            return error_status(e), str(e), 0
+        except Exception as e:
+            log_error("enroll_in_section", e)
+            return error_status(e), str(e), 0
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+    return 503, "Section is busy, retry later", 0
+
+# ---------------------------------------------------
+# Credit / GPA aggregates
+#   student_summary(ID, enrolled_cred, graded_cred, grade_points) and
+#   student.tot_cred are adjusted in the same transaction that writes takes
+#   (enrollment, grading), so reading a student's totals is one PK lookup
+#   instead of aggregating takes JOIN course.
+# ---------------------------------------------------
+GRADE_POINTS = {"A+": 4.0, "A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "B-": 2.7,
+                "C+": 2.3, "C": 2.0, "C-": 1.7, "D+": 1.3, "D": 1.0, "F": 0.0}
+
+SUMMARY_UPSERT = (
+    "INSERT INTO student_summary (ID, enrolled_cred, graded_cred, grade_points) VALUES (%s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE enrolled_cred = enrolled_cred + VALUES(enrolled_cred), "
+    "graded_cred = graded_cred + VALUES(graded_cred), grade_points = grade_points + VALUES(grade_points)"
+)
+
+TOT_CRED_UPDATE = "UPDATE student SET tot_cred = GREATEST(COALESCE(tot_cred, 0) + %s, 0) WHERE ID=%s"
+
+def _adjust_tot_cred_on_shard(student_id, delta):
+    conn = get_student_conn(student_id)
+    try:
+        cur = conn.cursor()
+        with timed("db"):
+            cur.execute(TOT_CRED_UPDATE, (delta, student_id))
+            conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+def _grade_contribution(grade, credits):
+    """(graded_cred, grade_points, earned_cred) that one takes row adds to the aggregates."""
+    if grade in GRADE_POINTS:
+        graded, points = credits, GRADE_POINTS[grade] * credits
+    else:
+        graded, points = 0, 0.0
+    earned = credits if grade and grade != "F" else 0
+    return graded, points, earned
+
+def gpa(graded_cred, grade_points):
+    return round(float(grade_points) / graded_cred, 2) if graded_cred else 0.0
+
+def set_grade(student_id, course_id, sec_id, semester, year, grade):
+    """Write a takes.grade and apply the delta to the aggregates. Returns (status, message)."""
+    grade = (grade or "").strip().upper() or None
+    if grade is not None and grade not in GRADE_POINTS:
+        return 400, f"Invalid grade {grade!r}"
+    key = (student_id, course_id, sec_id, semester, int(year))
+    try:
+        conn = get_conn(); cur = conn.cursor(buffered=True)
+        with timed("db"):
+            cur.execute("SELECT grade FROM takes WHERE ID=%s AND " + SECTION_KEY + " FOR UPDATE", key)
+            row = cur.fetchone()
+            if row is None:
+                conn.rollback()
+                return 404, "Enrollment not found"
+            old = row[0]
+            credits = int(conn.query_one("course_credits", (course_id,))[0])
+            old_g, old_p, old_e = _grade_contribution(old, credits)
+            new_g, new_p, new_e = _grade_contribution(grade, credits)
+            cur.execute("UPDATE takes SET grade=%s WHERE ID=%s AND " + SECTION_KEY, (grade,) + key)
+            cur.execute(SUMMARY_UPSERT, (student_id, 0, new_g - old_g, new_p - old_p))
+            if new_e != old_e and not len(SHARDS):
+                cur.execute(TOT_CRED_UPDATE, (new_e - old_e, student_id))
+            conn.commit()
+        if new_e != old_e and len(SHARDS):
+            # student is on its shard: applied after the main commit (not atomic with it)
+            _adjust_tot_cred_on_shard(student_id, new_e - old_e)
+        return 200, f"Grade for {student_id} in {course_id}-{sec_id} set to {grade or 'none'}."
+    except Exception as e:
+        log_error("set_grade", e)
+        try: conn.rollback()
+        except: pass
+        return 400, str(e)
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+def credit_summary(student_id):
+    """Totals for one student from the maintained aggregates, or None if unknown."""
+    if len(SHARDS):
+        return _credit_summary_sharded(student_id)
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(
+                "SELECT s.tot_cred, ss.enrolled_cred, ss.graded_cred, ss.grade_points "
+                "FROM student s LEFT JOIN student_summary ss ON ss.ID = s.ID WHERE s.ID=%s",
+                (student_id,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+        tot_cred, enrolled, graded, points = (int(row[0] or 0), int(row[1] or 0), int(row[2] or 0), float(row[3] or 0))
+        return {"ID": student_id, "tot_cred": tot_cred, "enrolled_cred": enrolled,
+                "graded_cred": graded, "gpa": gpa(graded, points)}
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+def _credit_summary_sharded(student_id):
+    conn = get_student_conn(student_id, read=True)
+    try:
+        cur = conn.cursor()
+        with timed("db"):
+            cur.execute("SELECT tot_cred FROM student WHERE ID=%s", (student_id,))
+            row = cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute("SELECT enrolled_cred, graded_cred, grade_points FROM student_summary WHERE ID=%s",
+                        (student_id,))
+            summary = cur.fetchone() or (0, 0, 0)
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+    enrolled, graded, points = int(summary[0] or 0), int(summary[1] or 0), float(summary[2] or 0)
+    return {"ID": student_id, "tot_cred": int(row[0] or 0), "enrolled_cred": enrolled,
+            "graded_cred": graded, "gpa": gpa(graded, points)}
+
+def transcript_rows(student_id):
+    """The student's takes rows with course title/credits, oldest first."""
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(
+                "SELECT t.course_id, c.title, t.sec_id, t.semester, t.year, t.grade, c.credits "
+                "FROM takes t JOIN course c ON c.course_id = t.course_id WHERE t.ID=%s "
+                "ORDER BY t.year, FIELD(t.semester, 'Spring', 'Summer', 'Fall'), t.course_id",
+                (student_id,),
+            )
+            rows = cur.fetchall()
+        return [{"course_id": r[0], "title": r[1], "sec_id": r[2], "semester": r[3], "year": int(r[4]),
+                 "grade": r[5], "credits": int(r[6] or 0)} for r in rows]
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+# ---------------------------------------------------
+# Student name search
+#   NAMES indexes normalized student names for prefix and fuzzy lookup (see
+#   name_index.py); it is loaded on first use and updated by the student
+#   create paths, so a search never scans student with LIKE '%...%'.
+# ---------------------------------------------------
+NAME_SEARCH_MODES = ("auto", "prefix", "fuzzy")
+NAME_SEARCH_MAX = 100
+NAMES = NameIndex()
+
+def _fetch_names(conn):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT ID, name FROM student")
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+def name_index():
+    if not NAMES.loaded:
+        if len(SHARDS):
+            with timed("db"):
+                rows = [r for part in SHARDS.scatter(_fetch_names) for r in part]
+        else:
+            conn = get_conn()
+            try:
+                with timed("db"):
+                    rows = _fetch_names(conn)
+            finally:
+                conn.close()
+        NAMES.load((ID, normalize_name(name)) for ID, name in rows)
+    return NAMES
+
+def index_student_name(ID, name):
+    """Call after the student row is committed. Always added, even before the index is
+    loaded: load() keeps added names, so a row committed after its SELECT is not lost."""
+    NAMES.add(ID, normalize_name(name))
+
+def search_student_names(q, mode="auto", limit=10):
+    """[{"ID", "name", "score"}]: prefix hits score 1.0, fuzzy ones their trigram similarity."""
+    if mode not in NAME_SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(NAME_SEARCH_MODES)}")
+    limit = max(1, min(int(limit or 10), NAME_SEARCH_MAX))
+    return name_index().search(q or "", limit, mode)
+
 # ---------------------------------------------------
 # Flask app
 # ---------------------------------------------------
 app = Flask(__name__)
 
+json_codec.install(app, DB_CONFIG.get("JSON_ENCODER", "auto"), int(DB_CONFIG.get("COMPRESS_MIN_BYTES", 1024)))
+
+@app.before_request
+def _access_begin():
+    rule = request.url_rule.rule if request.url_rule else request.path
+    access_log.begin_request(f"{request.method} {rule}")
+
+@app.after_request
+def _access_end(resp):
+    access_log.end_request(resp.status_code)
+    return resp
+
+# ---------------------------------------------------
+# Request deadlines (see deadline.py)
+#   X-Request-Timeout-Ms or the route default, whichever is shorter. A
+#   request that fails (400/500) after its deadline passed is answered 504.
+# ---------------------------------------------------
+DEADLINES = deadline.Deadlines(DB_CONFIG.get("DEADLINE_MS"), {
+    "/task/*": DB_CONFIG.get("DEADLINE_TASK_MS"),
+    "/entity/*": DB_CONFIG.get("DEADLINE_ENTITY_MS"),
+})
+
+@app.before_request
+def _start_deadline():
+    rule = request.url_rule.rule if request.url_rule else request.path
+    deadline.start(DEADLINES.for_route(rule, request.headers.get(deadline.DEADLINE_HEADER)))
+
+@app.after_request
+def _deadline_status(resp):
+    if resp.status_code in (400, 500) and deadline.expired():
+        resp = jsonify(error="Request deadline exceeded")
+        resp.status_code = 504
+    return resp
+
+@app.teardown_request
+def _clear_deadline(exc):
+    deadline.clear()
+
+# ---------------------------------------------------
+# Read/write splitting (see db_router.py)
+#   Write requests, and clients that wrote within DB_READ_YOUR_WRITES seconds
+#   (cookie), read from the primary; other reads may go to a replica.
+# ---------------------------------------------------
+WRITE_HTTP_METHODS = ("POST", "PUT", "DELETE")
+
+@app.before_request
+def _route_reads():
+    DB.pin_primary(request.cookies.get(RYW_COOKIE), force=request.method in WRITE_HTTP_METHODS)
+
+@app.after_request
+def _mark_write(resp):
+    if DB.replicas and DB.ryw_secs and request.method in WRITE_HTTP_METHODS and resp.status_code < 400:
+        resp.set_cookie(RYW_COOKIE, DB.write_mark(), max_age=max(1, int(DB.ryw_secs)), httponly=True)
+    return resp
+
+# ---------------------------------------------------
+# Admission control (see admission.py)
+#   Per-route concurrency limit + bounded wait; overflow gets a fast 503 with
+#   Retry-After. Cheap routes (no DB / micro calls) and URLs that match no
+#   route are never limited.
+# ---------------------------------------------------
+ADMISSION = Admission(
+    initial=DB_CONFIG.get("ADMISSION_LIMIT", 32), max_limit=DB_CONFIG.get("ADMISSION_MAX", 256),
+    queue_size=DB_CONFIG.get("ADMISSION_QUEUE", 64), max_wait=float(DB_CONFIG.get("ADMISSION_WAIT_MS", 500)) / 1000.0,
+    exempt=("/utility/*",),
+)
+
+@app.before_request
+def _admit():
+    if request.url_rule is None:   # 404/405: a limiter per raw path would grow without bound
+        return None
+    rule = request.url_rule.rule
+    if ADMISSION.exempt(rule):
+        return None
+    lim = ADMISSION.limiter(f"{request.method} {rule}")
+    if not lim.acquire():
+        return jsonify(error="Server busy, retry later"), 503, {"Retry-After": str(ADMISSION.retry_after)}
+    g.admitted = (lim, time.perf_counter())
+    return None
+
+@app.teardown_request
+def _admit_release(exc):
+    admitted = g.pop("admitted", None)
+    if admitted is not None:
+        lim, t0 = admitted
+        lim.release(time.perf_counter() - t0)
+
+# ---------------------------------------------------
+# Idempotency-Key (POST create / task endpoints)
+#   A retried request with the same key gets the stored response of the
+#   first one (header Idempotent-Replayed: true) instead of re-running it.
+#   5xx responses are not stored, so those stay retryable: that includes
+#   writes that failed because the database was unavailable (503, see
+#   error_status), so a retry after an outage runs the request again.
+# ---------------------------------------------------
+IDEMPOTENCY = IdempotencyCache(int(DB_CONFIG.get("IDEMPOTENCY_MAX", 10000)),
+                               float(DB_CONFIG.get("IDEMPOTENCY_TTL", 86400)))
+IDEMPOTENCY_REPLAY_HEADERS = ("Content-Type", "Location", "Retry-After")
+
+def idempotent(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return view(*args, **kwargs)
+        key = (request.path, key)
+        state, stored = IDEMPOTENCY.begin(key, idempotency.fingerprint(request.get_data()))
+        if state == idempotency.MISMATCH:
+            return jsonify(error="Idempotency-Key was already used for a different request"), 422
+        if state == idempotency.BUSY:
+            return jsonify(error="A request with this Idempotency-Key is still in progress"), 409, {"Retry-After": "1"}
+        if state == idempotency.REPLAY:
+            body, status, headers = stored
+            resp = app.response_class(body, status, headers)
+            resp.headers["Idempotent-Replayed"] = "true"
+            return resp
+        try:
+            resp = app.make_response(view(*args, **kwargs))
+        except Exception:
+            IDEMPOTENCY.abort(key)
+            raise
+        if resp.status_code >= 500 or deadline.expired():   # 504 after _deadline_status
+            IDEMPOTENCY.abort(key)
+        else:
+            headers = [(h, resp.headers[h]) for h in IDEMPOTENCY_REPLAY_HEADERS if h in resp.headers]
+            IDEMPOTENCY.finish(key, (resp.get_data(), resp.status_code, headers))
+        return resp
+    return wrapper
+
 # ---------------------------------------------------
 # ENTITY ENDPOINTS (DB CRUD)
 #   student(ID, name, dept_name, tot_cred)
 #   course(course_id, title, dept_name, credits)
 # ---------------------------------------------------
 @app.post("/entity/students")
+@idempotent
 def create_student():
     data = request.get_json(force=True)
     ID = data.get("ID")
@@ -55,54 +732,101 @@ def create_student():
     dept_name = data.get("dept_name")
     tot_cred = int(data.get("tot_cred") or 0)
     try:
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO student (ID, name, dept_name, tot_cred) VALUES (%s, %s, %s, %s)",
-            (ID, name, dept_name if dept_name else None, tot_cred),
-        )
-        conn.commit()
+        insert_student(ID, name, dept_name, tot_cred)
+        index_student_name(ID, name)
         return jsonify(ok=True), 201
     except Exception as e:
-        print("create_student error:", e)
-        return jsonify(ok=False, error=str(e)), 400
-    finally:
-        try: cur.close(); conn.close()
-        except: pass
+        log_error("create_student", e)
+        return jsonify(ok=False, error=str(e)), error_status(e)
 
 @app.get("/entity/students/<ID>")
 def get_student(ID):
     try:
-        conn = get_conn(); cur = conn.cursor(dictionary=True)
-        cur.execute("SELECT ID, name, dept_name, tot_cred FROM student WHERE ID=%s", (ID,))
-        row = cur.fetchone()
+        conn = get_student_conn(ID, read=True)
+        with timed("db"):
+            row = conn.query_one("student_by_id", (ID,))
         if not row:
             return jsonify(error="NOT_FOUND"), 404
-        row["tot_cred"] = int(row["tot_cred"] or 0)
-        return jsonify(row)
+        ID, name, dept_name, tot_cred = row
+        return http_cache.conditional(jsonify(ID=ID, name=name, dept_name=dept_name, tot_cred=int(tot_cred or 0)))
     except Exception as e:
-        print("get_student error:", e)
+        log_error("get_student", e)
         return jsonify(error=str(e)), 400
     finally:
-        try: cur.close(); conn.close()
+        try: conn.close()
         except: pass
 
 @app.get("/entity/students")
 def list_students():
-    out = []
+    # /entity/students?after=<ID>&limit=100  (keyset page; all students when omitted)
     try:
-        conn = get_conn(); cur = conn.cursor(dictionary=True)
-        cur.execute("SELECT ID, name, dept_name, tot_cred FROM student ORDER BY ID")
-        for r in cur.fetchall():
-            out.append({"ID": r["ID"], "name": r["name"], "dept_name": r["dept_name"], "tot_cred": int(r["tot_cred"] or 0)})
-        return jsonify(out)
+        rows = list_students_rows(request.args.get("after"), request.args.get("limit"))
+        out = [{"ID": ID, "name": name, "dept_name": dept_name, "tot_cred": int(tot_cred or 0)}
+               for ID, name, dept_name, tot_cred in rows]
+        return http_cache.conditional(jsonify(out))
     except Exception as e:
-        print("list_students error:", e)
+        log_error("list_students", e)
         return jsonify(error=str(e)), 400
-    finally:
-        try: cur.close(); conn.close()
-        except: pass
+
+@app.get("/entity/students/search")
+def search_students():
+    # /entity/students/search?q=ali&mode=auto|prefix|fuzzy&limit=10
+    try:
+        rows = search_student_names(request.args.get("q", ""), request.args.get("mode", "auto"),
+                                    request.args.get("limit"))
+    except Exception as e:
+        log_error("search_students", e)
+        return jsonify(error=str(e)), 400
+    return jsonify(rows)
+
+@app.get("/entity/students/<ID>/credits")
+def get_student_credits(ID):
+    try:
+        summary = credit_summary(ID)
+    except Exception as e:
+        log_error("get_student_credits", e)
+        return jsonify(error=str(e)), 400
+    if summary is None:
+        return jsonify(error="NOT_FOUND"), 404
+    return jsonify(summary)
+
+@app.get("/entity/students/<ID>/transcript")
+def get_student_transcript(ID):
+    try:
+        summary = credit_summary(ID)
+        if summary is None:
+            return jsonify(error="NOT_FOUND"), 404
+        summary["courses"] = transcript_rows(ID)
+    except Exception as e:
+        log_error("get_student_transcript", e)
+        return jsonify(error=str(e)), 400
+    return jsonify(summary)
+
+@app.get("/entity/students/<ID>/conflicts")
+def get_student_conflicts(ID):
+    # /entity/students/12345/conflicts?semester=Fall&year=2009
+    semester = request.args.get("semester", "")
+    try:
+        year = int(request.args.get("year", "0"))
+        conflicts = list_schedule_conflicts(ID, semester, year)
+    except Exception as e:
+        log_error("get_student_conflicts", e)
+        return jsonify(error=str(e)), 400
+    return jsonify(conflicts=conflicts)
+
+@app.put("/entity/takes/grade")
+def put_grade():
+    data = request.get_json(force=True)
+    try:
+        year = int(data.get("year") or 0)
+    except (TypeError, ValueError):
+        return jsonify(ok=False, message="Invalid year"), 400
+    status, msg = set_grade(data.get("student_id", ""), data.get("course_id", ""), str(data.get("sec_id", "")),
+                            data.get("semester", ""), year, data.get("grade"))
+    return jsonify(ok=status == 200, message=msg), status
 
 @app.post("/entity/courses")
+@idempotent
 def create_course():
     data = request.get_json(force=True)
     course_id = data.get("course_id")
@@ -110,56 +834,178 @@ def create_course():
     dept_name = data.get("dept_name")
     credits = int(data.get("credits") or 0)
     try:
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO course (course_id, title, dept_name, credits) VALUES (%s, %s, %s, %s)",
-            (course_id, title, dept_name if dept_name else None, credits),
-        )
-        conn.commit()
+        conn = get_conn()
+        with timed("db"):
+            conn.execute("course_insert", (course_id, title, dept_name if dept_name else None, credits))
+            conn.commit()
         return jsonify(ok=True), 201
     except Exception as e:
-        print("create_course error:", e)
-        return jsonify(ok=False, error=str(e)), 400
+        log_error("create_course", e)
+        return jsonify(ok=False, error=str(e)), error_status(e)
     finally:
-        try: cur.close(); conn.close()
+        try: conn.close()
         except: pass
 
+@app.get("/entity/courses")
+def list_courses():
+    # /entity/courses?dept_name=Comp.%20Sci.&min_credits=3&after=CS-190&limit=20&fields=course_id,title
+    fields = request.args.get("fields")
+    fields = tuple(f.strip() for f in fields.split(",")) if fields else COURSE_FIELDS
+    try:
+        rows, next_after = list_courses_page(
+            request.args.get("dept_name"), request.args.get("min_credits"),
+            request.args.get("after"), request.args.get("limit"), fields,
+        )
+    except Exception as e:
+        log_error("list_courses", e)
+        return jsonify(error=str(e)), 400
+    return http_cache.conditional(jsonify(items=rows, next_after=next_after))
+
 @app.get("/entity/courses/<course_id>")
 def get_course(course_id):
     try:
-        conn = get_conn(); cur = conn.cursor(dictionary=True)
-        cur.execute("SELECT course_id, title, dept_name, credits FROM course WHERE course_id=%s", (course_id,))
-        row = cur.fetchone()
+        conn = get_read_conn()
+        with timed("db"):
+            row = conn.query_one("course_by_id", (course_id,))
         if not row:
             return jsonify(error="NOT_FOUND"), 404
-        row["credits"] = int(row["credits"] or 0)
-        return jsonify(row)
+        course_id, title, dept_name, credits = row
+        return http_cache.conditional(jsonify(course_id=course_id, title=title, dept_name=dept_name,
+                                              credits=int(credits or 0)))
     except Exception as e:
-        print("get_course error:", e)
+        log_error("get_course", e)
         return jsonify(error=str(e)), 400
+    finally:
+        try: conn.close()
+        except: pass
+
+@app.post("/entity/time_slots")
+@idempotent
+def create_time_slot():
+    data = request.get_json(force=True)
+    slot = (data.get("time_slot_id"), data.get("day"), data.get("start_time"), data.get("end_time"))
+    try:
+        index = timeslot_index()
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute("INSERT INTO time_slot (time_slot_id, day, start_time, end_time) VALUES (%s, %s, %s, %s)", slot)
+            conn.commit()
+        index.add(*slot)
+        return jsonify(ok=True), 201
+    except Exception as e:
+        log_error("create_time_slot", e)
+        return jsonify(ok=False, error=str(e)), error_status(e)
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+@app.post("/entity/prereqs")
+@idempotent
+def add_prereq():
+    data = request.get_json(force=True)
+    course_id = data.get("course_id")
+    prereq_id = data.get("prereq_id")
+    try:
+        index = prereq_index()
+        index.check_add(course_id, prereq_id)
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute("INSERT INTO prereq (course_id, prereq_id) VALUES (%s, %s)", (course_id, prereq_id))
+            conn.commit()
+        index.add(course_id, prereq_id)
+        return jsonify(ok=True), 201
+    except PrereqCycleError as e:
+        return jsonify(ok=False, error=str(e)), 409
+    except Exception as e:
+        log_error("add_prereq", e)
+        return jsonify(ok=False, error=str(e)), error_status(e)
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+@app.delete("/entity/prereqs/<course_id>/<prereq_id>")
+def remove_prereq(course_id, prereq_id):
+    try:
+        index = prereq_index()
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute("DELETE FROM prereq WHERE course_id=%s AND prereq_id=%s", (course_id, prereq_id))
+            deleted = cur.rowcount
+            conn.commit()
+        if not deleted:
+            return jsonify(ok=False, error="NOT_FOUND"), 404
+        index.remove(course_id, prereq_id)
+        return jsonify(ok=True)
+    except Exception as e:
+        log_error("remove_prereq", e)
+        return jsonify(ok=False, error=str(e)), 400
     finally:
         try: cur.close(); conn.close()
         except: pass
 
+# ---------------------------------------------------
+# EXPORT ENDPOINTS (columnar bulk export, see arrow_export.py)
+#   The whole student table as Arrow IPC record batches (?format=parquet: a
+#   Parquet file), read EXPORT_CHUNK_ROWS rows at a time from an unbuffered
+#   cursor, so neither the server nor MySQL materializes the full result.
+#   The body streams after the request has finished, so the export is not
+#   admitted (admission.py) and runs without a deadline or SELECT time limit.
+# ---------------------------------------------------
+STUDENT_ARROW_FIELDS = [("ID", "string"), ("name", "string"), ("dept_name", "string"), ("tot_cred", "int32")]
+EXPORT_CHUNK_ROWS = int(DB_CONFIG.get("EXPORT_CHUNK_ROWS", arrow_export.CHUNK_ROWS))
+
+def student_chunks():
+    """Row chunks of the whole student table (each shard in turn when sharded). Runs as the
+    response streams, after the request's deadline is gone: connections are bound with no limit."""
+    deadline.clear()
+    connects = [functools.partial(SHARDS.connect, i) for i in range(len(SHARDS))] or [get_read_conn]
+    for connect in connects:
+        conn = connect(); cur = conn.cursor()
+        try:
+            cur.execute("SELECT ID, name, dept_name, tot_cred FROM student")
+            for rows in arrow_export.fetch_chunks(cur, EXPORT_CHUNK_ROWS):
+                yield [(ID, name, dept_name, int(tot_cred or 0)) for ID, name, dept_name, tot_cred in rows]
+        finally:
+            try: cur.close()
+            except: pass
+            conn.close()
+
+@app.get("/export/students")
+def export_students():
+    fmt = request.args.get("format", "arrow")
+    if fmt not in arrow_export.FORMATS:
+        return jsonify(error=f"format must be one of {', '.join(arrow_export.FORMATS)}"), 400
+    if not arrow_export.available():
+        return jsonify(error="pyarrow is not installed"), 501
+    mimetype, ext, body = arrow_export.encode(fmt, STUDENT_ARROW_FIELDS, student_chunks())
+    return Response(body, mimetype=mimetype,
+                    headers={"Content-Disposition": f'attachment; filename="students.{ext}"'})
+
 # ---------------------------------------------------
 # TASK ENDPOINT (business process)
 # Uses internal utilities, entity endpoints/DB, and calls the microservice (REST)
 # ---------------------------------------------------
 import requests
 
-@app.post("/task/onboard_student_into_course")
-def onboard_student_into_course():
-    """
-    Expected JSON:
-    {
-      "student_id": "S9009",
-      "name": "alice smith",
-      "dept_name": "Inf. Sys.",
-      "init_credits": 0,
-      "course_id": "CS-909"
-    }
-    """
-    data = request.get_json(force=True)
+MICRO_TIMEOUT = 5   # seconds, further capped by the request deadline
+MICRO = MicroPool(parse_urls(DB_CONFIG.get("MICRO_URLS", "http://localhost:8001")),
+                  hedge=DB_CONFIG.get("MICRO_HEDGE", "0").lower() in ("1", "true", "yes"),
+                  hedge_pct=float(DB_CONFIG.get("MICRO_HEDGE_PCT", 95)))
+
+def calc_tuition(credits):
+    """Tuition from the micro servers (least-loaded replica, hedged when enabled); raises on failure."""
+    def fetch(url, timeout):
+        resp = requests.get(f"{url}/policy/calc_tuition", params={"credits": credits}, timeout=timeout)
+        resp.raise_for_status()
+        return float(resp.json().get("tuition", 0.0))
+    return MICRO.call(fetch, deadline.cap(MICRO_TIMEOUT), idempotent=True)
+
+def _past_deadline(norm_name):
+    return dict(success=False, normalized_name=norm_name, tuition_estimate=0.0,
+                message="Request deadline exceeded"), 504
+
+def _onboard(data):
+    """Onboarding steps 1-5 -> (response dict, http status); run inline or by a job worker."""
     student_id = data.get("student_id", "")
     name = data.get("name", "")
     dept_name = data.get("dept_name")
@@ -168,54 +1014,140 @@ def onboard_student_into_course():
 
     # 1) validate + normalize
     if not validate_student_id(student_id):
-        return jsonify(success=False, normalized_name="", tuition_estimate=0.0,
-                       message="Invalid student ID format"), 400
+        return dict(success=False, normalized_name="", tuition_estimate=0.0,
+                    message="Invalid student ID format"), 400
     norm_name = normalize_name(name)
 
+    # prerequisites: a brand-new student has not passed anything yet
+    try:
+        required = prereq_index().closure(course_id)
+    except Exception as e:
+        log_error("task.prereqs", e)
+        return dict(success=False, normalized_name=norm_name, tuition_estimate=0.0,
+                    message=str(e)), error_status(e)
+    if required:
+        return dict(success=False, normalized_name=norm_name, tuition_estimate=0.0,
+                    message="Missing prerequisites: " + ", ".join(sorted(required))), 409
+
     # 2) create student (direct DB call to keep code minimal)
+    if deadline.expired():
+        return _past_deadline(norm_name)
     try:
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO student (ID, name, dept_name, tot_cred) VALUES (%s, %s, %s, %s)",
-            (student_id, norm_name, dept_name if dept_name else None, init_credits),
-        )
-        conn.commit()
+        insert_student(student_id, norm_name, dept_name, init_credits)
+        index_student_name(student_id, norm_name)
     except Exception as e:
-        print("task.create_student error:", e)
-        return jsonify(success=False, normalized_name=norm_name, tuition_estimate=0.0,
-                       message="Failed to create student"), 400
-    finally:
-        try: cur.close(); conn.close()
-        except: pass
+        log_error("task.create_student", e)
+        return dict(success=False, normalized_name=norm_name, tuition_estimate=0.0,
+                    message="Failed to create student"), error_status(e)
 
     # 3) get course info
     try:
-        conn = get_conn(); cur = conn.cursor(dictionary=True)
-        cur.execute("SELECT credits FROM course WHERE course_id=%s", (course_id,))
-        row = cur.fetchone()
+        conn = get_conn()
+        with timed("db"):
+            row = conn.query_one("course_credits", (course_id,))
         if not row:
-            return jsonify(success=False, normalized_name=norm_name, tuition_estimate=0.0,
-                           message="Course not found"), 404
-        credits = int(row["credits"] or 0)
+            return dict(success=False, normalized_name=norm_name, tuition_estimate=0.0,
+                        message="Course not found"), 404
+        credits = int(row[0])
     except Exception as e:
-        print("task.get_course error:", e)
-        return jsonify(success=False, normalized_name=norm_name, tuition_estimate=0.0,
-                       message=str(e)), 400
+        log_error("task.get_course", e)
+        return dict(success=False, normalized_name=norm_name, tuition_estimate=0.0,
+                    message=str(e)), error_status(e)
     finally:
-        try: cur.close(); conn.close()
+        try: conn.close()
         except: pass
 
     # 4) call microservice for tuition calculation
+    if deadline.expired():
+        return _past_deadline(norm_name)
     try:
-        resp = requests.get("http://localhost:8001/policy/calc_tuition", params={"credits": credits}, timeout=5)
-        tuition = float(resp.json().get("tuition", 0.0)) if resp.ok else 0.0
+        with timed("micro"):
+            tuition = calc_tuition(credits)
     except Exception as e:
-        print("task.micro_call error:", e)
+        log_error("task.micro_call", e)
+        if deadline.expired():
+            return _past_deadline(norm_name)
         tuition = 0.0
 
     # 5) return consolidated result
     msg = f"Student {student_id} onboarded to {course_id}."
-    return jsonify(success=True, normalized_name=norm_name, tuition_estimate=tuition, message=msg)
+    return dict(success=True, normalized_name=norm_name, tuition_estimate=tuition, message=msg), 200
+
+ONBOARD_JOBS = jobs.JobQueue("onboard", _onboard, int(DB_CONFIG.get("JOB_WORKERS", 4)),
+                             int(DB_CONFIG.get("JOB_QUEUE", 1000)), DB_CONFIG.get("JOB_STORE"))
+
+def _wants_async():
+    return (request.args.get("async", "").lower() in ("1", "true", "yes")
+            or "respond-async" in request.headers.get("Prefer", ""))
+
+@app.post("/task/onboard_student_into_course")
+@idempotent
+def onboard_student_into_course():
+    """
+    Expected JSON:
+    {
+      "student_id": "S9009",
+      "name": "alice smith",
+      "dept_name": "Inf. Sys.",
+      "init_credits": 0,
+      "course_id": "CS-909"
+    }
+    ?async=1 (or header "Prefer: respond-async") queues the work and answers
+    202 {"job_id", "status"}; poll GET /task/jobs/<job_id> for the result.
+    """
+    data = request.get_json(force=True)
+    if _wants_async():
+        job = ONBOARD_JOBS.submit(data)
+        if job is None:
+            return jsonify(success=False, message="Onboarding queue is full"), 503, {"Retry-After": "1"}
+        return jsonify(job_id=job["id"], status=job["status"]), 202, {"Location": f"/task/jobs/{job['id']}"}
+    result, status = _onboard(data)
+    return jsonify(result), status
+
+@app.get("/task/jobs/<job_id>")
+def get_job(job_id):
+    # status: queued | running | done | failed; result/http_status are the sync response
+    job = ONBOARD_JOBS.get(job_id)
+    if job is None:
+        return jsonify(error="NOT_FOUND"), 404
+    return jsonify(job)
+
+@app.post("/task/enroll_student_in_section")
+@idempotent
+def enroll_student_in_section():
+    """
+    Expected JSON:
+    {
+      "student_id": "S9009",
+      "course_id": "CS-101",
+      "sec_id": "1",
+      "semester": "Fall",
+      "year": 2009
+    }
+    """
+    data = request.get_json(force=True)
+    student_id = data.get("student_id", "")
+    course_id = data.get("course_id", "")
+    sec_id = str(data.get("sec_id", ""))
+    semester = data.get("semester", "")
+    try:
+        year = int(data.get("year") or 0)
+    except (TypeError, ValueError):
+        return jsonify(success=False, seats_left=0, message="Invalid year"), 400
+
+    status, msg, seats_left = enroll_in_section(student_id, course_id, sec_id, semester, year)
+    return jsonify(success=status == 200, seats_left=seats_left, message=msg), status
+
+@app.get("/task/check_prereqs")
+def check_prereqs():
+    student_id = request.args.get("student_id", "")
+    course_id = request.args.get("course_id", "")
+    try:
+        missing = missing_prereqs(student_id, course_id)
+    except Exception as e:
+        log_error("check_prereqs", e)
+        return jsonify(error=str(e)), 400
+    return jsonify(eligible=not missing, missing=sorted(missing))
 
 # ---------------------------------------------------
 # Optional tiny endpoints to show utilities (for teaching)
@@ -230,6 +1162,16 @@ def util_validate():
     s = request.args.get("s", "")
     return jsonify(valid=validate_student_id(s))
 
+@app.get("/utility/admission")
+def util_admission():
+    # current per-route limits / in-flight / queued / rejected counts
+    return jsonify(ADMISSION.stats())
+
+@app.get("/utility/micro")
+def util_micro():
+    # micro replicas: in-flight / calls / errors / ejected, hedged calls and current hedge delay
+    return jsonify(MICRO.stats())
+
 # ---------------------------------------------------
 # Run
 # ---------------------------------------------------
@@ -1,12 +1,56 @@
 # micro_server.py (REST version)
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
+import sys
+import time
+import numpy as np
+import json_codec
+from admission import Admission
 
 app = Flask(__name__)
+json_codec.install(app)
 
 # Very specific, non-breakable rules (no DB)
 BASE_FEE = 100.0
 PER_CREDIT = 50.0
 MAX_CREDITS = 24
+BINARY_MIMETYPE = "application/octet-stream"   # packed batch format (see calc_tuition_batch)
+
+# The rules above never change at runtime, so policy answers are cacheable.
+POLICY_CACHE_CONTROL = "public, max-age=86400"
+
+@app.after_request
+def _policy_cache_headers(resp):
+    if request.method == "GET" and request.path.startswith("/policy/") and resp.status_code == 200:
+        resp.headers["Cache-Control"] = POLICY_CACHE_CONTROL
+    return resp
+
+# Admission control (see admission.py): per-route limit + bounded wait, fast
+# 503 with Retry-After on overflow; the constant max_credits answer is exempt.
+ADMISSION_LIMIT = 64
+ADMISSION_QUEUE = 128
+ADMISSION_WAIT_MS = 200
+ADMISSION = Admission(initial=ADMISSION_LIMIT, queue_size=ADMISSION_QUEUE, max_wait=ADMISSION_WAIT_MS / 1000.0,
+                      exempt=("/policy/max_credits",))
+
+@app.before_request
+def _admit():
+    if request.url_rule is None:   # 404/405: a limiter per raw path would grow without bound
+        return None
+    rule = request.url_rule.rule
+    if ADMISSION.exempt(rule):
+        return None
+    lim = ADMISSION.limiter(f"{request.method} {rule}")
+    if not lim.acquire():
+        return jsonify(error="Server busy, retry later"), 503, {"Retry-After": str(ADMISSION.retry_after)}
+    g.admitted = (lim, time.perf_counter())
+    return None
+
+@app.teardown_request
+def _admit_release(exc):
+    admitted = g.pop("admitted", None)
+    if admitted is not None:
+        lim, t0 = admitted
+        lim.release(time.perf_counter() - t0)
 
 @app.get("/policy/calc_tuition")
 def calc_tuition():
@@ -18,10 +62,34 @@ def calc_tuition():
     tuition = BASE_FEE + PER_CREDIT * max(0, credits)
     return jsonify(tuition=float(tuition))
 
+@app.post("/policy/calc_tuition_batch")
+def calc_tuition_batch():
+    # JSON:   {"credits": [3, 4, 30]}  ->  {"tuition": [250.0, 300.0, 1300.0]}
+    # Binary: Content-Type application/octet-stream, packed little-endian int32
+    #         credits -> packed little-endian float64 tuition (same order)
+    binary_in = request.mimetype == BINARY_MIMETYPE
+    try:
+        if binary_in:
+            credits = np.frombuffer(request.get_data(), dtype="<i4")
+        else:
+            data = request.get_json(force=True) or {}
+            credits = np.asarray(data.get("credits") or [], dtype=np.int64)
+    except (ValueError, TypeError, OverflowError) as e:   # OverflowError: beyond int64
+        return jsonify(error=str(e)), 400
+    if credits.ndim != 1:
+        return jsonify(error="credits must be a flat array"), 400
+    # one vectorized pass, clamped to the per-term maximum
+    tuition = BASE_FEE + PER_CREDIT * np.clip(credits, 0, MAX_CREDITS)
+    accept = request.accept_mimetypes
+    if binary_in or accept.quality(BINARY_MIMETYPE) > accept.quality("application/json"):
+        return Response(tuition.astype("<f8").tobytes(), mimetype=BINARY_MIMETYPE)
+    return jsonify(tuition=tuition.tolist())
+
 @app.get("/policy/max_credits")
 def max_credits():
     return jsonify(max_credits=MAX_CREDITS)
 
 if __name__ == "__main__":
-    print("Micro (Tuition Policy) REST server on http://localhost:8001")
-    app.run(host="0.0.0.0", port=8001, debug=False)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8001   # e.g. a second replica: python micro_server.py 8011
+    print(f"Micro (Tuition Policy) REST server on http://localhost:{port}")
+    app.run(host="0.0.0.0", port=port, debug=False)
@@ -0,0 +1,167 @@
+# name_index.py
+# In-process student name search over normalize_name() output.
+#
+#   prefix: sorted (word-suffix of the lowercased name, ID) entries, so
+#           "smi" finds "Alice Smith" with one bisect. They are kept in
+#           buckets of up to 2 * BUCKET entries (SortedEntries), so add()
+#           costs O(log n + BUCKET) instead of shifting one flat list.
+#   fuzzy:  trigram postings (trigram -> IDs), ranked by trigram Jaccard
+#           similarity, so "alise smyth" still finds "Alice Smith".
+#
+# Loaded once from student and kept current by the create paths via add(),
+# so lookups never need LIKE '%...%' scans on MySQL. Lookups and add() share
+# one lock: a rename or create never runs while a lookup walks the entries.
+import bisect
+import threading
+
+BUCKET = 512
+
+def search_key(name):
+    return " ".join((name or "").lower().split())
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SortedEntries:
+    """Sorted list split into buckets; _maxes[i] is the last entry of bucket i."""
+    def __init__(self, entries=()):
+        entries = sorted(entries)
+        self._buckets = [entries[i:i + BUCKET] for i in range(0, len(entries), BUCKET)]
+        self._maxes = [b[-1] for b in self._buckets]
+
+    def __len__(self):
+        return sum(len(b) for b in self._buckets)
+
+    def add(self, entry):
+        if not self._buckets:
+            self._buckets, self._maxes = [[entry]], [entry]
+            return
+        i = min(bisect.bisect_left(self._maxes, entry), len(self._buckets) - 1)
+        b = self._buckets[i]
+        bisect.insort(b, entry)
+        self._maxes[i] = b[-1]
+        if len(b) > 2 * BUCKET:
+            self._buckets[i:i + 1] = [b[:BUCKET], b[BUCKET:]]
+            self._maxes[i:i + 1] = [b[BUCKET - 1], b[-1]]
+
+    def remove(self, entry):
+        i = bisect.bisect_left(self._maxes, entry)
+        if i == len(self._buckets):
+            return
+        b = self._buckets[i]
+        j = bisect.bisect_left(b, entry)
+        if j < len(b) and b[j] == entry:
+            del b[j]
+            if b:
+                self._maxes[i] = b[-1]
+            else:
+                del self._buckets[i], self._maxes[i]
+
+    def from_(self, entry):
+        """Entries >= entry, in order."""
+        i = bisect.bisect_left(self._maxes, entry)
+        if i == len(self._buckets):
+            return
+        b = self._buckets[i]
+        for j in range(bisect.bisect_left(b, entry), len(b)):
+            yield b[j]
+        for k in range(i + 1, len(self._buckets)):
+            yield from self._buckets[k]
+
+class NameIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = {}     # ID -> name
+        self._sorted = SortedEntries()   # (word-suffix key, ID)
+        self._grams = {}     # trigram -> set(ID)
+        self._gram_count = {}
+        self.loaded = False
+
+    @staticmethod
+    def _suffixes(key):
+        words = key.split(" ")
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def load(self, rows):
+        """Rebuild from (ID, name) rows. Names add()ed before or during the load win over
+        the rows, since they may have been committed after the SELECT that produced them."""
+        names = {ID: name for ID, name in rows}
+        with self._lock:
+            names.update(self._names)
+            entries, grams, counts = [], {}, {}
+            for ID, name in names.items():
+                key = search_key(name)
+                entries.extend((s, ID) for s in self._suffixes(key))
+                g = trigrams(key)
+                counts[ID] = len(g)
+                for t in g:
+                    grams.setdefault(t, set()).add(ID)
+            self._names, self._sorted, self._grams, self._gram_count = names, SortedEntries(entries), grams, counts
+            self.loaded = True
+
+    def add(self, ID, name):
+        with self._lock:
+            old = self._names.get(ID)
+            if old is not None:
+                self._remove_locked(ID, old)
+            key = search_key(name)
+            self._names[ID] = name
+            for s in self._suffixes(key):
+                self._sorted.add((s, ID))
+            g = trigrams(key)
+            self._gram_count[ID] = len(g)
+            for t in g:
+                self._grams.setdefault(t, set()).add(ID)
+
+    def _remove_locked(self, ID, name):
+        key = search_key(name)
+        for s in self._suffixes(key):
+            self._sorted.remove((s, ID))
+        for t in trigrams(key):
+            self._grams.get(t, set()).discard(ID)
+        self._gram_count.pop(ID, None)
+
+    def prefix(self, q, limit=10):
+        """[(ID, name)] whose name (or a later word of it) starts with q."""
+        key = search_key(q)
+        if not key:
+            return []
+        out, seen = [], set()
+        with self._lock:
+            for s, ID in self._sorted.from_((key,)):
+                if not s.startswith(key) or len(out) >= limit:
+                    break
+                if ID not in seen:
+                    seen.add(ID)
+                    out.append((ID, self._names[ID]))
+        return out
+
+    def fuzzy(self, q, limit=10, min_score=0.3):
+        """[(ID, name, score)] ranked by trigram similarity to q."""
+        qg = trigrams(search_key(q))
+        if not qg:
+            return []
+        shared, scored = {}, []
+        with self._lock:
+            for t in qg:
+                for ID in self._grams.get(t, ()):
+                    shared[ID] = shared.get(ID, 0) + 1
+            for ID, n in shared.items():
+                score = n / (len(qg) + self._gram_count.get(ID, 0) - n)
+                if score >= min_score:
+                    scored.append((-score, self._names[ID], ID))
+        scored.sort()
+        return [(ID, name, round(-neg, 3)) for neg, name, ID in scored[:limit]]
+
+    def search(self, q, limit=10, mode="auto"):
+        """[{"ID", "name", "score"}]; auto = prefix hits first, topped up with fuzzy ones."""
+        out = []
+        if mode in ("auto", "prefix"):
+            out = [{"ID": ID, "name": name, "score": 1.0} for ID, name in self.prefix(q, limit)]
+        if mode == "fuzzy" or (mode == "auto" and len(out) < limit):
+            seen = {r["ID"] for r in out}
+            for ID, name, score in self.fuzzy(q, limit):
+                if ID not in seen and len(out) < limit:
+                    out.append({"ID": ID, "name": name, "score": score})
+        return out
@@ -0,0 +1,107 @@
+# timetable.py
+# Schedule-conflict checks backed by a per-day interval index.
+#
+# TimeSlotIndex maps time_slot_id -> its weekly meetings (day, start, end in
+# minutes). It is loaded once from time_slot and updated when slots are
+# added through the entity endpoints, so checks never self-join time_slot.
+# A student's booked meetings for a term are bucketed per day and sorted by
+# start; checking one candidate meeting is a bisect plus two neighbour
+# comparisons (O(log n) per slot).
+import bisect
+import datetime
+import threading
+
+def to_minutes(t):
+    """MySQL TIME (timedelta), datetime.time or 'HH:MM[:SS]' -> minutes after midnight."""
+    if isinstance(t, datetime.timedelta):
+        return int(t.total_seconds()) // 60
+    if isinstance(t, datetime.time):
+        return t.hour * 60 + t.minute
+    parts = str(t).split(":")
+    return int(parts[0]) * 60 + int(parts[1])
+
+def fmt_minutes(m):
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+class TimeSlotIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {}   # time_slot_id -> [(day, start, end)]
+        self.loaded = False
+
+    def load(self, rows):
+        """Rebuild from (time_slot_id, day, start_time, end_time) rows."""
+        slots = {}
+        for slot_id, day, start, end in rows:
+            start_m = to_minutes(start)
+            end_m = to_minutes(end) if end is not None else start_m
+            slots.setdefault(slot_id, []).append((day, start_m, end_m))
+        with self._lock:
+            self._slots, self.loaded = slots, True
+
+    def add(self, slot_id, day, start, end):
+        with self._lock:
+            start_m = to_minutes(start)
+            end_m = to_minutes(end) if end is not None else start_m
+            self._slots.setdefault(slot_id, []).append((day, start_m, end_m))
+
+    def meetings(self, slot_id):
+        return self._slots.get(slot_id, [])
+
+class Schedule:
+    """One student's booked meetings for a term, indexed per day."""
+    def __init__(self, index, booked):
+        # booked: [(label, time_slot_id)]
+        self._days = {}
+        for label, slot_id in booked:
+            for day, start, end in index.meetings(slot_id):
+                self._days.setdefault(day, []).append((start, end, label))
+        self._starts = {}
+        self._max_end = {}   # running max of end over the start-sorted list
+        for day, items in self._days.items():
+            items.sort()
+            self._starts[day] = [it[0] for it in items]
+            running, out = -1, []
+            for _, end, _ in items:
+                running = max(running, end)
+                out.append(running)
+            self._max_end[day] = out
+
+    def clashes(self, day, start, end):
+        """Labels of booked meetings on `day` overlapping [start, end)."""
+        starts = self._starts.get(day)
+        if not starts:
+            return []
+        items, max_end = self._days[day], self._max_end[day]
+        pos = bisect.bisect_left(starts, end)        # items[pos:] start at/after `end`
+        if pos == 0 or max_end[pos - 1] <= start:    # nothing before `end` reaches `start`
+            return []
+        out = []
+        i = pos - 1
+        while i >= 0 and max_end[i] > start:         # only walks actual overlaps
+            if items[i][1] > start:
+                out.append(items[i][2])
+            i -= 1
+        return out
+
+    def conflicts_with(self, index, slot_id):
+        """Booked labels clashing with any meeting of `slot_id`."""
+        out = []
+        for day, start, end in index.meetings(slot_id):
+            for label in self.clashes(day, start, end):
+                if label not in out:
+                    out.append(label)
+        return out
+
+    def all_conflicts(self):
+        """Every overlapping pair within the schedule: [(day, label_a, label_b, start, end)]."""
+        out = []
+        for day, items in self._days.items():
+            active = []
+            for start, end, label in items:
+                active = [a for a in active if a[1] > start]
+                for a_start, a_end, a_label in active:
+                    if a_label != label:
+                        out.append((day, a_label, label, start, min(end, a_end)))
+                active.append((start, end, label))
+        return out
@@ -0,0 +1,163 @@
+# api_client.py (SOAP, in-memory flavor)
+# Client library for the main and micro SOAP services, for scripts and batch jobs.
+#
+#   api = ApiClient()                                   # localhost:8000 / :8001
+#   summary = api.process_order("Josh Groban", "Widget-Pro", 3, 19.99, "ID", 1.4)
+#   summaries = api.process_orders(rows)                # same order as rows
+#
+# Each service gets one zeep Client, so its WSDL is fetched and parsed once
+# (the micro one on first use), and all calls share one requests.Session whose
+# connection pool holds `concurrency` keep-alive connections. The *_many /
+# process_orders helpers schedule their calls on an asyncio loop with a
+# semaphore of `concurrency` calls in flight (the blocking zeep calls run on a
+# thread pool of that size): a batch costs about len(rows) / concurrency round
+# trips instead of len(rows). The *_async forms can be awaited from a running
+# loop. A failed item does not stop the batch: its slot in the result list
+# holds the exception.
+#
+# Reads and quotes are retried on transient failures (connection errors,
+# timeouts, HTTP 429/502/503/504) with exponential backoff. This server has no
+# idempotency keys, so creates and process_order are only retried when the
+# request never reached it (connection refused, connect timeout): otherwise a
+# retry could place the order twice.
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from zeep import Client
+from zeep.exceptions import TransportError
+from zeep.transports import Transport
+
+MAIN = "http://localhost:8000"
+MICRO = "http://localhost:8001"
+RETRY_STATUS = (429, 502, 503, 504)
+
+def _not_sent(e):
+    """True when the request never reached the server."""
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    if isinstance(e, requests.ConnectionError) and e.args:
+        return isinstance(getattr(e.args[0], "reason", None), NewConnectionError)
+    return False
+
+def _transient(e):
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return isinstance(e, TransportError) and e.status_code in RETRY_STATUS
+
+class ApiClient:
+    def __init__(self, main=MAIN, micro=MICRO, concurrency=16, timeout=10.0, retries=3, backoff=0.2):
+        self.urls = {"main": main.rstrip("/"), "micro": micro.rstrip("/")}
+        self.concurrency, self.timeout = int(concurrency), float(timeout)
+        self.retries, self.backoff = int(retries), float(backoff)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._exec = None
+
+    def close(self):
+        if self._exec is not None:
+            self._exec.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- transport ----
+    def client(self, which):
+        """The zeep Client of "main" or "micro" (WSDL loaded on first use, then shared)."""
+        with self._lock:
+            client = self._clients.get(which)
+            if client is None:
+                transport = Transport(session=self.session, timeout=self.timeout, operation_timeout=self.timeout)
+                client = self._clients[which] = Client(wsdl=f"{self.urls[which]}/?wsdl", transport=transport)
+            return client
+
+    def _call(self, which, op, *args, safe=True):
+        """safe=False: the call changes state, retry only what was never sent."""
+        client = self.client(which)
+        for attempt in range(self.retries + 1):
+            try:
+                return getattr(client.service, op)(*args)
+            except Exception as e:
+                if attempt == self.retries or not (_transient(e) if safe else _not_sent(e)):
+                    raise
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    # ---- entity ----
+    def create_customer(self, name):
+        return self._call("main", "create_customer", name, safe=False)
+
+    def get_customer(self, customer_id):
+        """Customer, or None when there is no such customer."""
+        c = self._call("main", "get_customer", customer_id)
+        return None if c.id == -1 else c
+
+    def list_customers(self):
+        return self._call("main", "list_customers") or []
+
+    def get_order(self, order_id):
+        """Order, or None when there is no such order."""
+        o = self._call("main", "get_order", order_id)
+        return None if o.id == -1 else o
+
+    def list_orders(self):
+        return self._call("main", "list_orders") or []
+
+    # ---- task ----
+    def process_order(self, customer_name, product, qty, unit_price, ship_to_country, est_weight_kg):
+        """OrderSummary of the placed order (VAT and shipping from the micro server)."""
+        return self._call("main", "process_order", customer_name, product, qty, unit_price,
+                          ship_to_country, est_weight_kg, safe=False)
+
+    # ---- policy (micro) ----
+    def get_vat_rate(self, country_code):
+        return self._call("micro", "get_vat_rate", country_code)
+
+    def get_shipping_quote(self, total_weight_kg):
+        return self._call("micro", "get_shipping_quote", total_weight_kg)
+
+    # ---- bulk ----
+    def _executor(self):
+        if self._exec is None:
+            self._exec = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="api")
+        return self._exec
+
+    async def map_async(self, fn, items):
+        """[fn(item)] with at most `concurrency` calls in flight; exceptions are returned, not raised."""
+        loop = asyncio.get_running_loop()
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(item):
+            async with sem:
+                try:
+                    return await loop.run_in_executor(self._executor(), fn, item)
+                except Exception as e:
+                    return e
+        return await asyncio.gather(*(one(item) for item in items))
+
+    async def process_orders_async(self, rows):
+        """rows: dicts with the process_order() arguments (customer_name, product, qty,
+        unit_price, ship_to_country, est_weight_kg)."""
+        return await self.map_async(lambda row: self.process_order(**row), rows)
+
+    def process_orders(self, rows):
+        return asyncio.run(self.process_orders_async(rows))
+
+    async def vat_rates_many_async(self, country_codes):
+        """VAT rate per country code, in order."""
+        return await self.map_async(self.get_vat_rate, country_codes)
+
+    def vat_rates_many(self, country_codes):
+        return asyncio.run(self.vat_rates_many_async(country_codes))
@@ -1,10 +1,10 @@
 # client.py
-from zeep import Client
+from api_client import ApiClient
 
-main = Client(wsdl="http://localhost:8000/?wsdl")
+api = ApiClient(main="http://localhost:8000", micro="http://localhost:8001")
 
 # Task Service orchestrates other services
-summary = main.service.process_order(
+summary = api.process_order(
     "  Josh Groban  ",      # will be normalized by Utility called inside Entity
     "Widget-Pro",
     3,
@@ -15,11 +15,22 @@ summary = main.service.process_order(
 print("OrderSummary:")
 print(summary)
 
+# Bulk: submit a batch of orders, several calls in flight at once
+rows = [{"customer_name": name, "product": "Widget-Lite", "qty": qty, "unit_price": 9.99,
+         "ship_to_country": country, "est_weight_kg": 0.5 * qty}
+        for name, qty, country in [("ada lovelace", 1, "GB"), ("alan turing", 2, "GB"),
+                                   ("grace hopper", 4, "US"), ("josh groban", 1, "ID")]]
+print("\nBatch orders:")
+for row, s in zip(rows, api.process_orders(rows)):
+    print(row["customer_name"], s if isinstance(s, Exception) else (s.order_id, s.total))
+
 # Inspect the created resources via the Entity Service
 print("\nAll customers:")
-for c in main.service.list_customers():
+for c in api.list_customers():
     print(c.id, c.name)
 
 print("\nAll orders:")
-for o in main.service.list_orders():
+for o in api.list_orders():
     print(o.id, o.customer_id, o.product, o.qty, o.unit_price, o.subtotal, o.tax, o.shipping, o.total)
+
+api.close()
@@ -5,8 +5,9 @@ from spyne import ComplexModel
 from spyne.protocol.soap import Soap11
 from spyne.server.wsgi import WsgiApplication
 
-# Use zeep to call the separate microservice
-from zeep import Client as ZeepClient
+# Use zeep to call the separate microservice (replicas balanced by micro_pool)
+from micro_pool import MicroPool, zeep_service
+import arrow_export
 
 # ------------------------
 # In-memory "database"
@@ -128,7 +129,10 @@ class EntityService(ServiceBase):
 # Task Service (Business Process Orchestration)
 # Calls Entity + Utility + external Microservice (SOAP).
 # ------------------------
-MICRO_WSDL = "http://localhost:8001/?wsdl"
+MICRO_URLS = ["http://localhost:8001"]   # micro replicas, e.g. add "http://localhost:8011"
+MICRO_HEDGE = True                        # VAT / shipping quotes are idempotent
+MICRO_TIMEOUT = 5
+MICRO = MicroPool(MICRO_URLS, hedge=MICRO_HEDGE)
 
 class TaskService(ServiceBase):
     @rpc(Unicode, Unicode, Integer, Float, Unicode, Float, _returns=OrderSummary)
@@ -150,9 +154,10 @@ class TaskService(ServiceBase):
         order = EntityService.get_order(ctx, order_id)
 
         # 3) micro: call external SOAP for VAT + shipping
-        micro = ZeepClient(wsdl=MICRO_WSDL)
-        vat_rate = micro.service.get_vat_rate((ship_to_country or ""))
-        shipping = micro.service.get_shipping_quote(float(est_weight_kg or 0.0))
+        vat_rate = MICRO.call(lambda url, timeout: zeep_service(url, timeout).get_vat_rate((ship_to_country or "")),
+                              MICRO_TIMEOUT, idempotent=True)
+        shipping = MICRO.call(lambda url, timeout: zeep_service(url, timeout).get_shipping_quote(float(est_weight_kg or 0.0)),
+                              MICRO_TIMEOUT, idempotent=True)
 
         tax = round(order.subtotal * float(vat_rate or 0.0), 2)
         total = round(order.subtotal + tax + float(shipping or 0.0), 2)
@@ -190,8 +195,31 @@ app = Application(
 
 wsgi_app = WsgiApplication(app)
 
+# ------------------------
+# Columnar export (see arrow_export.py)
+# GET /export/orders[?format=parquet] is plain HTTP next to the SOAP endpoint:
+# every order as Arrow IPC record batches (or a Parquet file), built
+# EXPORT_CHUNK_ROWS orders at a time instead of one list_orders envelope.
+# ------------------------
+ORDER_ARROW_FIELDS = [("id", "int64"), ("customer_id", "int64"), ("product", "string"), ("qty", "int32"),
+                      ("unit_price", "float64"), ("subtotal", "float64"), ("tax", "float64"),
+                      ("shipping", "float64"), ("total", "float64")]
+EXPORT_CHUNK_ROWS = arrow_export.CHUNK_ROWS
+
+def order_chunks():
+    ids = list(_orders)   # orders placed during the export are left out
+    for i in range(0, len(ids), EXPORT_CHUNK_ROWS):
+        orders = [_orders.get(oid) for oid in ids[i:i + EXPORT_CHUNK_ROWS]]
+        yield [tuple(o[name] for name, _ in ORDER_ARROW_FIELDS) for o in orders if o]
+
+def main_app(environ, start_response):
+    """SOAP on every path except GET /export/orders."""
+    if environ.get("REQUEST_METHOD") == "GET" and environ.get("PATH_INFO") == "/export/orders":
+        return arrow_export.wsgi_export(environ, start_response, "orders", ORDER_ARROW_FIELDS, order_chunks)
+    return wsgi_app(environ, start_response)
+
 if __name__ == "__main__":
-    server = make_server("0.0.0.0", 8000, wsgi_app)
+    server = make_server("0.0.0.0", 8000, main_app)
     print("Main SOAP server on http://localhost:8000  (WSDL at ?wsdl)")
     print("Services: EntityService, UtilityService, TaskService")
     server.serve_forever()
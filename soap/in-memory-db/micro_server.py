@@ -1,4 +1,5 @@
 # micro_server.py
+import sys
 from wsgiref.simple_server import make_server
 from spyne import Application, rpc, ServiceBase, Unicode, Float
 from spyne.protocol.soap import Soap11
@@ -28,6 +29,7 @@ micro_app = Application(
 )
 
 if __name__ == "__main__":
-    server = make_server("0.0.0.0", 8001, WsgiApplication(micro_app))
-    print("Micro SOAP server on http://localhost:8001  (WSDL at ?wsdl)")
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8001   # e.g. a second replica: python micro_server.py 8011
+    server = make_server("0.0.0.0", port, WsgiApplication(micro_app))
+    print(f"Micro SOAP server on http://localhost:{port}  (WSDL at ?wsdl)")
     server.serve_forever()
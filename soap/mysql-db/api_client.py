@@ -0,0 +1,174 @@
+# api_client.py (SOAP)
+# Client library for the main and micro SOAP services, for scripts and batch jobs.
+#
+#   api = ApiClient()                                   # localhost:8000 / :8001
+#   res = api.onboard("S9009", "alice smith", "Inf. Sys.", 0, "CS-909")
+#   results = api.onboard_many(rows)                    # same order as rows
+#
+# Each service gets one zeep Client, so its WSDL is fetched and parsed once
+# (the micro one on first use), and all calls share one requests.Session whose
+# connection pool holds `concurrency` keep-alive connections. The *_many
+# helpers schedule their calls on an asyncio loop with a semaphore of
+# `concurrency` calls in flight (the blocking zeep calls run on a thread pool
+# of that size): a batch costs about len(rows) / concurrency round trips
+# instead of len(rows). The *_many_async forms can be awaited from a running
+# loop. A failed item does not stop the batch: its slot in the result list
+# holds the exception.
+#
+# Transient failures (connection errors, timeouts, HTTP 429/502/503/504 and
+# the Server.Overloaded / Timeout / Unavailable faults) are retried with exponential
+# backoff. Create and task calls carry an IdempotencyHeader key, the same on
+# every retry, so a retried call is not run twice by the server.
+import asyncio
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from zeep import Client
+from zeep.exceptions import Fault, TransportError
+from zeep.transports import Transport
+
+MAIN = "http://localhost:8000"
+MICRO = "http://localhost:8001"
+TNS = "urn:examples.main"
+RETRY_STATUS = (429, 502, 503, 504)
+RETRY_FAULTS = ("Server.Overloaded", "Server.Timeout", "Server.Unavailable")
+TUITION_CHUNK = 10000   # credits per calc_tuition_batch call
+
+def _transient(e):
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(e, TransportError):
+        return e.status_code in RETRY_STATUS
+    if isinstance(e, Fault):
+        return str(e.code or "").endswith(RETRY_FAULTS)
+    return False
+
+class ApiClient:
+    def __init__(self, main=MAIN, micro=MICRO, concurrency=16, timeout=10.0, retries=3, backoff=0.2):
+        self.urls = {"main": main.rstrip("/"), "micro": micro.rstrip("/")}
+        self.concurrency, self.timeout = int(concurrency), float(timeout)
+        self.retries, self.backoff = int(retries), float(backoff)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._exec = None
+
+    def close(self):
+        if self._exec is not None:
+            self._exec.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- transport ----
+    def client(self, which):
+        """The zeep Client of "main" or "micro" (WSDL loaded on first use, then shared)."""
+        with self._lock:
+            client = self._clients.get(which)
+            if client is None:
+                transport = Transport(session=self.session, timeout=self.timeout, operation_timeout=self.timeout)
+                client = self._clients[which] = Client(wsdl=f"{self.urls[which]}/?wsdl", transport=transport)
+            return client
+
+    def _call(self, which, op, *args, idempotent_key=False):
+        client = self.client(which)
+        kw = {}
+        if idempotent_key:
+            header = client.get_element(f"{{{TNS}}}IdempotencyHeader")
+            kw["_soapheaders"] = [header(key=uuid.uuid4().hex)]
+        for attempt in range(self.retries + 1):
+            try:
+                return getattr(client.service, op)(*args, **kw)
+            except Exception as e:
+                if attempt == self.retries or not _transient(e):
+                    raise
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    # ---- entity ----
+    def create_student(self, ID, name, dept_name=None, tot_cred=0):
+        return self._call("main", "create_student", ID, name, dept_name, tot_cred, idempotent_key=True)
+
+    def get_student(self, ID):
+        """Student, or None when there is no such student."""
+        s = self._call("main", "get_student", ID)
+        return None if s.ID == "NOT_FOUND" else s
+
+    def list_students(self):
+        return self._call("main", "list_students") or []
+
+    def create_course(self, course_id, title, dept_name=None, credits=0):
+        return self._call("main", "create_course", course_id, title, dept_name, credits, idempotent_key=True)
+
+    def get_course(self, course_id):
+        """Course, or None when there is no such course."""
+        c = self._call("main", "get_course", course_id)
+        return None if c.course_id == "NOT_FOUND" else c
+
+    def list_courses(self, dept_name=None, min_credits=None, after=None, limit=None):
+        """One page: .items and .next_after (empty on the last page)."""
+        return self._call("main", "list_courses", dept_name, min_credits, after, limit)
+
+    # ---- task ----
+    def onboard(self, student_id, name, dept_name=None, init_credits=0, course_id=""):
+        """OnboardResult (success, normalized_name, tuition_estimate, message)."""
+        return self._call("main", "onboard_student_into_course", student_id, name, dept_name,
+                          init_credits, course_id, idempotent_key=True)
+
+    # ---- policy (micro) ----
+    def max_credits(self):
+        return self._call("micro", "max_credits")
+
+    def calc_tuition(self, credits):
+        return self._call("micro", "calc_tuition", credits)
+
+    # ---- bulk ----
+    def _executor(self):
+        if self._exec is None:
+            self._exec = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="api")
+        return self._exec
+
+    async def map_async(self, fn, items):
+        """[fn(item)] with at most `concurrency` calls in flight; exceptions are returned, not raised."""
+        loop = asyncio.get_running_loop()
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(item):
+            async with sem:
+                try:
+                    return await loop.run_in_executor(self._executor(), fn, item)
+                except Exception as e:
+                    return e
+        return await asyncio.gather(*(one(item) for item in items))
+
+    async def onboard_many_async(self, rows):
+        """rows: dicts with the onboard() arguments (student_id, name, dept_name, init_credits, course_id)."""
+        return await self.map_async(lambda row: self.onboard(**row), rows)
+
+    def onboard_many(self, rows):
+        return asyncio.run(self.onboard_many_async(rows))
+
+    async def tuition_many_async(self, credits):
+        """Tuition per credit count, in order (calc_tuition_batch, TUITION_CHUNK values per call)."""
+        credits = list(credits)
+        chunks = [credits[i:i + TUITION_CHUNK] for i in range(0, len(credits), TUITION_CHUNK)]
+        parts = await self.map_async(
+            lambda chunk: self._call("micro", "calc_tuition_batch", {"integer": chunk}) or [], chunks)
+        for part in parts:
+            if isinstance(part, Exception):
+                raise part
+        return [t for part in parts for t in part]
+
+    def tuition_many(self, credits):
+        return asyncio.run(self.tuition_many_async(credits))
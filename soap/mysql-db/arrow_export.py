@@ -0,0 +1,126 @@
+# arrow_export.py
+# Columnar bulk export: row chunks -> Arrow IPC stream or Parquet file.
+#
+#   GET /export/<table>                  Arrow IPC stream (application/vnd.apache.arrow.stream)
+#   GET /export/<table>?format=parquet   Parquet file
+#
+# The server passes an iterator of row chunks (lists of tuples: fetchmany()
+# on an unbuffered cursor, or slices of an in-memory store). Each chunk
+# becomes one record batch that is written out and dropped before the next
+# chunk is read, so an export holds one chunk in memory whatever the table
+# size, and the client receives batches as they are produced:
+#
+#   table = pyarrow.ipc.open_stream(requests.get(url, stream=True).raw).read_all()
+#
+# Arrow columns are loaded as they are (no text to parse), unlike the JSON /
+# SOAP XML listings. Parquet writes its footer last, so that format is built
+# in a temporary file (one row group per chunk) and sent from there.
+#
+# pyarrow is optional: without it available() is False and the export
+# endpoints answer 501.
+import os
+import tempfile
+from urllib.parse import parse_qs
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+CHUNK_ROWS = 10000
+SEND_BYTES = 1 << 20   # Parquet file read size while sending
+FORMATS = {"arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+           "parquet": ("application/vnd.apache.parquet", "parquet")}   # format -> (mimetype, file extension)
+
+def available():
+    return pa is not None
+
+def schema(fields):
+    """fields: [(column, pyarrow type name)], e.g. [("ID", "string"), ("tot_cred", "int32")]."""
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in fields])
+
+def fetch_chunks(cur, size=CHUNK_ROWS):
+    """Row chunks from an executed cursor, `size` rows at a time."""
+    while True:
+        rows = cur.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+def _batch(sch, rows):
+    cols = list(zip(*rows))
+    return pa.RecordBatch.from_arrays([pa.array(col, type=f.type) for col, f in zip(cols, sch)], schema=sch)
+
+class _Sink:
+    """Output for the IPC writer: keeps what was written until take()."""
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        out, self.parts = b"".join(self.parts), []
+        return out
+
+def ipc_stream(sch, chunks):
+    """Arrow IPC stream bytes: the schema, one record batch per chunk, end of stream."""
+    sink = _Sink()
+    writer = pa.ipc.new_stream(sink, sch)
+    yield sink.take()   # schema first, so the reader can start
+    for rows in chunks:
+        if rows:
+            writer.write_batch(_batch(sch, rows))
+            yield sink.take()
+    writer.close()
+    yield sink.take()
+
+def parquet_file(sch, chunks):
+    """Parquet file bytes, built in a temporary file (one row group per chunk)."""
+    fd, path = tempfile.mkstemp(suffix=".parquet")
+    os.close(fd)
+    try:
+        with pq.ParquetWriter(path, sch) as writer:
+            for rows in chunks:
+                if rows:
+                    writer.write_table(pa.Table.from_batches([_batch(sch, rows)]))
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(SEND_BYTES)
+                if not data:
+                    return
+                yield data
+    finally:
+        os.remove(path)
+
+def encode(fmt, fields, chunks):
+    """(mimetype, file extension, bytes iterator) for `fmt` in FORMATS."""
+    mimetype, ext = FORMATS[fmt]
+    sch = schema(fields)
+    body = parquet_file(sch, chunks) if fmt == "parquet" else ipc_stream(sch, chunks)
+    return mimetype, ext, body
+
+# ---- SOAP flavors (plain WSGI next to the spyne app) ----
+def wsgi_export(environ, start_response, table, fields, chunks):
+    """Answer GET /export/<table>[?format=parquet]; chunks() -> row chunk iterator."""
+    fmt = parse_qs(environ.get("QUERY_STRING", "")).get("format", ["arrow"])[0]
+    if fmt not in FORMATS:
+        start_response("400 Bad Request", [("Content-Type", "text/plain")])
+        return [f"format must be one of {', '.join(FORMATS)}".encode()]
+    if not available():
+        start_response("501 Not Implemented", [("Content-Type", "text/plain")])
+        return [b"pyarrow is not installed"]
+    mimetype, ext, body = encode(fmt, fields, chunks())
+    start_response("200 OK", [("Content-Type", mimetype),
+                              ("Content-Disposition", f'attachment; filename="{table}.{ext}"')])
+    return body
@@ -0,0 +1,258 @@
+# bulk_load.py
+# Capacity-test loader: generates synthetic department / classroom / course /
+# section / student / takes rows (plus the section_seats and student_summary
+# aggregates the servers maintain) and streams them into the database from
+# db.properties, then reports rows/sec per table.
+#   python bulk_load.py --students 1000000 --courses 2000
+#   python bulk_load.py --students 5000000 --method infile   # needs local_infile=ON on the server
+#   python bulk_load.py --clean                              # remove synthetic rows only
+#
+# Synthetic keys never collide with data.sql or IDs accepted by the servers
+# (letter + 4 digits): departments "Bulk Dept NNN", building "Bulk Hall",
+# courses "QNNN-NNN", student IDs = 4 base36 chars + a letter (up to ~43M).
+# Rows are written with foreign_key_checks/unique_checks off and a commit per
+# batch; the generator itself keeps every reference and aggregate consistent.
+# Same --seed => same rows, and INSERT IGNORE makes a re-run a no-op.
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import mysql.connector
+
+def load_db_config(filename="db.properties"):
+    cfg = {}
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, value = line.split("=", 1)
+            cfg[key.strip()] = value.strip()
+    return cfg
+
+TABLES = {   # load order; column lists as in data.sql
+    "department": ("dept_name", "building", "budget"),
+    "classroom": ("building", "room_number", "capacity"),
+    "course": ("course_id", "title", "dept_name", "credits"),
+    "section": ("course_id", "sec_id", "semester", "year", "building", "room_number", "time_slot_id"),
+    "student": ("ID", "name", "dept_name", "tot_cred"),
+    "takes": ("ID", "course_id", "sec_id", "semester", "year", "grade"),
+    "student_summary": ("ID", "enrolled_cred", "graded_cred", "grade_points"),
+    "section_seats": ("course_id", "sec_id", "semester", "year", "capacity", "taken"),
+}
+BATCH_DEFAULT = {"insert": 2000, "infile": 100000}
+
+BULK_BUILDING = "Bulk Hall"
+SEMESTERS = ("Fall", "Spring", "Summer")
+TIME_SLOTS = "ABCDEFGH"   # time_slot ids shipped in data.sql
+# same scale as main_server.GRADE_POINTS
+GRADE_POINTS = {"A+": 4.0, "A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "B-": 2.7,
+                "C+": 2.3, "C": 2.0, "C-": 1.7, "D+": 1.3, "D": 1.0, "F": 0.0}
+GRADES = tuple(GRADE_POINTS)
+FIRST = ("Alice", "Bob", "Carol", "David", "Erin", "Farid", "Grace", "Hiro", "Ines", "Jon",
+         "Kemal", "Lena", "Mei", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tomas")
+LAST = ("Smith", "Tanaka", "Garcia", "Nguyen", "Kowalski", "Okafor", "Silva", "Chen",
+        "Muller", "Rossi", "Haddad", "Ivanova", "Brown", "Sato", "Novak", "Dubois")
+
+B36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MAX_STUDENTS = 36 ** 4 * 26
+
+def student_id(i):
+    """0 -> '0000A': 4 base36 chars + a letter, so it is never letter + 4 digits."""
+    head, tail = divmod(i, 26)
+    out = ""
+    for _ in range(4):
+        head, d = divmod(head, 36)
+        out = B36[d] + out
+    return out + chr(65 + tail)
+
+def course_id(c):
+    return f"Q{c // 1000:03d}-{c % 1000:03d}"
+
+class Loader:
+    """Buffers rows per table and writes each full buffer as one statement + commit."""
+    def __init__(self, conn, method, batch):
+        self.conn, self.cur = conn, conn.cursor()
+        self.method, self.batch = method, batch
+        self.buf = {t: [] for t in TABLES}
+        self.rows = dict.fromkeys(TABLES, 0)
+        self.secs = dict.fromkeys(TABLES, 0.0)
+
+    def add(self, table, row):
+        buf = self.buf[table]
+        buf.append(row)
+        if len(buf) >= self.batch:
+            self.flush(table)
+
+    def flush(self, table):
+        rows = self.buf[table]
+        if not rows:
+            return
+        self.buf[table] = []
+        t0 = time.perf_counter()
+        if self.method == "infile":
+            self._load_infile(table, rows)
+        else:
+            self._insert(table, rows)
+        self.conn.commit()
+        self.secs[table] += time.perf_counter() - t0
+        self.rows[table] += len(rows)
+
+    def flush_all(self):
+        for table in TABLES:
+            self.flush(table)
+
+    def _insert(self, table, rows):
+        # one multi-row INSERT per batch (executemany would not rewrite INSERT IGNORE)
+        cols = TABLES[table]
+        one = "(" + ", ".join(["%s"] * len(cols)) + ")"
+        sql = f"INSERT IGNORE INTO {table} ({', '.join(cols)}) VALUES " + ", ".join([one] * len(rows))
+        self.cur.execute(sql, [v for r in rows for v in r])
+
+    def _load_infile(self, table, rows):
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf-8", newline="\n") as f:
+            for r in rows:
+                f.write("\t".join(r"\N" if v is None else str(v) for v in r) + "\n")
+        try:
+            self.cur.execute(
+                f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {table} "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(TABLES[table])})",
+                (f.name,),
+            )
+        finally:
+            os.unlink(f.name)
+
+def generate(ld, args, rng):
+    depts = [f"Bulk Dept {d:03d}" for d in range(args.departments)]
+    for d in depts:
+        ld.add("department", (d, BULK_BUILDING, rng.randrange(50000, 500000)))
+
+    n_sections = args.courses * args.sections_per_course
+    per_section = -(-args.students * args.takes_per_student // n_sections)
+    room_cap = min(9999, max(10, per_section + per_section // 4))   # classroom.capacity is decimal(4,0)
+    rooms = [str(r + 1) for r in range(args.rooms)]
+    for r in rooms:
+        ld.add("classroom", (BULK_BUILDING, r, room_cap))
+
+    sections = []   # (course_id, sec_id, semester, year, credits)
+    for c in range(args.courses):
+        cid, credits = course_id(c), rng.choice((2, 3, 3, 4, 4))
+        ld.add("course", (cid, f"Synthetic Course {c}", depts[c % len(depts)], credits))
+        for s in range(args.sections_per_course):
+            key = (cid, str(s + 1), SEMESTERS[s % len(SEMESTERS)], args.year + s // len(SEMESTERS))
+            ld.add("section", key + (BULK_BUILDING, rooms[len(sections) % len(rooms)], rng.choice(TIME_SLOTS)))
+            sections.append(key + (credits,))
+
+    taken = [0] * len(sections)
+    per_student = min(args.takes_per_student, len(sections))
+    t0 = time.perf_counter()
+    for i in range(args.students):
+        sid = student_id(i)
+        enrolled = graded = earned = 0
+        points = 0.0
+        for k in rng.sample(range(len(sections)), per_student):
+            cid, sec_id, semester, year, credits = sections[k]
+            grade = rng.choice(GRADES) if rng.random() < args.graded else None
+            ld.add("takes", (sid, cid, sec_id, semester, year, grade))
+            taken[k] += 1
+            enrolled += credits
+            if grade:
+                graded += credits
+                points += GRADE_POINTS[grade] * credits
+                if grade != "F":
+                    earned += credits
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+        ld.add("student", (sid, name, rng.choice(depts), min(earned, 999)))
+        ld.add("student_summary", (sid, enrolled, graded, round(points, 2)))
+        if args.progress and (i + 1) % args.progress == 0:
+            dt = time.perf_counter() - t0
+            print(f"  {i + 1} students ({(i + 1) / dt:.0f}/s)", flush=True)
+
+    for k, (cid, sec_id, semester, year, _) in enumerate(sections):
+        ld.add("section_seats", (cid, sec_id, semester, year, max(room_cap, taken[k]), taken[k]))
+    ld.flush_all()
+
+def delete_chunked(conn, cur, sql, chunk=10000):
+    total = 0
+    while True:
+        cur.execute(f"{sql} LIMIT {chunk}")
+        conn.commit()
+        total += cur.rowcount
+        if cur.rowcount < chunk:
+            return total
+
+def clean(conn):
+    """Remove synthetic rows (FK checks on, so takes/section/seats/summary cascade)."""
+    cur = conn.cursor()
+    for label, sql in [
+        ("student", "DELETE FROM student WHERE ID REGEXP '[A-Z]$'"),
+        ("course", "DELETE FROM course WHERE course_id LIKE 'Q___-___'"),
+        ("classroom", f"DELETE FROM classroom WHERE building='{BULK_BUILDING}'"),
+        ("department", "DELETE FROM department WHERE dept_name LIKE 'Bulk Dept %'"),
+    ]:
+        t0 = time.perf_counter()
+        n = delete_chunked(conn, cur, sql)
+        print(f"deleted {n} {label} rows in {time.perf_counter() - t0:.1f}s")
+    cur.close()
+
+def main():
+    ap = argparse.ArgumentParser(description="Load synthetic university data for capacity tests.")
+    ap.add_argument("--students", type=int, default=100000)
+    ap.add_argument("--departments", type=int, default=50)
+    ap.add_argument("--courses", type=int, default=2000)
+    ap.add_argument("--sections-per-course", type=int, default=2)
+    ap.add_argument("--takes-per-student", type=int, default=6)
+    ap.add_argument("--rooms", type=int, default=200)
+    ap.add_argument("--year", type=int, default=2025, help="first term year of the synthetic sections")
+    ap.add_argument("--graded", type=float, default=0.8, help="fraction of takes rows with a grade")
+    ap.add_argument("--method", choices=sorted(BATCH_DEFAULT), default="insert",
+                    help="insert = batched multi-row INSERT; infile = LOAD DATA LOCAL INFILE")
+    ap.add_argument("--batch", type=int, help="rows per statement/commit (default depends on --method)")
+    ap.add_argument("--seed", type=int, default=2009)
+    ap.add_argument("--progress", type=int, default=100000, help="print progress every N students (0 = off)")
+    ap.add_argument("--clean", action="store_true", help="delete previously loaded synthetic rows and exit")
+    ap.add_argument("--config", default="db.properties")
+    args = ap.parse_args()
+    if not 0 < args.students <= MAX_STUDENTS:
+        ap.error(f"--students must be 1..{MAX_STUDENTS}")
+    if not 0 < args.courses <= 1000000:
+        ap.error("--courses must be 1..1000000")
+
+    cfg = load_db_config(args.config)
+    conn = mysql.connector.connect(
+        host=cfg["DB_HOST"], user=cfg["DB_USER"], password=cfg["DB_PASS"], database=cfg["DB_NAME"],
+        allow_local_infile=args.method == "infile",
+    )
+    try:
+        if args.clean:
+            clean(conn)
+            return
+        cur = conn.cursor()
+        # InnoDB ignores ALTER TABLE ... DISABLE KEYS; skipping FK and unique
+        # probes (and committing per batch) is what makes the bulk path cheap.
+        cur.execute("SET SESSION foreign_key_checks = 0")
+        cur.execute("SET SESSION unique_checks = 0")
+        ld = Loader(conn, args.method, args.batch or BATCH_DEFAULT[args.method])
+        t0 = time.perf_counter()
+        generate(ld, args, random.Random(args.seed))
+        wall = time.perf_counter() - t0
+        cur.execute("SET SESSION foreign_key_checks = 1")
+        cur.execute("SET SESSION unique_checks = 1")
+        cur.execute("ANALYZE TABLE " + ", ".join(TABLES))
+        cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+
+    total = sum(ld.rows.values())
+    print(f"{'table':<16}{'rows':>12}{'write s':>10}{'rows/s':>12}")
+    for table in TABLES:
+        rows, secs = ld.rows[table], ld.secs[table]
+        print(f"{table:<16}{rows:>12}{secs:>10.1f}{(rows / secs if secs else 0):>12.0f}")
+    print(f"total {total} rows in {wall:.1f}s wall ({total / wall:.0f} rows/s incl. generation), "
+          f"method={args.method}, batch={ld.batch}")
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,45 @@
 # client.py
-from zeep import Client
+from api_client import ApiClient
 
-# Connect to both services
-task = Client(wsdl="http://localhost:8000/?wsdl")    # TaskService + Utility/Entity behind it
-policy = Client(wsdl="http://localhost:8001/?wsdl")  # TuitionPolicyService (non-breakable)
+# Connect to both services (one zeep client per WSDL, shared by every call)
+api = ApiClient(main="http://localhost:8000",    # TaskService + Utility/Entity behind it
+                micro="http://localhost:8001")   # TuitionPolicyService (non-breakable)
 
 # --- Prepare a course via EntityService (exposed on main_server but not the focus) ---
 print("== SETUP: Create course CS-909 ==")
-print(task.service.create_course("CS-909", "Intro to Database", "Inf. Sys.", 3))
+print(api.create_course("CS-909", "Intro to Database", "Inf. Sys.", 3))
 
 # --- Business process: Onboard a student into a course (TaskService) ---
 print("\n== TASK: Onboard student into course ==")
-res = task.service.onboard_student_into_course("S9009", "  alice smith ", "Inf. Sys.", 0, "CS-909")
+res = api.onboard("S9009", "  alice smith ", "Inf. Sys.", 0, "CS-909")
 print("success:", res.success)
 print("normalized_name:", res.normalized_name)
 print("tuition_estimate:", res.tuition_estimate)
 print("message:", res.message)
 
+# --- Bulk: onboard a batch, several calls in flight at once ---
+print("\n== TASK: Onboard a batch of students ==")
+rows = [{"student_id": f"S90{i}", "name": f"  student {i} ", "dept_name": "Inf. Sys.",
+         "init_credits": 0, "course_id": "CS-909"} for i in range(10, 15)]
+for row, r in zip(rows, api.onboard_many(rows)):
+    print(row["student_id"], r if isinstance(r, Exception) else (r.success, r.message))
+
 # --- Demonstrate microservice's fixed rules independently (optional) ---
 print("\n== POLICY: Fixed rules ==")
-print("Max credits allowed:", policy.service.max_credits())
-print("Tuition for 3 credits:", policy.service.calc_tuition(3))
+print("Max credits allowed:", api.max_credits())
+print("Tuition for 3 credits:", api.calc_tuition(3))
+print("Tuition for 3, 4 and 30 credits (batch):", api.tuition_many([3, 4, 30]))
 
 # --- Show that entity data was actually created (optional inspection) ---
 print("\n== ENTITY: List students after onboarding ==")
-for s in task.service.list_students():
+for s in api.list_students():
     print(s.ID, s.name, s.dept_name, s.tot_cred)
 
 print("\n== ENTITY: Get course CS-909 ==")
-c = task.service.get_course("CS-909")
-print(c.course_id, c.title, c.dept_name, c.credits)
+c = api.get_course("CS-909")
+if c is None:
+    print("NOT_FOUND")
+else:
+    print(c.course_id, c.title, c.dept_name, c.credits)
+
+api.close()
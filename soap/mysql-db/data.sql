@@ -54,7 +54,7 @@ CREATE TABLE `course` (
   `dept_name` varchar(20) DEFAULT NULL,
   `credits` decimal(2,0) DEFAULT NULL,
   PRIMARY KEY (`course_id`),
-  KEY `dept_name` (`dept_name`),
+  KEY `dept_name` (`dept_name`,`course_id`,`credits`),
   CONSTRAINT `course_ibfk_1` FOREIGN KEY (`dept_name`) REFERENCES `department` (`dept_name`) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -140,6 +140,26 @@ LOCK TABLES `section` WRITE;
 INSERT INTO `section` VALUES ('BIO-101','1','Summer',2009,'Painter','514','B'),('BIO-301','1','Summer',2010,'Painter','514','A'),('CS-101','1','Fall',2009,'Packard','101','H'),('CS-101','1','Spring',2010,'Packard','101','F'),('CS-190','1','Spring',2009,'Taylor','3128','E'),('CS-190','2','Spring',2009,'Taylor','3128','A'),('CS-315','1','Spring',2010,'Watson','120','D'),('CS-319','1','Spring',2010,'Watson','100','B'),('CS-319','2','Spring',2010,'Taylor','3128','C'),('CS-347','1','Fall',2009,'Taylor','3128','A'),('EE-181','1','Spring',2009,'Taylor','3128','C'),('FIN-201','1','Spring',2010,'Packard','101','B'),('HIS-351','1','Spring',2010,'Painter','514','C'),('MU-199','1','Spring',2010,'Packard','101','D'),('PHY-101','1','Fall',2009,'Watson','100','A');
 /*!40000 ALTER TABLE `section` ENABLE KEYS */;
 UNLOCK TABLES;
+DROP TABLE IF EXISTS `section_seats`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `section_seats` (
+  `course_id` varchar(8) NOT NULL,
+  `sec_id` varchar(8) NOT NULL,
+  `semester` varchar(6) NOT NULL,
+  `year` decimal(4,0) NOT NULL,
+  `capacity` int(11) NOT NULL,
+  `taken` int(11) NOT NULL DEFAULT '0',
+  PRIMARY KEY (`course_id`,`sec_id`,`semester`,`year`),
+  CONSTRAINT `section_seats_ibfk_1` FOREIGN KEY (`course_id`, `sec_id`, `semester`, `year`) REFERENCES `section` (`course_id`, `sec_id`, `semester`, `year`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+LOCK TABLES `section_seats` WRITE;
+/*!40000 ALTER TABLE `section_seats` DISABLE KEYS */;
+INSERT INTO `section_seats` VALUES ('BIO-101','1','Summer',2009,10,1),('BIO-301','1','Summer',2010,10,1),('CS-101','1','Fall',2009,500,6),('CS-101','1','Spring',2010,500,1),('CS-190','1','Spring',2009,70,0),('CS-190','2','Spring',2009,70,2),('CS-315','1','Spring',2010,50,2),('CS-319','1','Spring',2010,30,1),('CS-319','2','Spring',2010,70,1),('CS-347','1','Fall',2009,70,2),('EE-181','1','Spring',2009,70,1),('FIN-201','1','Spring',2010,500,1),('HIS-351','1','Spring',2010,10,1),('MU-199','1','Spring',2010,500,1),('PHY-101','1','Fall',2009,30,1);
+/*!40000 ALTER TABLE `section_seats` ENABLE KEYS */;
+UNLOCK TABLES;
 DROP TABLE IF EXISTS `student`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!40101 SET character_set_client = utf8 */;
@@ -159,6 +179,24 @@ LOCK TABLES `student` WRITE;
 INSERT INTO `student` VALUES ('00128','Zhang','Comp. Sci.',102),('12345','Shankar','Comp. Sci.',32),('19991','Brandt','History',80),('23121','Chavez','Finance',110),('44553','Peltier','Physics',56),('45678','Levy','Physics',46),('54321','Williams','Comp. Sci.',54),('55739','Sanchez','Music',38),('70557','Snow','Physics',0),('76543','Brown','Comp. Sci.',58),('76653','Aoi','Elec. Eng.',60),('98765','Bourikas','Elec. Eng.',98),('98988','Tanaka','Biology',120);
 /*!40000 ALTER TABLE `student` ENABLE KEYS */;
 UNLOCK TABLES;
+DROP TABLE IF EXISTS `student_summary`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `student_summary` (
+  `ID` varchar(5) NOT NULL,
+  `enrolled_cred` int(11) NOT NULL DEFAULT '0',
+  `graded_cred` int(11) NOT NULL DEFAULT '0',
+  `grade_points` decimal(8,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (`ID`),
+  CONSTRAINT `student_summary_ibfk_1` FOREIGN KEY (`ID`) REFERENCES `student` (`ID`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+LOCK TABLES `student_summary` WRITE;
+/*!40000 ALTER TABLE `student_summary` DISABLE KEYS */;
+INSERT INTO `student_summary` VALUES ('00128',7,7,27.10),('12345',14,14,48.00),('19991',3,3,9.00),('23121',3,3,6.90),('44553',4,4,10.80),('45678',11,11,22.20),('54321',8,8,28.00),('55739',3,3,11.10),('76543',7,7,28.00),('76653',3,3,6.00),('98765',7,7,15.80),('98988',8,4,16.00);
+/*!40000 ALTER TABLE `student_summary` ENABLE KEYS */;
+UNLOCK TABLES;
 DROP TABLE IF EXISTS `takes`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!40101 SET character_set_client = utf8 */;
@@ -0,0 +1,127 @@
+# db_router.py
+# Primary / read-replica connection routing.
+#
+#   DB_HOST=...                     primary: every write and the onboarding steps
+#   DB_REPLICAS=host[:port],...     read replicas (same user/password/database)
+#   DB_READ_POLICY=round_robin      or least_latency (lowest EWMA ping time)
+#   DB_READ_YOUR_WRITES=5           seconds a client's reads stay on the primary
+#                                   after it wrote something (0 = off)
+#   DB_POOL_SIZE=32                 idle connections kept per server (db_pool.py)
+#
+# A replica that refuses a connection is skipped for REPLICA_RETRY_SECS; with
+# no usable replica, reads fall back to the primary. Read-your-writes is
+# carried by a cookie holding the time until which the client is pinned;
+# the server sets it after a write and pin_primary() applies it per request.
+# Connections are pooled per server. Under least_latency the EWMA is fed by
+# pinging a checked-out replica connection, at most once per
+# LATENCY_SAMPLE_SECS per replica, so it keeps tracking the replicas after the
+# pools have warmed up without adding a round trip to every read.
+import functools
+import itertools
+import threading
+import time
+
+import mysql.connector
+
+from db_pool import ConnectionPool
+
+RYW_COOKIE = "db_ryw"
+REPLICA_CONNECT_TIMEOUT = 2
+REPLICA_RETRY_SECS = 10.0
+LATENCY_ALPHA = 0.2
+LATENCY_SAMPLE_SECS = 1.0
+
+class Replica:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.latency = None       # EWMA of ping round trip (seconds)
+        self.sampled_at = 0.0
+        self.down_until = 0.0
+        self.pool = None
+
+    def observe(self, seconds):
+        self.latency = seconds if self.latency is None else self.latency + (seconds - self.latency) * LATENCY_ALPHA
+
+    def __str__(self):
+        return f"{self.host}:{self.port}"
+
+def parse_replicas(spec):
+    out = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if item:
+            host, _, port = item.partition(":")
+            out.append(Replica(host, int(port or 3306)))
+    return out
+
+class DBRouter:
+    def __init__(self, cfg):
+        self.base = dict(user=cfg["DB_USER"], password=cfg["DB_PASS"], database=cfg["DB_NAME"])
+        self.primary = dict(self.base, host=cfg["DB_HOST"])
+        self.replicas = parse_replicas(cfg.get("DB_REPLICAS"))
+        self.policy = cfg.get("DB_READ_POLICY", "round_robin")
+        if self.policy not in ("round_robin", "least_latency"):
+            raise ValueError(f"DB_READ_POLICY must be round_robin or least_latency, not {self.policy!r}")
+        self.ryw_secs = float(cfg.get("DB_READ_YOUR_WRITES", 5))
+        size = int(cfg.get("DB_POOL_SIZE", 32))
+        self.pool = ConnectionPool(functools.partial(mysql.connector.connect, **self.primary), size)
+        for r in self.replicas:
+            r.pool = ConnectionPool(functools.partial(self._connect_replica, r), size)
+        self._rr = itertools.count()
+        self._local = threading.local()
+
+    def connect_primary(self):
+        return self.pool.get()
+
+    def connect_read(self):
+        if not self.replicas or getattr(self._local, "pinned", False):
+            return self.connect_primary()
+        for r in self._candidates():
+            try:
+                conn = r.pool.get()
+            except mysql.connector.Error:
+                r.down_until = time.monotonic() + REPLICA_RETRY_SECS
+                continue
+            if self.policy == "least_latency" and time.monotonic() - r.sampled_at >= LATENCY_SAMPLE_SECS:
+                try:
+                    self._sample(r, conn)
+                except mysql.connector.Error:
+                    conn.discard()
+                    r.down_until = time.monotonic() + REPLICA_RETRY_SECS
+                    continue
+            return conn
+        return self.connect_primary()
+
+    def _sample(self, r, conn):
+        r.sampled_at = time.monotonic()
+        t0 = time.perf_counter()
+        conn.ping()
+        r.observe(time.perf_counter() - t0)
+
+    def _connect_replica(self, r):
+        return mysql.connector.connect(host=r.host, port=r.port,
+                                       connection_timeout=REPLICA_CONNECT_TIMEOUT, **self.base)
+
+    def _candidates(self):
+        now = time.monotonic()
+        up = [r for r in self.replicas if r.down_until <= now]
+        if not up:
+            return []
+        if self.policy == "least_latency":
+            return sorted(up, key=lambda r: -1.0 if r.latency is None else r.latency)  # unmeasured first
+        i = next(self._rr) % len(up)
+        return up[i:] + up[:i]
+
+    # ---- read-your-writes ----
+    def pin_primary(self, cookie_value, force=False):
+        """Per request: keep this thread's reads on the primary for write requests
+        (force) or when the client wrote recently (cookie)."""
+        try:
+            recent = bool(self.ryw_secs) and float(cookie_value or 0) > time.time()
+        except ValueError:
+            recent = False
+        self._local.pinned = force or recent
+
+    def write_mark(self):
+        """Cookie value to set after a successful write."""
+        return f"{time.time() + self.ryw_secs:.3f}"
@@ -0,0 +1,77 @@
+# idempotency.py
+# Bounded, TTL'd result cache for Idempotency-Key retries.
+#
+# The first request with a key runs the work and stores its response; a retry
+# with the same key gets that stored response back without touching the DB.
+# A retry that arrives while the first one is still running waits for it
+# (up to `wait` seconds) instead of running the work a second time. Reusing a
+# key for a different request body is reported, not replayed.
+# NOTE: the cache is per process; keys are not shared between replicas.
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+NEW, REPLAY, BUSY, MISMATCH = "new", "replay", "busy", "mismatch"
+
+def fingerprint(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data or b"").hexdigest()
+
+class _Entry:
+    __slots__ = ("fingerprint", "created", "done", "stored", "response")
+
+    def __init__(self, fp):
+        self.fingerprint, self.created = fp, time.monotonic()
+        self.done = threading.Event()
+        self.stored, self.response = False, None
+
+class IdempotencyCache:
+    def __init__(self, maxsize=10000, ttl=86400.0, wait=30.0):
+        self.maxsize, self.ttl, self.wait = int(maxsize), float(ttl), float(wait)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> _Entry, oldest first
+
+    def begin(self, key, fp):
+        """(NEW, None): caller runs the work, then finish()/abort().
+        (REPLAY, response) | (BUSY, None) | (MISMATCH, None) otherwise."""
+        while True:
+            with self._lock:
+                self._expire()
+                entry = self._entries.get(key)
+                if entry is None:
+                    self._entries[key] = _Entry(fp)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+                    return NEW, None
+                if entry.fingerprint != fp:
+                    return MISMATCH, None
+            if not entry.done.wait(self.wait):
+                return BUSY, None
+            if entry.stored:
+                return REPLAY, entry.response
+            # first attempt was aborted (entry removed): try to become the runner
+
+    def finish(self, key, response):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            entry.stored, entry.response = True, response
+            entry.done.set()
+
+    def abort(self, key):
+        """The work failed in a retryable way: forget the key, wake any waiters."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry.created > cutoff:
+                break
+            self._entries.popitem(last=False)
+            entry.done.set()
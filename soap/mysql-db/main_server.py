@@ -1,9 +1,28 @@
 # main_server.py
-from wsgiref.simple_server import make_server
-from spyne import Application, rpc, ServiceBase, Unicode, Integer, Boolean, Float, ComplexModel, Array
+from http.cookies import SimpleCookie
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import make_server, WSGIServer
+from spyne import Application, rpc, ServiceBase, Unicode, Integer, Boolean, Float, ComplexModel, Array, Fault
 from spyne.protocol.soap import Soap11
 from spyne.server.wsgi import WsgiApplication
+import functools
+import random
+import time
 import mysql.connector
+import access_log
+from access_log import timed, log_error
+from db_router import DBRouter, RYW_COOKIE
+from shards import ShardMap, merge_by_id
+from group_commit import GroupCommit
+from prereq_index import PrereqIndex, PrereqCycleError
+from timetable import TimeSlotIndex, Schedule, fmt_minutes
+from name_index import NameIndex
+import idempotency
+from idempotency import IdempotencyCache
+import deadline
+from micro_pool import MicroPool, parse_urls, zeep_service
+from admission import Admission
+import arrow_export
 
 # ---------------------------------------------------
 # Load DB config from external properties file
@@ -20,15 +39,47 @@ def load_db_config(filename="db.properties"):
     return cfg
 
 DB_CONFIG = load_db_config()
+access_log.configure(DB_CONFIG.get("ACCESS_LOG_FILE"), DB_CONFIG.get("ACCESS_LOG_QUEUE", 10000))
+
+DB = DBRouter(DB_CONFIG)
 
 def get_conn():
-    """Create a new database connection using db.properties."""
-    return mysql.connector.connect(
-        host=DB_CONFIG["DB_HOST"],
-        user=DB_CONFIG["DB_USER"],
-        password=DB_CONFIG["DB_PASS"],
-        database=DB_CONFIG["DB_NAME"],
-    )
+    """Pooled connection to the primary database from db.properties."""
+    with timed("db"):
+        return DB.connect_primary()
+
+def get_read_conn():
+    """Connection for reads that may lag slightly (replica, unless pinned to the primary)."""
+    with timed("db"):
+        return DB.connect_read()
+
+SHARDS = ShardMap(DB_CONFIG)   # no shards (student stays in DB_NAME) unless DB_SHARDS is set
+
+def get_student_conn(student_id, read=False):
+    """Connection to the database holding student `student_id` (its shard when sharded)."""
+    if not len(SHARDS):
+        return get_read_conn() if read else get_conn()
+    with timed("db"):
+        return SHARDS.connect_for(student_id)
+
+DB_UNAVAILABLE_ERRNOS = (1040, 1205, 1213, 2002, 2003, 2006, 2013, 2055)   # too many connections, lock wait, deadlock, server gone
+
+def db_unavailable(e):
+    """True when `e` means the database could not answer (down, connection lost, busy), not a bad request."""
+    if isinstance(e, (mysql.connector.InterfaceError, mysql.connector.OperationalError)):
+        return True
+    return getattr(e, "errno", None) in DB_UNAVAILABLE_ERRNOS
+
+def error_status(e):
+    """Status for a failed write: 503 (retry later) when the database was unavailable, else 400."""
+    return 503 if db_unavailable(e) else 400
+
+def raise_if_unavailable(e):
+    """Re-raise a deadline or database-unavailable failure as a fault instead of a False / ERROR result."""
+    if isinstance(e, deadline.DeadlineExceeded):
+        raise e   # Server.Timeout (AdmittedService)
+    if db_unavailable(e):
+        raise Fault("Server.Unavailable", "Database unavailable, retry later")
 
 # ---------------------------------------------------
 # Entities (match DDL.sql shape)
@@ -47,6 +98,88 @@ class Course(ComplexModel):
     dept_name = Unicode
     credits = Integer
 
+# ---------------------------------------------------
+# Admission control (see admission.py)
+#   Per-RPC concurrency limit + bounded wait; overflow gets a fast
+#   Server.Overloaded fault with Retry-After. UtilityService (pure
+#   functions) does not derive from AdmittedService and is never limited.
+# ---------------------------------------------------
+ADMISSION = Admission(
+    initial=DB_CONFIG.get("ADMISSION_LIMIT", 32), max_limit=DB_CONFIG.get("ADMISSION_MAX", 256),
+    queue_size=DB_CONFIG.get("ADMISSION_QUEUE", 64), max_wait=float(DB_CONFIG.get("ADMISSION_WAIT_MS", 500)) / 1000.0,
+)
+
+# Request deadlines (see deadline.py): the X-Request-Timeout-Ms HTTP header
+# or the service default, whichever is shorter, counted from before the
+# admission wait. Calls that run out of time fail with a Server.Timeout fault.
+DEADLINES = deadline.Deadlines(DB_CONFIG.get("DEADLINE_MS"), {
+    "TaskService.*": DB_CONFIG.get("DEADLINE_TASK_MS"),
+    "EntityService.*": DB_CONFIG.get("DEADLINE_ENTITY_MS"),
+})
+
+class AdmittedService(ServiceBase):
+    @classmethod
+    def call_wrapper(cls, ctx, *args, **kwargs):
+        route = f"{ctx.descriptor.service_class.__name__}.{ctx.descriptor.name}"
+        deadline.start(DEADLINES.for_route(route, ctx.transport.req_env.get("HTTP_X_REQUEST_TIMEOUT_MS")))
+        try:
+            lim = ADMISSION.limiter(route)
+            if not lim.acquire():
+                ctx.transport.resp_headers["Retry-After"] = str(ADMISSION.retry_after)
+                raise Fault("Server.Overloaded", f"{route} is busy, retry later")
+            t0 = time.perf_counter()
+            try:
+                deadline.check()
+                return super().call_wrapper(ctx, *args, **kwargs)
+            except deadline.DeadlineExceeded as e:
+                raise Fault("Server.Timeout", str(e))
+            finally:
+                lim.release(time.perf_counter() - t0)
+        finally:
+            deadline.clear()
+
+# ---------------------------------------------------
+# Idempotency (optional SOAP header on Entity/Task calls)
+#   <IdempotencyHeader><key>...</key></IdempotencyHeader>: a retried create or
+#   task call with the same key gets the first call's result back instead of
+#   running again. Calls that raise are not stored, so those stay retryable:
+#   writes that failed because the database was unavailable or the deadline
+#   passed raise Server.Unavailable / Server.Timeout (see raise_if_unavailable)
+#   instead of returning False, so a retry after an outage runs them again.
+# ---------------------------------------------------
+class IdempotencyHeader(ComplexModel):
+    key = Unicode
+
+IDEMPOTENT_METHODS = {"create_student", "create_course", "add_time_slot", "add_prereq",
+                      "onboard_student_into_course", "enroll_student_in_section"}
+IDEMPOTENCY = IdempotencyCache(int(DB_CONFIG.get("IDEMPOTENCY_MAX", 10000)),
+                               float(DB_CONFIG.get("IDEMPOTENCY_TTL", 86400)))
+
+class IdempotentService(AdmittedService):
+    __in_header__ = IdempotencyHeader
+
+    @classmethod
+    def call_wrapper(cls, ctx, *args, **kwargs):
+        name = ctx.descriptor.name
+        key = getattr(ctx.in_header, "key", None)
+        if not key or name not in IDEMPOTENT_METHODS:
+            return super().call_wrapper(ctx, *args, **kwargs)
+        key = (name, key)
+        state, stored = IDEMPOTENCY.begin(key, idempotency.fingerprint(repr(ctx.in_object)))
+        if state == idempotency.MISMATCH:
+            raise Fault("Client.IdempotencyKeyReused", "Idempotency key was already used for a different request")
+        if state == idempotency.BUSY:
+            raise Fault("Client.IdempotencyInProgress", "A request with this idempotency key is still in progress")
+        if state == idempotency.REPLAY:
+            return stored
+        try:
+            out = super().call_wrapper(ctx, *args, **kwargs)
+        except Exception:
+            IDEMPOTENCY.abort(key)
+            raise
+        IDEMPOTENCY.finish(key, out)
+        return out
+
 # ---------------------------------------------------
 # UtilityService: pure functions (no DB)
 # ---------------------------------------------------
@@ -67,91 +200,739 @@ class UtilityService(ServiceBase):
 # ---------------------------------------------------
 # EntityService: minimal DB CRUD (kept small for teaching)
 # ---------------------------------------------------
-class EntityService(ServiceBase):
+class CreditSummary(ComplexModel):
+    ID = Unicode
+    tot_cred = Integer
+    enrolled_cred = Integer
+    graded_cred = Integer
+    gpa = Float
+
+class TranscriptEntry(ComplexModel):
+    course_id = Unicode
+    title = Unicode
+    sec_id = Unicode
+    semester = Unicode
+    year = Integer
+    grade = Unicode
+    credits = Integer
+
+class Transcript(ComplexModel):
+    summary = CreditSummary
+    courses = Array(TranscriptEntry)
+
+class ScheduleConflict(ComplexModel):
+    day = Unicode
+    section_a = Unicode
+    section_b = Unicode
+    start = Unicode
+    end = Unicode
+
+class CoursePage(ComplexModel):
+    items = Array(Course)
+    next_after = Unicode
+
+class NameMatch(ComplexModel):
+    ID = Unicode
+    name = Unicode
+    score = Float
+
+class EntityService(IdempotentService):
     # ---- STUDENTS ----
     @rpc(Unicode, Unicode, Unicode, Integer, _returns=Boolean)
     def create_student(ctx, ID, name, dept_name, tot_cred):
         try:
-            conn = get_conn(); cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO student (ID, name, dept_name, tot_cred) VALUES (%s, %s, %s, %s)",
-                (ID, name, dept_name if dept_name else None, int(tot_cred or 0)),
-            )
-            conn.commit()
+            insert_student(ID, name, dept_name, tot_cred)
+            index_student_name(ID, name)
             return True
         except Exception as e:
-            print("Entity.create_student error:", e)
+            log_error("Entity.create_student", e)
+            raise_if_unavailable(e)
             return False
-        finally:
-            try: cur.close(); conn.close()
-            except: pass
 
     @rpc(Unicode, _returns=Student)
     def get_student(ctx, ID):
         try:
-            conn = get_conn(); cur = conn.cursor(dictionary=True)
-            cur.execute("SELECT ID, name, dept_name, tot_cred FROM student WHERE ID=%s", (ID,))
-            row = cur.fetchone()
+            conn = get_student_conn(ID, read=True)
+            with timed("db"):
+                row = conn.query_one("student_by_id", (ID,))
             if not row:
                 return Student(ID="NOT_FOUND", name="", dept_name="", tot_cred=0)
-            row["tot_cred"] = int(row["tot_cred"] or 0)
-            return Student(**row)
+            ID, name, dept_name, tot_cred = row
+            return Student(ID=ID, name=name, dept_name=dept_name, tot_cred=int(tot_cred or 0))
         except Exception as e:
-            print("Entity.get_student error:", e)
+            log_error("Entity.get_student", e)
             return Student(ID="ERROR", name=str(e), dept_name="", tot_cred=0)
         finally:
-            try: cur.close(); conn.close()
+            try: conn.close()
             except: pass
 
     @rpc(_returns=Array(Student))
     def list_students(ctx):
         out = []
         try:
-            conn = get_conn(); cur = conn.cursor(dictionary=True)
-            cur.execute("SELECT ID, name, dept_name, tot_cred FROM student ORDER BY ID")
-            for r in cur.fetchall():
-                out.append(Student(ID=r["ID"], name=r["name"], dept_name=r["dept_name"], tot_cred=int(r["tot_cred"] or 0)))
+            for ID, name, dept_name, tot_cred in list_students_rows():
+                out.append(Student(ID=ID, name=name, dept_name=dept_name, tot_cred=int(tot_cred or 0)))
         except Exception as e:
-            print("Entity.list_students error:", e)
-        finally:
-            try: cur.close(); conn.close()
-            except: pass
+            log_error("Entity.list_students", e)
         return out
 
+    @rpc(Unicode, Unicode, Integer, _returns=Array(NameMatch))
+    def search_students(ctx, q, mode, limit):
+        """Name search: mode auto (default) | prefix | fuzzy; best matches first."""
+        try:
+            rows = search_student_names(q, mode or "auto", limit or 10)
+        except Exception as e:
+            log_error("Entity.search_students", e)
+            return []
+        return [NameMatch(**r) for r in rows]
+
+    # ---- TRANSCRIPT / CREDITS (served from maintained aggregates) ----
+    @rpc(Unicode, Unicode, Unicode, Unicode, Integer, Unicode, _returns=Boolean)
+    def set_grade(ctx, ID, course_id, sec_id, semester, year, grade):
+        status, msg = set_grade(ID, course_id, sec_id, semester, year or 0, grade)
+        return status == 200
+
+    @rpc(Unicode, _returns=CreditSummary)
+    def get_credit_summary(ctx, ID):
+        try:
+            summary = credit_summary(ID)
+        except Exception as e:
+            log_error("Entity.get_credit_summary", e)
+            return CreditSummary(ID="ERROR", tot_cred=0, enrolled_cred=0, graded_cred=0, gpa=0.0)
+        if summary is None:
+            return CreditSummary(ID="NOT_FOUND", tot_cred=0, enrolled_cred=0, graded_cred=0, gpa=0.0)
+        return CreditSummary(**summary)
+
+    @rpc(Unicode, _returns=Transcript)
+    def get_transcript(ctx, ID):
+        summary = EntityService.get_credit_summary(ctx, ID)
+        if summary.ID in ("NOT_FOUND", "ERROR"):
+            return Transcript(summary=summary, courses=[])
+        try:
+            courses = [TranscriptEntry(**r) for r in transcript_rows(ID)]
+        except Exception as e:
+            log_error("Entity.get_transcript", e)
+            courses = []
+        return Transcript(summary=summary, courses=courses)
+
+    @rpc(Unicode, Unicode, Integer, _returns=Array(ScheduleConflict))
+    def list_schedule_conflicts(ctx, ID, semester, year):
+        try:
+            return [ScheduleConflict(**c) for c in list_schedule_conflicts(ID, semester, year or 0)]
+        except Exception as e:
+            log_error("Entity.list_schedule_conflicts", e)
+            return []
+
     # ---- COURSES ----
     @rpc(Unicode, Unicode, Unicode, Integer, _returns=Boolean)
     def create_course(ctx, course_id, title, dept_name, credits):
         try:
-            conn = get_conn(); cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO course (course_id, title, dept_name, credits) VALUES (%s, %s, %s, %s)",
-                (course_id, title, dept_name if dept_name else None, int(credits or 0)),
-            )
-            conn.commit()
+            conn = get_conn()
+            with timed("db"):
+                conn.execute("course_insert", (course_id, title, dept_name if dept_name else None, int(credits or 0)))
+                conn.commit()
             return True
         except Exception as e:
-            print("Entity.create_course error:", e)
+            log_error("Entity.create_course", e)
+            raise_if_unavailable(e)
             return False
         finally:
-            try: cur.close(); conn.close()
+            try: conn.close()
             except: pass
 
     @rpc(Unicode, _returns=Course)
     def get_course(ctx, course_id):
         try:
-            conn = get_conn(); cur = conn.cursor(dictionary=True)
-            cur.execute("SELECT course_id, title, dept_name, credits FROM course WHERE course_id=%s", (course_id,))
-            row = cur.fetchone()
+            conn = get_read_conn()
+            with timed("db"):
+                row = conn.query_one("course_by_id", (course_id,))
             if not row:
                 return Course(course_id="NOT_FOUND", title="", dept_name="", credits=0)
-            row["credits"] = int(row["credits"] or 0)
-            return Course(**row)
+            course_id, title, dept_name, credits = row
+            return Course(course_id=course_id, title=title, dept_name=dept_name, credits=int(credits or 0))
         except Exception as e:
-            print("Entity.get_course error:", e)
+            log_error("Entity.get_course", e)
+            raise_if_unavailable(e)
             return Course(course_id="ERROR", title=str(e), dept_name="", credits=0)
+        finally:
+            try: conn.close()
+            except: pass
+
+    @rpc(Unicode, Integer, Unicode, Integer, _returns=CoursePage)
+    def list_courses(ctx, dept_name, min_credits, after, limit):
+        """
+        Filtered catalog page ordered by course_id. Pass next_after from the
+        previous page as `after` to continue; next_after is empty on the last page.
+        """
+        try:
+            rows, next_after = list_courses_page(dept_name, min_credits, after, limit or COURSE_PAGE_DEFAULT)
+        except Exception as e:
+            log_error("Entity.list_courses", e)
+            return CoursePage(items=[], next_after="")
+        return CoursePage(items=[Course(**r) for r in rows], next_after=next_after or "")
+
+    # ---- TIME SLOTS ----
+    @rpc(Unicode, Unicode, Unicode, Unicode, _returns=Boolean)
+    def add_time_slot(ctx, time_slot_id, day, start_time, end_time):
+        """Add one weekly meeting (e.g. 'A', 'M', '08:00', '08:50') and refresh the index."""
+        try:
+            index = timeslot_index()
+            conn = get_conn(); cur = conn.cursor()
+            with timed("db"):
+                cur.execute("INSERT INTO time_slot (time_slot_id, day, start_time, end_time) VALUES (%s, %s, %s, %s)",
+                            (time_slot_id, day, start_time, end_time))
+                conn.commit()
+            index.add(time_slot_id, day, start_time, end_time)
+            return True
+        except Exception as e:
+            log_error("Entity.add_time_slot", e)
+            raise_if_unavailable(e)
+            return False
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+
+    # ---- PREREQS ----
+    @rpc(Unicode, Unicode, _returns=Boolean)
+    def add_prereq(ctx, course_id, prereq_id):
+        """course_id requires prereq_id; rejected (False) if it would create a cycle."""
+        try:
+            index = prereq_index()
+            index.check_add(course_id, prereq_id)
+            conn = get_conn(); cur = conn.cursor()
+            with timed("db"):
+                cur.execute("INSERT INTO prereq (course_id, prereq_id) VALUES (%s, %s)", (course_id, prereq_id))
+                conn.commit()
+            index.add(course_id, prereq_id)
+            return True
+        except Exception as e:
+            log_error("Entity.add_prereq", e)
+            raise_if_unavailable(e)
+            return False
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+
+    @rpc(Unicode, Unicode, _returns=Boolean)
+    def remove_prereq(ctx, course_id, prereq_id):
+        try:
+            index = prereq_index()
+            conn = get_conn(); cur = conn.cursor()
+            with timed("db"):
+                cur.execute("DELETE FROM prereq WHERE course_id=%s AND prereq_id=%s", (course_id, prereq_id))
+                deleted = cur.rowcount
+                conn.commit()
+            if deleted:
+                index.remove(course_id, prereq_id)
+            return bool(deleted)
+        except Exception as e:
+            log_error("Entity.remove_prereq", e)
+            return False
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+
+# ---------------------------------------------------
+# Student directory (see shards.py)
+#   list_students_rows() is one ID-ordered query, or a parallel query per
+#   shard merged by ID when student is sharded; `after`/`limit` page by
+#   keyset so each shard returns at most `limit` rows.
+# ---------------------------------------------------
+STUDENT_PAGE_MAX = 1000
+
+def _fetch_students(conn, after, limit):
+    sql, params = "SELECT ID, name, dept_name, tot_cred FROM student", []
+    if after:
+        sql += " WHERE ID > %s"
+        params.append(after)
+    sql += " ORDER BY ID"
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, tuple(params))
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+def list_students_rows(after=None, limit=None):
+    """[(ID, name, dept_name, tot_cred)] ordered by ID."""
+    limit = min(int(limit), STUDENT_PAGE_MAX) if limit else None
+    if len(SHARDS):
+        with timed("db"):
+            return merge_by_id(SHARDS.scatter(lambda conn: _fetch_students(conn, after, limit)), limit)
+    conn = get_read_conn()
+    try:
+        with timed("db"):
+            return _fetch_students(conn, after, limit)
+    finally:
+        conn.close()
+
+def student_exists(student_id):
+    conn = get_student_conn(student_id, read=True)
+    try:
+        with timed("db"):
+            return conn.query_one("student_by_id", (student_id,)) is not None
+    finally:
+        conn.close()
+
+# ---------------------------------------------------
+# Student inserts (optional group commit, see group_commit.py)
+#   STUDENT_GROUP_COMMIT_MS > 0 merges concurrent inserts into one multi-row
+#   INSERT + commit per window (per shard when sharded); 0 commits each row.
+# ---------------------------------------------------
+STUDENT_GROUP_COMMIT_MS = float(DB_CONFIG.get("STUDENT_GROUP_COMMIT_MS", 0))
+STUDENT_GROUP_COMMIT_MAX = int(DB_CONFIG.get("STUDENT_GROUP_COMMIT_MAX", 100))
+STUDENT_COLS = ("ID", "name", "dept_name", "tot_cred")
+
+def _student_writer(name, connect):
+    return GroupCommit(name, connect, "student", STUDENT_COLS,
+                       STUDENT_GROUP_COMMIT_MS / 1000.0, STUDENT_GROUP_COMMIT_MAX)
+
+if STUDENT_GROUP_COMMIT_MS > 0:
+    STUDENT_WRITERS = ([_student_writer(f"student-{i}", functools.partial(SHARDS.connect, i))
+                        for i in range(len(SHARDS))] or [_student_writer("student", DB.connect_primary)])
+else:
+    STUDENT_WRITERS = []
+
+def insert_student(ID, name, dept_name, tot_cred):
+    """INSERT and commit one student row; raises the row's own error (e.g. duplicate ID)."""
+    row = (ID, name, dept_name if dept_name else None, int(tot_cred or 0))
+    if STUDENT_WRITERS:
+        with timed("db"):
+            STUDENT_WRITERS[SHARDS.index_of(ID) if len(SHARDS) else 0].insert(row)
+        return
+    conn = get_student_conn(ID)
+    try:
+        with timed("db"):
+            conn.execute("student_insert", row)
+            conn.commit()
+    finally:
+        conn.close()
+
+# ---------------------------------------------------
+# Course catalog listing (keyset pagination)
+#   Filters map onto course(dept_name, course_id, credits), so a dept filter
+#   is an index range already ordered by course_id and the lean projections
+#   (any subset of course_id/dept_name/credits) are answered from the index.
+# ---------------------------------------------------
+COURSE_FIELDS = ("course_id", "title", "dept_name", "credits")
+COURSE_PAGE_DEFAULT = 50
+COURSE_PAGE_MAX = 500
+
+def list_courses_page(dept_name=None, min_credits=None, after=None, limit=COURSE_PAGE_DEFAULT, fields=COURSE_FIELDS):
+    """Returns (rows, next_after); next_after is None on the last page."""
+    cols = ["course_id"] + [f for f in COURSE_FIELDS[1:] if f in fields]
+    limit = max(1, min(int(limit or COURSE_PAGE_DEFAULT), COURSE_PAGE_MAX))
+    where, params = [], []
+    if dept_name:
+        where.append("dept_name=%s"); params.append(dept_name)
+    if min_credits:
+        where.append("credits>=%s"); params.append(int(min_credits))
+    if after:
+        where.append("course_id>%s"); params.append(after)
+    sql = "SELECT " + ", ".join(cols) + " FROM course"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY course_id LIMIT %s"
+    params.append(limit + 1)
+    try:
+        conn = get_read_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(sql, tuple(params))
+            raw = cur.fetchall()
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+    rows = []
+    for r in raw[:limit]:
+        row = dict(zip(cols, r))
+        if "credits" in row:
+            row["credits"] = int(row["credits"] or 0)
+        rows.append(row)
+    next_after = rows[-1]["course_id"] if len(raw) > limit else None
+    return rows, next_after
+
+# ---------------------------------------------------
+# Prerequisite checks
+#   PREREQS holds the transitive closure of prereq (see prereq_index.py),
+#   loaded on first use and kept current by the prereq entity endpoints.
+# ---------------------------------------------------
+PREREQS = PrereqIndex()
+
+def prereq_index():
+    if not PREREQS.loaded:
+        try:
+            conn = get_conn(); cur = conn.cursor()
+            with timed("db"):
+                cur.execute("SELECT course_id, prereq_id FROM prereq")
+                PREREQS.load(cur.fetchall())
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+    return PREREQS
+
+def passed_courses(student_id):
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(
+                "SELECT DISTINCT course_id FROM takes WHERE ID=%s AND grade IS NOT NULL AND grade <> 'F'",
+                (student_id,),
+            )
+            return {r[0] for r in cur.fetchall()}
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+def missing_prereqs(student_id, course_id):
+    """Prereqs of course_id (transitively) the student has not passed; empty if eligible."""
+    required = prereq_index().closure(course_id)
+    if not required:
+        return set()
+    return required - passed_courses(student_id)
+
+# ---------------------------------------------------
+# Timetable conflicts
+#   TIMESLOTS indexes time_slot per day (see timetable.py); it is loaded on
+#   first use and updated by the time-slot entity endpoint.
+# ---------------------------------------------------
+TIMESLOTS = TimeSlotIndex()
+
+def timeslot_index():
+    if not TIMESLOTS.loaded:
+        try:
+            conn = get_conn(); cur = conn.cursor()
+            with timed("db"):
+                cur.execute("SELECT time_slot_id, day, start_time, end_time FROM time_slot")
+                TIMESLOTS.load(cur.fetchall())
+        finally:
+            try: cur.close(); conn.close()
+            except: pass
+    return TIMESLOTS
+
+def term_schedule(student_id, semester, year):
+    """Schedule of the sections the student takes in one term."""
+    index = timeslot_index()
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(
+                "SELECT t.course_id, t.sec_id, s.time_slot_id FROM takes t "
+                "JOIN section s ON s.course_id=t.course_id AND s.sec_id=t.sec_id "
+                "AND s.semester=t.semester AND s.year=t.year "
+                "WHERE t.ID=%s AND t.semester=%s AND t.year=%s",
+                (student_id, semester, int(year)),
+            )
+            rows = cur.fetchall()
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+    return Schedule(index, [(f"{c}-{sec}", slot) for c, sec, slot in rows if slot])
+
+def section_time_slot(course_id, sec_id, semester, year):
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute("SELECT time_slot_id FROM section WHERE " + SECTION_KEY,
+                        (course_id, sec_id, semester, int(year)))
+            row = cur.fetchone()
+        return row[0] if row else None
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+def schedule_clashes(student_id, course_id, sec_id, semester, year):
+    """Sections the student already takes that clash with the given section."""
+    slot_id = section_time_slot(course_id, sec_id, semester, year)
+    if not slot_id:
+        return []
+    return term_schedule(student_id, semester, year).conflicts_with(timeslot_index(), slot_id)
+
+def list_schedule_conflicts(student_id, semester, year):
+    return [{"day": day, "section_a": a, "section_b": b, "start": fmt_minutes(start), "end": fmt_minutes(end)}
+            for day, a, b, start, end in term_schedule(student_id, semester, year).all_conflicts()]
+
+# ---------------------------------------------------
+# Seat allocation for section enrollment
+#   section_seats(course_id, sec_id, semester, year, capacity, taken) keeps a
+#   per-section counter, so taking a seat is one conditional UPDATE of one row
+#   in a short transaction with the takes INSERT (no table locks, no COUNT(*)).
+#   Lock-wait timeouts / deadlocks on a hot section are retried with jittered
+#   backoff. Sections without a counter row get one seeded from classroom.capacity.
+# ---------------------------------------------------
+ENROLL_RETRIES = 5
+RETRYABLE_ERRNOS = (1205, 1213)   # lock wait timeout, deadlock
+SECTION_KEY = "course_id=%s AND sec_id=%s AND semester=%s AND year=%s"
+
+def _seed_seat_row(cur, key):
+    cur.execute(
+        "INSERT IGNORE INTO section_seats (course_id, sec_id, semester, year, capacity, taken) "
+        "SELECT s.course_id, s.sec_id, s.semester, s.year, COALESCE(c.capacity, 0), "
+        "(SELECT COUNT(*) FROM takes t WHERE t.course_id=s.course_id AND t.sec_id=s.sec_id "
+        "AND t.semester=s.semester AND t.year=s.year) "
+        "FROM section s LEFT JOIN classroom c ON c.building=s.building AND c.room_number=s.room_number "
+        "WHERE s.course_id=%s AND s.sec_id=%s AND s.semester=%s AND s.year=%s",
+        key,
+    )
+
+def enroll_in_section(student_id, course_id, sec_id, semester, year):
+    """Take a seat and write the takes row. Returns (status, message, seats_left)."""
+    key = (course_id, sec_id, semester, int(year))
+    try:
+        missing = missing_prereqs(student_id, course_id)
+    except Exception as e:
+        log_error("enroll_in_section.prereqs", e)
+        return error_status(e), str(e), 0
+    if missing:
+        return 409, "Missing prerequisites: " + ", ".join(sorted(missing)), 0
+    try:
+        clashes = schedule_clashes(student_id, course_id, sec_id, semester, year)
+    except Exception as e:
+        log_error("enroll_in_section.timetable", e)
+        return error_status(e), str(e), 0
+    if clashes:
+        return 409, "Schedule conflict with " + ", ".join(clashes), 0
+    if len(SHARDS) and not student_exists(student_id):   # no takes -> student FK across shards
+        return 404, "Student not found", 0
+    for attempt in range(ENROLL_RETRIES):
+        if deadline.expired():
+            return 504, "Request deadline exceeded", 0
+        conn = cur = None
+        try:
+            conn = get_conn(); cur = conn.cursor(buffered=True)
+            with timed("db"):
+                cur.execute("UPDATE section_seats SET taken = taken + 1 WHERE " + SECTION_KEY
+                            + " AND taken < capacity", key)
+                if cur.rowcount == 0:
+                    conn.rollback()
+                    cur.execute("SELECT capacity - taken FROM section_seats WHERE " + SECTION_KEY, key)
+                    if cur.fetchone() is not None:
+                        return 409, "Section is full", 0
+                    _seed_seat_row(cur, key)
+                    conn.commit()
+                    cur.execute("SELECT 1 FROM section_seats WHERE " + SECTION_KEY, key)
+                    if cur.fetchone() is None:
+                        return 404, "Section not found", 0
+                    continue
+                cur.execute(
+                    "INSERT INTO takes (ID, course_id, sec_id, semester, year, grade) "
+                    "VALUES (%s, %s, %s, %s, %s, NULL)",
+                    (student_id,) + key,
+                )
+                credits = int(conn.query_one("course_credits", (course_id,))[0])
+                cur.execute(SUMMARY_UPSERT, (student_id, credits, 0, 0))
+                cur.execute("SELECT capacity - taken FROM section_seats WHERE " + SECTION_KEY, key)
+                seats_left = int(cur.fetchone()[0])
+                conn.commit()
+            return 200, f"Student {student_id} enrolled in {course_id}-{sec_id} ({semester} {year}).", seats_left
+        except mysql.connector.Error as e:
+            try: conn.rollback()
+            except: pass
+            if e.errno in RETRYABLE_ERRNOS and attempt < ENROLL_RETRIES - 1:
+                time.sleep(random.uniform(0, 0.002 * (2 ** attempt)))
+                continue
+            if e.errno == 1062:
+                return 409, "Student already enrolled in this section", 0
+            if e.errno == 1452:
+                return 404, "Student not found", 0
+            log_error("enroll_in_section", e)
+            return error_status(e), str(e), 0
+        except Exception as e:
+            log_error("enroll_in_section", e)
+            return error_status(e), str(e), 0
         finally:
             try: cur.close(); conn.close()
             except: pass
+    return 503, "Section is busy, retry later", 0
+
+# ---------------------------------------------------
+# Credit / GPA aggregates
+#   student_summary(ID, enrolled_cred, graded_cred, grade_points) and
+#   student.tot_cred are adjusted in the same transaction that writes takes
+#   (enrollment, grading), so reading a student's totals is one PK lookup
+#   instead of aggregating takes JOIN course.
+# ---------------------------------------------------
+GRADE_POINTS = {"A+": 4.0, "A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "B-": 2.7,
+                "C+": 2.3, "C": 2.0, "C-": 1.7, "D+": 1.3, "D": 1.0, "F": 0.0}
+
+SUMMARY_UPSERT = (
+    "INSERT INTO student_summary (ID, enrolled_cred, graded_cred, grade_points) VALUES (%s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE enrolled_cred = enrolled_cred + VALUES(enrolled_cred), "
+    "graded_cred = graded_cred + VALUES(graded_cred), grade_points = grade_points + VALUES(grade_points)"
+)
+
+TOT_CRED_UPDATE = "UPDATE student SET tot_cred = GREATEST(COALESCE(tot_cred, 0) + %s, 0) WHERE ID=%s"
+
+def _adjust_tot_cred_on_shard(student_id, delta):
+    conn = get_student_conn(student_id)
+    try:
+        cur = conn.cursor()
+        with timed("db"):
+            cur.execute(TOT_CRED_UPDATE, (delta, student_id))
+            conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+def _grade_contribution(grade, credits):
+    """(graded_cred, grade_points, earned_cred) that one takes row adds to the aggregates."""
+    if grade in GRADE_POINTS:
+        graded, points = credits, GRADE_POINTS[grade] * credits
+    else:
+        graded, points = 0, 0.0
+    earned = credits if grade and grade != "F" else 0
+    return graded, points, earned
+
+def gpa(graded_cred, grade_points):
+    return round(float(grade_points) / graded_cred, 2) if graded_cred else 0.0
+
+def set_grade(student_id, course_id, sec_id, semester, year, grade):
+    """Write a takes.grade and apply the delta to the aggregates. Returns (status, message)."""
+    grade = (grade or "").strip().upper() or None
+    if grade is not None and grade not in GRADE_POINTS:
+        return 400, f"Invalid grade {grade!r}"
+    key = (student_id, course_id, sec_id, semester, int(year))
+    try:
+        conn = get_conn(); cur = conn.cursor(buffered=True)
+        with timed("db"):
+            cur.execute("SELECT grade FROM takes WHERE ID=%s AND " + SECTION_KEY + " FOR UPDATE", key)
+            row = cur.fetchone()
+            if row is None:
+                conn.rollback()
+                return 404, "Enrollment not found"
+            old = row[0]
+            credits = int(conn.query_one("course_credits", (course_id,))[0])
+            old_g, old_p, old_e = _grade_contribution(old, credits)
+            new_g, new_p, new_e = _grade_contribution(grade, credits)
+            cur.execute("UPDATE takes SET grade=%s WHERE ID=%s AND " + SECTION_KEY, (grade,) + key)
+            cur.execute(SUMMARY_UPSERT, (student_id, 0, new_g - old_g, new_p - old_p))
+            if new_e != old_e and not len(SHARDS):
+                cur.execute(TOT_CRED_UPDATE, (new_e - old_e, student_id))
+            conn.commit()
+        if new_e != old_e and len(SHARDS):
+            # student is on its shard: applied after the main commit (not atomic with it)
+            _adjust_tot_cred_on_shard(student_id, new_e - old_e)
+        return 200, f"Grade for {student_id} in {course_id}-{sec_id} set to {grade or 'none'}."
+    except Exception as e:
+        log_error("set_grade", e)
+        try: conn.rollback()
+        except: pass
+        return 400, str(e)
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+def credit_summary(student_id):
+    """Totals for one student from the maintained aggregates, or None if unknown."""
+    if len(SHARDS):
+        return _credit_summary_sharded(student_id)
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(
+                "SELECT s.tot_cred, ss.enrolled_cred, ss.graded_cred, ss.grade_points "
+                "FROM student s LEFT JOIN student_summary ss ON ss.ID = s.ID WHERE s.ID=%s",
+                (student_id,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+        tot_cred, enrolled, graded, points = (int(row[0] or 0), int(row[1] or 0), int(row[2] or 0), float(row[3] or 0))
+        return {"ID": student_id, "tot_cred": tot_cred, "enrolled_cred": enrolled,
+                "graded_cred": graded, "gpa": gpa(graded, points)}
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+def _credit_summary_sharded(student_id):
+    conn = get_student_conn(student_id, read=True)
+    try:
+        cur = conn.cursor()
+        with timed("db"):
+            cur.execute("SELECT tot_cred FROM student WHERE ID=%s", (student_id,))
+            row = cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute("SELECT enrolled_cred, graded_cred, grade_points FROM student_summary WHERE ID=%s",
+                        (student_id,))
+            summary = cur.fetchone() or (0, 0, 0)
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+    enrolled, graded, points = int(summary[0] or 0), int(summary[1] or 0), float(summary[2] or 0)
+    return {"ID": student_id, "tot_cred": int(row[0] or 0), "enrolled_cred": enrolled,
+            "graded_cred": graded, "gpa": gpa(graded, points)}
+
+def transcript_rows(student_id):
+    """The student's takes rows with course title/credits, oldest first."""
+    try:
+        conn = get_conn(); cur = conn.cursor()
+        with timed("db"):
+            cur.execute(
+                "SELECT t.course_id, c.title, t.sec_id, t.semester, t.year, t.grade, c.credits "
+                "FROM takes t JOIN course c ON c.course_id = t.course_id WHERE t.ID=%s "
+                "ORDER BY t.year, FIELD(t.semester, 'Spring', 'Summer', 'Fall'), t.course_id",
+                (student_id,),
+            )
+            rows = cur.fetchall()
+        return [{"course_id": r[0], "title": r[1], "sec_id": r[2], "semester": r[3], "year": int(r[4]),
+                 "grade": r[5], "credits": int(r[6] or 0)} for r in rows]
+    finally:
+        try: cur.close(); conn.close()
+        except: pass
+
+# ---------------------------------------------------
+# Student name search
+#   NAMES indexes normalized student names for prefix and fuzzy lookup (see
+#   name_index.py); it is loaded on first use and updated by the student
+#   create paths, so a search never scans student with LIKE '%...%'.
+# ---------------------------------------------------
+NAME_SEARCH_MODES = ("auto", "prefix", "fuzzy")
+NAME_SEARCH_MAX = 100
+NAMES = NameIndex()
+
+def _fetch_names(conn):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT ID, name FROM student")
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+def name_index():
+    if not NAMES.loaded:
+        if len(SHARDS):
+            with timed("db"):
+                rows = [r for part in SHARDS.scatter(_fetch_names) for r in part]
+        else:
+            conn = get_conn()
+            try:
+                with timed("db"):
+                    rows = _fetch_names(conn)
+            finally:
+                conn.close()
+        NAMES.load((ID, UtilityService.normalize_name(None, name)) for ID, name in rows)
+    return NAMES
+
+def index_student_name(ID, name):
+    """Call after the student row is committed. Always added, even before the index is
+    loaded: load() keeps added names, so a row committed after its SELECT is not lost."""
+    NAMES.add(ID, UtilityService.normalize_name(None, name))
+
+def search_student_names(q, mode="auto", limit=10):
+    """[{"ID", "name", "score"}]: prefix hits score 1.0, fuzzy ones their trigram similarity."""
+    if mode not in NAME_SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(NAME_SEARCH_MODES)}")
+    limit = max(1, min(int(limit or 10), NAME_SEARCH_MAX))
+    return name_index().search(q or "", limit, mode)
 
 # ---------------------------------------------------
 # TaskService (business process) that USES Utility + Entity
@@ -163,7 +944,26 @@ class OnboardResult(ComplexModel):
     tuition_estimate = Float
     message = Unicode
 
-class TaskService(ServiceBase):
+class EnrollResult(ComplexModel):
+    success = Boolean
+    seats_left = Integer
+    message = Unicode
+
+class PrereqCheck(ComplexModel):
+    eligible = Boolean
+    missing = Array(Unicode)
+
+MICRO_TIMEOUT = 5   # seconds, further capped by the request deadline
+MICRO = MicroPool(parse_urls(DB_CONFIG.get("MICRO_URLS", "http://localhost:8001")),
+                  hedge=DB_CONFIG.get("MICRO_HEDGE", "0").lower() in ("1", "true", "yes"),
+                  hedge_pct=float(DB_CONFIG.get("MICRO_HEDGE_PCT", 95)))
+
+def calc_tuition(credits):
+    """Tuition from the micro servers (least-loaded replica, hedged when enabled); raises on failure."""
+    return MICRO.call(lambda url, timeout: float(zeep_service(url, timeout).calc_tuition(credits)),
+                      deadline.cap(MICRO_TIMEOUT), idempotent=True)
+
+class TaskService(IdempotentService):
     @rpc(Unicode, Unicode, Unicode, Integer, Unicode, _returns=OnboardResult)
     def onboard_student_into_course(ctx, student_id, name, dept_name, init_credits, course_id):
         """
@@ -180,33 +980,70 @@ class TaskService(ServiceBase):
                                  message="Invalid student ID format")
         norm_name = UtilityService.normalize_name(ctx, name)
 
+        # 1b) prerequisites: a brand-new student has not passed anything yet
+        try:
+            required = prereq_index().closure(course_id)
+        except Exception as e:
+            log_error("TaskService prereqs", e)
+            raise_if_unavailable(e)
+            return OnboardResult(success=False, normalized_name=norm_name, tuition_estimate=0.0,
+                                 message=str(e))
+        if required:
+            return OnboardResult(success=False, normalized_name=norm_name, tuition_estimate=0.0,
+                                 message="Missing prerequisites: " + ", ".join(sorted(required)))
+
         # 2) create student
+        deadline.check()
         ok = EntityService.create_student(ctx, student_id, norm_name, dept_name, init_credits)
         if not ok:
             return OnboardResult(success=False, normalized_name=norm_name, tuition_estimate=0.0,
                                  message="Failed to create student")
 
         # 3) get course info
+        deadline.check()
         course = EntityService.get_course(ctx, course_id)
         if course.course_id in ("NOT_FOUND", "ERROR", None, ""):
             return OnboardResult(success=False, normalized_name=norm_name, tuition_estimate=0.0,
                                  message="Course not found")
 
-        # 4) call microservice (TuitionPolicyService) via SOAP client
-        #    We avoid hardcoding urls elsewhere; teaching purpose simplicity here.
+        # 4) call microservice (TuitionPolicyService) via SOAP client (see micro_pool.py)
+        deadline.check()
         try:
-            from zeep import Client
-            micro = Client(wsdl="http://localhost:8001/?wsdl")
-            # tuition is based solely on credits (non-breakable rule)
-            tuition = float(micro.service.calc_tuition(course.credits))
+            with timed("micro"):
+                # tuition is based solely on credits (non-breakable rule)
+                tuition = calc_tuition(course.credits)
         except Exception as e:
-            print("TaskService tuition call error:", e)
+            log_error("TaskService tuition call", e)
+            deadline.check()
             tuition = 0.0
 
         # 5) return consolidated result
         msg = f"Student {student_id} onboarded to {course.course_id}."
         return OnboardResult(success=True, normalized_name=norm_name, tuition_estimate=tuition, message=msg)
 
+    @rpc(Unicode, Unicode, Unicode, Unicode, Integer, _returns=EnrollResult)
+    def enroll_student_in_section(ctx, student_id, course_id, sec_id, semester, year):
+        """
+        Register a student into a section, enforcing classroom capacity via
+        the per-section seat counter (see enroll_in_section).
+        """
+        status, msg, seats_left = enroll_in_section(student_id, course_id, sec_id, semester, year or 0)
+        if status == 503:
+            raise Fault("Server.Unavailable", msg)
+        if status == 504:
+            raise Fault("Server.Timeout", msg)
+        return EnrollResult(success=status == 200, seats_left=seats_left, message=msg)
+
+    @rpc(Unicode, Unicode, _returns=PrereqCheck)
+    def check_prereqs(ctx, student_id, course_id):
+        """Has the student passed every (transitive) prerequisite of course_id?"""
+        try:
+            missing = missing_prereqs(student_id, course_id)
+        except Exception as e:
+            log_error("TaskService.check_prereqs", e)
+            return PrereqCheck(eligible=False, missing=[])
+        return PrereqCheck(eligible=not missing, missing=sorted(missing))
+
 # ---------------------------------------------------
 # Publish all services (TaskService consumes Utility/Entity internally)
 # ---------------------------------------------------
@@ -216,10 +1053,76 @@ app = Application(
     in_protocol=Soap11(validator="lxml"),
     out_protocol=Soap11(),
 )
+
+# Structured access log: one record per RPC (route = Service.method)
+app.event_manager.add_listener("method_call",
+    lambda ctx: access_log.begin_request(ctx.method_request_string))
+app.event_manager.add_listener("method_return_object",
+    lambda ctx: access_log.end_request(200))
+app.event_manager.add_listener("method_exception_object",
+    lambda ctx: access_log.end_request(500, fault=str(ctx.out_error)))
+
+# Read/write splitting (see db_router.py): write RPCs, and clients that wrote
+# within DB_READ_YOUR_WRITES seconds (cookie), read from the primary.
+WRITE_RPCS = IDEMPOTENT_METHODS | {"set_grade", "remove_prereq"}
+
+def _cookie(ctx, name):
+    morsel = SimpleCookie(ctx.transport.req_env.get("HTTP_COOKIE", "")).get(name)
+    return morsel.value if morsel else None
+
+def _route_reads(ctx):
+    DB.pin_primary(_cookie(ctx, RYW_COOKIE), force=ctx.descriptor.name in WRITE_RPCS)
+
+def _mark_write(ctx):
+    if DB.replicas and DB.ryw_secs and ctx.descriptor.name in WRITE_RPCS:
+        ctx.transport.resp_headers["Set-Cookie"] = (
+            f"{RYW_COOKIE}={DB.write_mark()}; Max-Age={max(1, int(DB.ryw_secs))}; Path=/; HttpOnly")
+
+app.event_manager.add_listener("method_call", _route_reads)
+app.event_manager.add_listener("method_return_object", _mark_write)
+
 wsgi_app = WsgiApplication(app)
 
+# ---------------------------------------------------
+# Columnar export (see arrow_export.py)
+#   GET /export/students[?format=parquet] is plain HTTP next to the SOAP
+#   endpoint: the whole student table as Arrow IPC record batches (or a
+#   Parquet file), read EXPORT_CHUNK_ROWS rows at a time from an unbuffered
+#   cursor instead of one list_students envelope holding every row.
+#   It is not admitted (admission covers the spyne services only) and runs
+#   without a deadline or SELECT time limit.
+# ---------------------------------------------------
+STUDENT_ARROW_FIELDS = [("ID", "string"), ("name", "string"), ("dept_name", "string"), ("tot_cred", "int32")]
+EXPORT_CHUNK_ROWS = int(DB_CONFIG.get("EXPORT_CHUNK_ROWS", arrow_export.CHUNK_ROWS))
+
+def student_chunks():
+    """Row chunks of the whole student table (each shard in turn when sharded). Runs as the
+    response streams, without a deadline: connections are bound with no limit."""
+    deadline.clear()
+    connects = [functools.partial(SHARDS.connect, i) for i in range(len(SHARDS))] or [get_read_conn]
+    for connect in connects:
+        conn = connect(); cur = conn.cursor()
+        try:
+            cur.execute("SELECT ID, name, dept_name, tot_cred FROM student")
+            for rows in arrow_export.fetch_chunks(cur, EXPORT_CHUNK_ROWS):
+                yield [(ID, name, dept_name, int(tot_cred or 0)) for ID, name, dept_name, tot_cred in rows]
+        finally:
+            try: cur.close()
+            except: pass
+            conn.close()
+
+def main_app(environ, start_response):
+    """SOAP on every path except GET /export/students."""
+    if environ.get("REQUEST_METHOD") == "GET" and environ.get("PATH_INFO") == "/export/students":
+        return arrow_export.wsgi_export(environ, start_response, "students", STUDENT_ARROW_FIELDS, student_chunks)
+    return wsgi_app(environ, start_response)
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """One thread per request, so the admission limits (not the accept loop) bound concurrency."""
+    daemon_threads = True
+
 if __name__ == "__main__":
     print("Loaded DB config:", DB_CONFIG)
-    server = make_server("0.0.0.0", 8000, wsgi_app)
+    server = make_server("0.0.0.0", 8000, main_app, server_class=ThreadingWSGIServer)
     print("Main (Task) SOAP server on http://localhost:8000  (WSDL at ?wsdl)")
     server.serve_forever()
@@ -1,8 +1,13 @@
 # micro_server.py
-from wsgiref.simple_server import make_server
-from spyne import Application, rpc, ServiceBase, Integer, Float
+import sys
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import make_server, WSGIServer
+from spyne import Application, rpc, ServiceBase, Integer, Float, Array, ByteArray, Fault
 from spyne.protocol.soap import Soap11
 from spyne.server.wsgi import WsgiApplication
+import numpy as np
+from admission import Admission
 
 # ---------------------------------------------------
 # TuitionPolicyService
@@ -12,7 +17,40 @@ from spyne.server.wsgi import WsgiApplication
 # It simply exposes pure, deterministic rules that other
 # services (like TaskService) depend on.
 # ---------------------------------------------------
-class TuitionPolicyService(ServiceBase):
+BASE_FEE = 100.0
+PER_CREDIT = 50.0
+MAX_CREDITS = 24
+
+def tuition_vector(credits):
+    """Tuition for an array of credit counts in one NumPy pass (clamped to [0, MAX_CREDITS])."""
+    c = np.clip(np.asarray(credits, dtype=np.int64), 0, MAX_CREDITS)
+    return BASE_FEE + PER_CREDIT * c
+
+# Admission control (see admission.py): per-RPC limit + bounded wait, fast
+# Server.Overloaded fault with Retry-After; the constant max_credits is exempt.
+ADMISSION_LIMIT = 64
+ADMISSION_QUEUE = 128
+ADMISSION_WAIT_MS = 200
+ADMISSION = Admission(initial=ADMISSION_LIMIT, queue_size=ADMISSION_QUEUE, max_wait=ADMISSION_WAIT_MS / 1000.0,
+                      exempt=("TuitionPolicyService.max_credits",))
+
+class AdmittedService(ServiceBase):
+    @classmethod
+    def call_wrapper(cls, ctx, *args, **kwargs):
+        route = f"{ctx.descriptor.service_class.__name__}.{ctx.descriptor.name}"
+        if ADMISSION.exempt(route):
+            return super().call_wrapper(ctx, *args, **kwargs)
+        lim = ADMISSION.limiter(route)
+        if not lim.acquire():
+            ctx.transport.resp_headers["Retry-After"] = str(ADMISSION.retry_after)
+            raise Fault("Server.Overloaded", f"{route} is busy, retry later")
+        t0 = time.perf_counter()
+        try:
+            return super().call_wrapper(ctx, *args, **kwargs)
+        finally:
+            lim.release(time.perf_counter() - t0)
+
+class TuitionPolicyService(AdmittedService):
     @rpc(Integer, _returns=Float)
     def calc_tuition(ctx, credits):
         """
@@ -22,9 +60,31 @@ class TuitionPolicyService(ServiceBase):
           cost per credit = 50.0
         """
         c = int(credits or 0)
-        base_fee = 100.0
-        per_credit = 50.0
-        return float(base_fee + per_credit * c)
+        return float(BASE_FEE + PER_CREDIT * c)
+
+    @rpc(Array(Integer), _returns=Array(Float))
+    def calc_tuition_batch(ctx, credits):
+        """
+        Batch form of calc_tuition for billing runs: one tuition value per
+        credit count, in order. Credits are clamped to [0, max_credits].
+        """
+        try:
+            return tuition_vector([c or 0 for c in credits or []]).tolist()
+        except OverflowError as e:   # beyond int64
+            raise Fault("Client.InvalidCredits", str(e))
+
+    @rpc(ByteArray, _returns=ByteArray)
+    def calc_tuition_batch_packed(ctx, packed):
+        """
+        Compact form of calc_tuition_batch: packed little-endian int32
+        credits in, packed little-endian float64 tuition out (base64 on the wire).
+        """
+        data = packed if isinstance(packed, bytes) else b"".join(packed or [])
+        try:
+            credits = np.frombuffer(data, dtype="<i4")
+        except ValueError as e:   # length not a multiple of 4
+            raise Fault("Client.InvalidCredits", str(e))
+        return [tuition_vector(credits).astype("<f8").tobytes()]
 
     @rpc(_returns=Integer)
     def max_credits(ctx):
@@ -32,7 +92,7 @@ class TuitionPolicyService(ServiceBase):
         Return the fixed maximum number of credits a
         student can take in one semester.
         """
-        return 24
+        return MAX_CREDITS
 
 # ---------------------------------------------------
 # Publish the service
@@ -44,8 +104,13 @@ micro_app = Application(
     out_protocol=Soap11(),
 )
 
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """One thread per request, so the admission limits (not the accept loop) bound concurrency."""
+    daemon_threads = True
+
 if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8001   # e.g. a second replica: python micro_server.py 8011
     print("Micro (Tuition Policy) SOAP server running...")
-    print("URL: http://localhost:8001  (WSDL available at ?wsdl)")
-    server = make_server("0.0.0.0", 8001, WsgiApplication(micro_app))
+    print(f"URL: http://localhost:{port}  (WSDL available at ?wsdl)")
+    server = make_server("0.0.0.0", port, WsgiApplication(micro_app), server_class=ThreadingWSGIServer)
     server.serve_forever()
@@ -0,0 +1,198 @@
+# reshard.py
+# Move student rows to the layout given by --to (see shards.py).
+#   python reshard.py --to 127.0.0.1/uni_s0,127.0.0.1/uni_s1 --create-tables --drop-fks
+#   python reshard.py --to 127.0.0.1/uni_s0,127.0.0.1/uni_s1,127.0.0.1/uni_s2 --dry-run
+#   python reshard.py --to 127.0.0.1/university        # back into the main database
+#
+# The current layout is DB_SHARDS from db.properties, or the main database
+# (DB_HOST/DB_NAME) when student is not sharded yet. Each source is read in
+# ID order by keyset batches; rows whose shard changes are copied to the new
+# shard (INSERT IGNORE, committed), read back and compared column by column,
+# and only then deleted from the old one, so an interrupted run can simply be
+# started again. A destination row with the same ID but other data (which
+# INSERT IGNORE would have kept) stops the run before the source row is
+# deleted. Shards are told apart by the server they are on (@@server_uuid) and
+# DATABASE(), not by how the spec spells them: 127.0.0.1/uni_s0 and
+# localhost/uni_s0 are the same shard and nothing moves between them. Stop the
+# servers while it runs and set DB_SHARDS to the new spec before starting
+# them again.
+#
+# Deleting a student row cascades through the foreign keys that reference
+# student (takes, student_summary, advisor), so the run refuses to start while
+# any exist unless --drop-fks removes them first.
+import argparse
+import time
+from collections import Counter
+
+import mysql.connector
+
+from shards import ShardMap
+
+def load_db_config(filename="db.properties"):
+    cfg = {}
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, value = line.split("=", 1)
+            cfg[key.strip()] = value.strip()
+    return cfg
+
+COLS = ("ID", "name", "dept_name", "tot_cred")
+
+class Layout(ShardMap):
+    """A ShardMap whose default (no DB_SHARDS) is the main database as the only shard."""
+    def __init__(self, cfg, spec=None):
+        if spec is None:
+            spec = cfg.get("DB_SHARDS") or f"{cfg['DB_HOST']}/{cfg['DB_NAME']}"
+        super().__init__(cfg, spec)
+
+def student_fks(conn):
+    """[(table, constraint)] for foreign keys in this database that reference student."""
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT TABLE_NAME, CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS "
+        "WHERE CONSTRAINT_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = 'student'"
+    )
+    rows = cur.fetchall()
+    cur.close()
+    return rows
+
+def drop_fks(conn, fks):
+    cur = conn.cursor()
+    for table, name in fks:
+        cur.execute(f"ALTER TABLE `{table}` DROP FOREIGN KEY `{name}`")
+        print(f"dropped {table}.{name}")
+    cur.close()
+
+def student_ddl(conn):
+    """CREATE TABLE student as in `conn`, without its constraints (department is not on a shard)."""
+    cur = conn.cursor()
+    cur.execute("SHOW CREATE TABLE student")
+    ddl = cur.fetchone()[1]
+    cur.close()
+    lines = [l for l in ddl.splitlines() if not l.strip().startswith("CONSTRAINT")]
+    for i, l in enumerate(lines):   # the line before ") ENGINE=..." must not end with a comma
+        if l.startswith(")") and lines[i - 1].endswith(","):
+            lines[i - 1] = lines[i - 1][:-1]
+    return "\n".join(lines).replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1)
+
+def create_tables(main_conn, target):
+    ddl = student_ddl(main_conn)
+    for i in range(len(target)):
+        conn = target.connect(i)
+        try:
+            cur = conn.cursor()
+            cur.execute(ddl)
+            cur.close()
+        finally:
+            conn.close()
+
+def server_identity(conn):
+    """(@@server_uuid, DATABASE()) of `conn`: equal for two connections to the same database."""
+    cur = conn.cursor()
+    cur.execute("SELECT @@server_uuid, DATABASE()")
+    row = tuple(cur.fetchone())
+    cur.close()
+    return row
+
+def unmatched(conn, rows):
+    """IDs of `rows` whose student row in `conn`'s database is missing or differs."""
+    cur = conn.cursor()
+    cur.execute(f"SELECT {', '.join(COLS)} FROM student WHERE ID IN (" + ", ".join(["%s"] * len(rows)) + ")",
+                [r[0] for r in rows])
+    found = {r[0]: tuple(r) for r in cur.fetchall()}
+    cur.close()
+    return [r[0] for r in rows if found.get(r[0]) != tuple(r)]
+
+def reshard(source, target, batch, dry_run):
+    """Counter{(from, to): rows moved}."""
+    moved = Counter()
+    conns = {}   # target index -> connection
+    try:
+        for t in range(len(target)):
+            conns[t] = target.connect(t)
+        ident = [server_identity(conns[t]) for t in range(len(target))]
+        for s in range(len(source)):
+            src = source.connect(s)
+            here, here_ident = str(source.shards[s]), server_identity(src)
+            cur = src.cursor()
+            after = ""
+            while True:
+                cur.execute(f"SELECT {', '.join(COLS)} FROM student WHERE ID > %s ORDER BY ID LIMIT %s",
+                            (after, batch))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                after = rows[-1][0]
+                groups = {}
+                for r in rows:
+                    t = target.index_of(r[0])
+                    if ident[t] != here_ident:
+                        groups.setdefault(t, []).append(r)
+                for t, group in groups.items():
+                    moved[(here, str(target.shards[t]))] += len(group)
+                    if dry_run:
+                        continue
+                    dst = conns[t]
+                    dcur = dst.cursor()
+                    dcur.execute(
+                        f"INSERT IGNORE INTO student ({', '.join(COLS)}) VALUES "
+                        + ", ".join(["(%s, %s, %s, %s)"] * len(group)),
+                        [v for r in group for v in r],
+                    )
+                    dst.commit()
+                    dcur.close()
+                    bad = unmatched(dst, group)
+                    if bad:   # nothing of this batch is deleted from the source
+                        raise RuntimeError(f"{len(bad)} rows missing or different on {target.shards[t]} after "
+                                           f"copying from {here} (first: {bad[0]}); source rows left in place")
+                    cur.execute("DELETE FROM student WHERE ID IN (" + ", ".join(["%s"] * len(group)) + ")",
+                                [r[0] for r in group])
+                    src.commit()
+            cur.close()
+            src.close()
+    finally:
+        for conn in conns.values():
+            conn.close()
+    return moved
+
+def main():
+    ap = argparse.ArgumentParser(description="Move student rows to a new shard layout.")
+    ap.add_argument("--to", required=True, help="new layout: host[:port]/database,...")
+    ap.add_argument("--batch", type=int, default=1000, help="rows read per source query")
+    ap.add_argument("--dry-run", action="store_true", help="only report how many rows would move")
+    ap.add_argument("--create-tables", action="store_true",
+                    help="create student (without constraints) on target shards that lack it")
+    ap.add_argument("--drop-fks", action="store_true",
+                    help="drop the foreign keys referencing student (they would cascade deletes)")
+    ap.add_argument("--config", default="db.properties")
+    args = ap.parse_args()
+
+    cfg = load_db_config(args.config)
+    source, target = Layout(cfg), Layout(cfg, args.to)
+    main_conn = mysql.connector.connect(host=cfg["DB_HOST"], user=cfg["DB_USER"],
+                                        password=cfg["DB_PASS"], database=cfg["DB_NAME"])
+    try:
+        fks = student_fks(main_conn)
+        if fks and not args.dry_run:
+            if not args.drop_fks:
+                ap.error("foreign keys reference student (" + ", ".join(f"{t}.{c}" for t, c in fks)
+                         + "); moving rows would cascade-delete them. Re-run with --drop-fks.")
+            drop_fks(main_conn, fks)
+        if args.create_tables and not args.dry_run:
+            create_tables(main_conn, target)
+    finally:
+        main_conn.close()
+
+    t0 = time.perf_counter()
+    moved = reshard(source, target, args.batch, args.dry_run)
+    verb = "would move" if args.dry_run else "moved"
+    for (src, dst), n in sorted(moved.items()):
+        print(f"{src} -> {dst}: {verb} {n} rows")
+    print(f"{verb} {sum(moved.values())} rows in {time.perf_counter() - t0:.1f}s; "
+          f"set DB_SHARDS={args.to} before restarting the servers")
+
+if __name__ == "__main__":
+    main()
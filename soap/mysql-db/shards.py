@@ -0,0 +1,94 @@
+# shards.py
+# Optional hash sharding of the student table.
+#
+#   DB_SHARDS=host[:port]/database,...   same user/password as DB_HOST
+#
+# A student row lives on shard crc32(ID) % len(shards); everything else
+# (course, section, takes, student_summary, ...) stays in the main database.
+# Single-key operations connect straight to the owning shard; listings run
+# on every shard in parallel and merge the ID-ordered results (keyset pages
+# stay cheap: each shard returns at most `limit` rows after the cursor).
+# NOTE: foreign keys cannot cross databases. A sharded deployment drops the
+# FKs that reference student in the main database (takes, student_summary,
+# advisor) and student -> department on the shards; the servers check
+# student existence themselves where they relied on those FKs
+# (reshard.py --drop-fks / --create-tables does both).
+# Shard connections are pooled like the main database's (db_pool.py);
+# scatter() runs its per-shard queries under the caller's request deadline.
+import functools
+import heapq
+import itertools
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+import deadline
+from db_pool import ConnectionPool
+
+class Shard:
+    def __init__(self, host, port, database):
+        self.host, self.port, self.database = host, port, database
+
+    def __str__(self):
+        return f"{self.host}:{self.port}/{self.database}"
+
+def parse_shards(spec):
+    out = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        addr, sep, database = item.partition("/")
+        if not sep or not database:
+            raise ValueError(f"shard {item!r} must look like host[:port]/database")
+        host, _, port = addr.partition(":")
+        out.append(Shard(host, int(port or 3306), database))
+    return out
+
+def shard_index(key, n):
+    return zlib.crc32(str(key).encode("utf-8")) % n
+
+def merge_by_id(streams, limit=None):
+    """Merge per-shard row lists already ordered by ID (column 0), like ORDER BY ID."""
+    merged = heapq.merge(*streams, key=lambda r: r[0].upper())   # ~ the case-insensitive collation
+    return list(itertools.islice(merged, limit)) if limit else list(merged)
+
+class ShardMap:
+    def __init__(self, cfg, spec=None):
+        self.user, self.password = cfg["DB_USER"], cfg["DB_PASS"]
+        self.shards = parse_shards(cfg.get("DB_SHARDS") if spec is None else spec)
+        self._pool = ThreadPoolExecutor(max_workers=4 * len(self.shards),
+                                        thread_name_prefix="shard") if self.shards else None
+        size = int(cfg.get("DB_POOL_SIZE", 32))
+        self.pools = [ConnectionPool(functools.partial(
+            mysql.connector.connect, host=s.host, port=s.port, user=self.user,
+            password=self.password, database=s.database), size) for s in self.shards]
+
+    def __len__(self):
+        return len(self.shards)
+
+    def index_of(self, key):
+        return shard_index(key, len(self.shards))
+
+    def connect(self, i):
+        return self.pools[i].get()
+
+    def connect_for(self, key):
+        return self.connect(self.index_of(key))
+
+    def scatter(self, fn):
+        """Run fn(conn) on every shard in parallel; returns the results in shard order."""
+        at = deadline.current()
+
+        def run(i):
+            deadline.adopt(at)
+            try:
+                conn = self.connect(i)
+                try:
+                    return fn(conn)
+                finally:
+                    conn.close()
+            finally:
+                deadline.clear()
+        return list(self._pool.map(run, range(len(self.shards))))
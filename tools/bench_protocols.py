@@ -0,0 +1,300 @@
+# bench_protocols.py
+# Microbenchmark: what the protocol stack costs per call, spyne (SOAP 1.1 with
+# lxml validation) vs Flask, with the DB and the micro server stubbed out.
+#
+#   python tools/bench_protocols.py                        (rest + soap, list sizes 10 100 1000 10000)
+#   python tools/bench_protocols.py --flavor soap --sizes 100 5000 --calls 500
+#   python tools/bench_protocols.py --save base.json       (and --compare base.json after a change)
+#
+# Each flavor's main_server is imported in a subprocess of its own (the
+# flavors share module names) and called in-process: Flask through its test
+# client, spyne through its WsgiApplication with a hand-built WSGI environ, so
+# no sockets are involved. The same operations also run as plain function
+# calls ("logic" rows); the difference is the protocol's share of a call:
+# routing, parsing / validation, serialization and the request hooks.
+#
+# Columns: CPU and wall time per call (tracemalloc off); peak KB traced during
+# one call on top of what was live before it; blocks and bytes still allocated
+# per call after a batch (should stay near 0, growth is a leak). tracemalloc
+# only sees allocations made through Python's allocators.
+import argparse
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from wsgiref.util import setup_testing_defaults
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLAVOR_DIRS = {"rest": "rest/mysql-db", "rest-swagger": "rest/mysql-db-swagger", "soap": "soap/mysql-db"}
+DEPTS = ["Comp. Sci.", "Physics", "Biology", "History", "Finance", "Music", None]
+STUDENT_ID = "00000"
+ONBOARD = {"student_id": "B0001", "name": "bench student", "dept_name": "Comp. Sci.",
+           "init_credits": 0, "course_id": "CS-101"}
+TNS = "urn:examples.main"
+PEAK_SAMPLES = 20
+MIN_CALLS = 5
+
+# ---------------------------------------------------
+# Stubs: canned rows instead of MySQL, a fixed rule instead of the micro server
+# ---------------------------------------------------
+TABLES = {
+    "student": [],
+    "course": [("CS-101", "Intro. to Computer Science", "Comp. Sci.", 4)],
+    "prereq": [],
+}
+
+def make_students(n):
+    return [(f"{i:05d}", f"Student Number {i}", DEPTS[i % len(DEPTS)], i % 130) for i in range(max(1, n))]
+
+class StubCursor:
+    def __init__(self):
+        self.rows, self.rowcount = [], 0
+
+    def execute(self, sql, params=()):
+        if sql.lstrip().upper().startswith("SELECT") and " FROM " in sql:
+            self.rows = TABLES.get(sql.split(" FROM ", 1)[1].split()[0], [])
+        else:
+            self.rows = []
+        self.rowcount = len(self.rows) or 1
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+class StubConnection:
+    """Stands in for a db_pool connection: same calls, canned rows, no I/O."""
+    in_transaction = False
+
+    def cursor(self, prepared=False):
+        return StubCursor()
+
+    def query(self, name, params=()):
+        if name == "student_by_id":
+            return TABLES["student"][:1]
+        if name == "course_by_id":
+            return TABLES["course"][:1]
+        if name == "course_credits":
+            return [(c[3],) for c in TABLES["course"][:1]]
+        return []
+
+    def query_one(self, name, params=()):
+        rows = self.query(name, params)
+        return rows[0] if rows else None
+
+    def execute(self, name, params=()):
+        return 1
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def max_execution_time(self, ms):
+        pass
+
+def load_flavor(flavor):
+    """Import the flavor's main_server with its DB and micro calls stubbed."""
+    d = os.path.join(ROOT, FLAVOR_DIRS[flavor])
+    os.chdir(d)   # db.properties is read relative to the server
+    sys.path.insert(0, d)
+    import main_server as ms
+    ms.get_conn = ms.get_read_conn = lambda: StubConnection()
+    ms.get_student_conn = lambda student_id, read=False: StubConnection()
+    ms.SHARDS = ms.ShardMap(ms.DB_CONFIG, spec="")
+    ms.STUDENT_WRITERS = []
+    ms.calc_tuition = lambda credits: 300.0 * int(credits or 0)
+    return ms
+
+# ---------------------------------------------------
+# Operations: (op, path, fn) per flavor
+# ---------------------------------------------------
+def soap_envelope(op, args):
+    body = "".join(f"<tns:{k}>{v}</tns:{k}>" for k, v in args)
+    return (f'<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="{TNS}">'
+            f"<soapenv:Body><tns:{op}>{body}</tns:{op}></soapenv:Body></soapenv:Envelope>").encode()
+
+def wsgi_post(app, body):
+    env = {}
+    setup_testing_defaults(env)
+    env.update({"REQUEST_METHOD": "POST", "PATH_INFO": "/", "CONTENT_TYPE": "text/xml; charset=utf-8",
+                "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body)})
+    status = []
+    out = app(env, lambda s, headers, exc_info=None: status.append(s))
+    try:
+        data = b"".join(out)
+    finally:
+        if hasattr(out, "close"):
+            out.close()
+    return status[0], data
+
+def rest_ops(ms):
+    client = ms.app.test_client()
+
+    def get(path):
+        def call():
+            resp = client.get(path)
+            resp.get_data()
+            return resp.status_code
+        return call
+
+    def onboard():
+        resp = client.post("/task/onboard_student_into_course", json=ONBOARD)
+        resp.get_data()
+        return resp.status_code
+
+    def logic_list():
+        return [{"ID": ID, "name": name, "dept_name": dept_name, "tot_cred": int(tot_cred or 0)}
+                for ID, name, dept_name, tot_cred in ms.list_students_rows()]
+
+    return {
+        "get_student": (get(f"/entity/students/{STUDENT_ID}"),
+                        lambda: ms.get_student_conn(STUDENT_ID, read=True).query_one("student_by_id", (STUDENT_ID,))),
+        "list_students": (get("/entity/students"), logic_list),
+        "onboard": (onboard, lambda: ms._onboard(dict(ONBOARD))),
+    }
+
+def soap_ops(ms):
+    onboard_args = [(k, ONBOARD[k]) for k in ("student_id", "name", "dept_name", "init_credits", "course_id")]
+
+    def post(op, args):
+        body = soap_envelope(op, args)
+        return lambda: wsgi_post(ms.wsgi_app, body)[0].split()[0]
+
+    return {
+        "get_student": (post("get_student", [("ID", STUDENT_ID)]),
+                        lambda: ms.EntityService.get_student(None, STUDENT_ID)),
+        "list_students": (post("list_students", []), lambda: ms.EntityService.list_students(None)),
+        "onboard": (post("onboard_student_into_course", onboard_args),
+                    lambda: ms.TaskService.onboard_student_into_course(None, *[v for _, v in onboard_args])),
+    }
+
+# ---------------------------------------------------
+# Measurement
+# ---------------------------------------------------
+def measure(fn, calls, warmup):
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    c0, t0 = time.process_time(), time.perf_counter()
+    for _ in range(calls):
+        fn()
+    cpu = (time.process_time() - c0) / calls
+    wall = (time.perf_counter() - t0) / calls
+
+    tracemalloc.start()
+    fn()
+    peak = 0
+    for _ in range(min(calls, PEAK_SAMPLES)):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    gc.collect()
+    snap = tracemalloc.take_snapshot().filter_traces(ignore)
+    for _ in range(calls):
+        fn()
+    gc.collect()
+    diff = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(snap, "filename")
+    tracemalloc.stop()
+    return {"calls": calls, "cpu_us": cpu * 1e6, "wall_us": wall * 1e6, "peak_kb": peak / 1024.0,
+            "retained_blocks": sum(d.count_diff for d in diff) / calls,
+            "retained_b": sum(d.size_diff for d in diff) / calls}
+
+def run_flavor(flavor, sizes, calls, warmup):
+    ms = load_flavor(flavor)
+    ops = soap_ops(ms) if flavor == "soap" else rest_ops(ms)
+    protocol = "spyne" if flavor == "soap" else "flask"
+    TABLES["student"] = make_students(1)
+    results = []
+    cases = [("get_student", 1), ("onboard", 1)] + [("list_students", n) for n in sizes]
+    for op, rows in cases:
+        TABLES["student"] = make_students(rows)
+        n = max(MIN_CALLS, calls // max(1, rows // 100))
+        wire, logic = ops[op]
+        status = wire()
+        if str(status) != "200":
+            raise RuntimeError(f"{flavor} {op}: expected status 200, got {status}")
+        name = f"{op}/{rows}" if op == "list_students" else op
+        for path, fn in ((protocol, wire), ("logic", logic)):
+            results.append(dict(measure(fn, n, min(warmup, n)), flavor=flavor, path=path, op=name))
+    return results
+
+# ---------------------------------------------------
+# Report
+# ---------------------------------------------------
+def key(r):
+    return (r["flavor"], r["path"], r["op"])
+
+def report(results, baseline=None):
+    base = {key(r): r for r in baseline or []}
+    logic = {(r["flavor"], r["op"]): r for r in results if r["path"] == "logic"}
+    print(f"{'flavor':<13}{'path':<7}{'operation':<21}{'calls':>7}{'cpu us':>10}{'wall us':>10}"
+          f"{'proto %':>8}{'peak KB':>9}{'ret blk':>9}{'ret B':>9}" + (f"{'cpu vs base':>12}" if base else ""))
+    for r in results:
+        share = "-"
+        if r["path"] != "logic" and (r["flavor"], r["op"]) in logic and r["cpu_us"] > 0:
+            share = f"{100.0 * (r['cpu_us'] - logic[(r['flavor'], r['op'])]['cpu_us']) / r['cpu_us']:.0f}"
+        line = (f"{r['flavor']:<13}{r['path']:<7}{r['op']:<21}{r['calls']:>7}{r['cpu_us']:>10.1f}{r['wall_us']:>10.1f}"
+                f"{share:>8}{r['peak_kb']:>9.1f}{r['retained_blocks']:>9.2f}{r['retained_b']:>9.0f}")
+        if base:
+            b = base.get(key(r))
+            line += f"{100.0 * (r['cpu_us'] / b['cpu_us'] - 1):>+11.1f}%" if b and b["cpu_us"] else f"{'-':>12}"
+        print(line)
+
+def main():
+    ap = argparse.ArgumentParser(description="spyne vs Flask per-call cost, in-process with stubbed DB / micro calls.")
+    ap.add_argument("--flavor", nargs="+", choices=sorted(FLAVOR_DIRS), default=["rest", "soap"])
+    ap.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000], help="list_students row counts")
+    ap.add_argument("--calls", type=int, default=200, help="calls per operation (scaled down for large lists)")
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--save", help="write the results as JSON")
+    ap.add_argument("--compare", help="JSON from an earlier --save: show the CPU change per row")
+    ap.add_argument("--child", help=argparse.SUPPRESS)   # internal: run one flavor, write JSON here
+    args = ap.parse_args()
+
+    if args.child:
+        results = run_flavor(args.flavor[0], args.sizes, args.calls, args.warmup)
+        with open(args.child, "w") as f:
+            json.dump(results, f)
+        return
+
+    results = []
+    for flavor in args.flavor:
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--child", path, "--flavor", flavor,
+                            "--calls", str(args.calls), "--warmup", str(args.warmup),
+                            "--sizes"] + [str(n) for n in args.sizes],
+                           check=True, stdout=subprocess.DEVNULL)
+            with open(path) as f:
+                results.extend(json.load(f))
+        finally:
+            os.remove(path)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# loadtest.py
+# Load generator for the REST and SOAP flavors: weighted operation mix,
+# closed loop (N workers back to back) or open loop (Poisson arrivals at
+# --rate per second), p50/p95/p99 latency and errors per operation.
+#
+#   python tools/loadtest.py --flavor inmem --start --rate 200 --duration 30
+#   python tools/loadtest.py --flavor rest --concurrency 32 --duration 60
+#   python tools/loadtest.py --flavor soap --rate 100 --mix onboard=1,get_student=6,policy=3
+#
+# --start launches the flavor's micro_server.py and main_server.py from this
+# checkout (and stops them afterwards). The in-memory SOAP flavor needs
+# nothing else, so it runs fully offline; the MySQL flavors need a local
+# MySQL with data.sql loaded, as configured in their db.properties.
+#
+# Open-loop latency is measured from each request's scheduled start, so time
+# spent waiting for a free worker counts (no coordinated omission). When the
+# servers cannot keep up, that shows as growing latency, not a lower rate.
+import argparse
+import itertools
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLAVOR_DIRS = {"rest": "rest/mysql-db", "rest-swagger": "rest/mysql-db-swagger",
+               "soap": "soap/mysql-db", "inmem": "soap/in-memory-db"}
+DEFAULT_MIX = {
+    "rest": "onboard=1,get_student=4,get_course=3,list_courses=1,policy=2",
+    "soap": "onboard=1,get_student=4,get_course=3,policy=2",
+    "inmem": "process_order=2,get_order=4,list_customers=1,policy=3",
+}
+SEED_STUDENTS = ["00128", "12345", "19991", "23121", "44553", "45678", "54321", "55739"]   # data.sql
+SEED_COURSES = ["BIO-101", "CS-101", "CS-190", "CS-315", "FIN-201", "HIS-351", "MU-199", "PHY-101"]
+COUNTRIES = ["ID", "MY", "SG", "US", "GB", "DE"]
+ID_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"   # new student IDs: letter + 4 digits
+
+def pct(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(p / 100.0 * len(sorted_vals)))]
+
+def parse_mix(spec):
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+# ---------------------------------------------------
+# Operations per flavor: name -> fn(rng) that raises on failure
+# ---------------------------------------------------
+class Ops:
+    def __init__(self, args):
+        self.args = args
+        self.local = threading.local()
+        # not from --seed: a re-run against the same database must not reuse the IDs it created
+        self.ids = itertools.count(random.SystemRandom().randrange(len(ID_LETTERS) * 10000))
+        self.created = list(SEED_STUDENTS if args.flavor != "inmem" else [])
+        self.lock = threading.Lock()
+
+    def new_student_id(self):
+        n = next(self.ids)
+        return ID_LETTERS[n // 10000 % len(ID_LETTERS)] + f"{n % 10000:04d}"
+
+    def known_student(self, rng):
+        with self.lock:
+            return rng.choice(self.created)
+
+    def table(self):
+        f = self.args.flavor
+        if f.startswith("rest"):
+            return {"onboard": self.rest_onboard, "get_student": self.rest_get_student,
+                    "get_course": self.rest_get_course, "list_courses": self.rest_list_courses,
+                    "policy": self.rest_policy}
+        if f == "soap":
+            return {"onboard": self.soap_onboard, "get_student": self.soap_get_student,
+                    "get_course": self.soap_get_course, "policy": self.soap_policy}
+        return {"process_order": self.inmem_process_order, "get_order": self.inmem_get_order,
+                "list_customers": self.inmem_list_customers, "policy": self.inmem_policy}
+
+    # ---- REST ----
+    def http(self):
+        s = getattr(self.local, "http", None)
+        if s is None:
+            import requests
+            s = self.local.http = requests.Session()
+        return s
+
+    def _check(self, resp):
+        if resp.status_code >= 400:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+        return resp
+
+    def rest_onboard(self, rng):
+        sid = self.new_student_id()
+        r = self._check(self.http().post(f"{self.args.main}/task/onboard_student_into_course", json={
+            "student_id": sid, "name": "load test", "dept_name": None, "init_credits": 0,
+            "course_id": self.args.course}, timeout=self.args.timeout))
+        if not r.json().get("success"):
+            raise RuntimeError(r.json().get("message", "onboarding failed"))
+        with self.lock:
+            self.created.append(sid)
+
+    def rest_get_student(self, rng):
+        self._check(self.http().get(f"{self.args.main}/entity/students/{self.known_student(rng)}",
+                                    timeout=self.args.timeout))
+
+    def rest_get_course(self, rng):
+        self._check(self.http().get(f"{self.args.main}/entity/courses/{rng.choice(SEED_COURSES)}",
+                                    timeout=self.args.timeout))
+
+    def rest_list_courses(self, rng):
+        self._check(self.http().get(f"{self.args.main}/entity/courses", params={"limit": 20},
+                                    timeout=self.args.timeout))
+
+    def rest_policy(self, rng):
+        self._check(self.http().get(f"{self.args.micro}/policy/calc_tuition", params={"credits": rng.randint(0, 24)},
+                                    timeout=self.args.timeout))
+
+    # ---- SOAP (zeep client per thread) ----
+    def zeep(self, which):
+        clients = getattr(self.local, "zeep", None)
+        if clients is None:
+            clients = self.local.zeep = {}
+        if which not in clients:
+            from zeep import Client
+            from zeep.transports import Transport
+            url = self.args.main if which == "main" else self.args.micro
+            clients[which] = Client(wsdl=f"{url}/?wsdl", transport=Transport(timeout=self.args.timeout,
+                                                                             operation_timeout=self.args.timeout))
+        return clients[which].service
+
+    def soap_onboard(self, rng):
+        sid = self.new_student_id()
+        res = self.zeep("main").onboard_student_into_course(sid, "load test", None, 0, self.args.course)
+        if not res.success:
+            raise RuntimeError(res.message)
+        with self.lock:
+            self.created.append(sid)
+
+    def soap_get_student(self, rng):
+        if self.zeep("main").get_student(self.known_student(rng)).ID in ("NOT_FOUND", "ERROR"):
+            raise RuntimeError("student not found")
+
+    def soap_get_course(self, rng):
+        if self.zeep("main").get_course(rng.choice(SEED_COURSES)).course_id in ("NOT_FOUND", "ERROR"):
+            raise RuntimeError("course not found")
+
+    def soap_policy(self, rng):
+        self.zeep("micro").calc_tuition(rng.randint(0, 24))
+
+    def inmem_process_order(self, rng):
+        res = self.zeep("main").process_order(f"customer {rng.randint(1, 50)}", "Widget-Pro", rng.randint(1, 5),
+                                              19.99, rng.choice(COUNTRIES), round(rng.uniform(0.1, 5.0), 2))
+        with self.lock:
+            self.created.append(res.order_id)
+
+    def inmem_get_order(self, rng):
+        with self.lock:
+            oid = rng.choice(self.created) if self.created else 1
+        if self.zeep("main").get_order(oid).id == -1 and self.created:
+            raise RuntimeError("order not found")
+
+    def inmem_list_customers(self, rng):
+        self.zeep("main").list_customers()
+
+    def inmem_policy(self, rng):
+        svc = self.zeep("micro")
+        if rng.random() < 0.5:
+            svc.get_vat_rate(rng.choice(COUNTRIES))
+        else:
+            svc.get_shipping_quote(round(rng.uniform(0.1, 5.0), 2))
+
+# ---------------------------------------------------
+# Local servers (--start)
+# ---------------------------------------------------
+def wait_for_port(port, timeout=30.0):
+    t_end = time.monotonic() + timeout
+    while time.monotonic() < t_end:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"nothing is listening on port {port} after {timeout:.0f}s")
+
+def start_servers(flavor):
+    cwd = os.path.join(ROOT, FLAVOR_DIRS[flavor])
+    procs = []
+    for script, port in (("micro_server.py", 8001), ("main_server.py", 8000)):
+        procs.append(subprocess.Popen([sys.executable, script], cwd=cwd,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        wait_for_port(port)
+    return procs
+
+# ---------------------------------------------------
+# Runner
+# ---------------------------------------------------
+def run(args, ops, mix):
+    names, weights = list(mix), list(mix.values())
+    results = {name: [] for name in names}   # name -> [(latency s, error or None)]
+    lock = threading.Lock()
+    rng = random.Random(args.seed)
+
+    def one(name, scheduled):
+        r = random.Random()
+        try:
+            ops[name](r)
+            err = None
+        except Exception as e:
+            err = type(e).__name__ + ": " + str(e)[:80]
+        with lock:
+            results[name].append((time.perf_counter() - scheduled, err))
+
+    t0 = time.perf_counter()
+    t_end = t0 + args.duration
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        if args.rate > 0:   # open loop
+            next_at = t0
+            while next_at < t_end:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(one, rng.choices(names, weights)[0], next_at)
+                next_at += rng.expovariate(args.rate)
+        else:               # closed loop
+            def worker(seed):
+                wr = random.Random(seed)
+                while time.perf_counter() < t_end:
+                    one(wr.choices(names, weights)[0], time.perf_counter())
+            for i in range(args.concurrency):
+                pool.submit(worker, args.seed + i)
+    return results, time.perf_counter() - t0
+
+def report(results, elapsed):
+    print(f"{'operation':<16}{'count':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    everything = []
+    for name, rows in results.items():
+        lat = sorted(dt * 1000.0 for dt, _ in rows)
+        errors = sum(1 for _, e in rows if e)
+        everything.extend(rows)
+        print(f"{name:<16}{len(rows):>8}{errors:>8}{len(rows) / elapsed:>9.1f}{pct(lat, 50):>9.1f}"
+              f"{pct(lat, 95):>9.1f}{pct(lat, 99):>9.1f}{(lat[-1] if lat else 0):>9.1f}")
+    lat = sorted(dt * 1000.0 for dt, _ in everything)
+    errors = [e for _, e in everything if e]
+    print(f"{'total':<16}{len(everything):>8}{len(errors):>8}{len(everything) / elapsed:>9.1f}{pct(lat, 50):>9.1f}"
+          f"{pct(lat, 95):>9.1f}{pct(lat, 99):>9.1f}{(lat[-1] if lat else 0):>9.1f}")
+    if errors:
+        print("most common errors:")
+        for e, n in sorted(((e, errors.count(e)) for e in set(errors)), key=lambda x: -x[1])[:5]:
+            print(f"  {n:>6}  {e}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test the REST / SOAP flavors.")
+    ap.add_argument("--flavor", choices=sorted(FLAVOR_DIRS), default="inmem")
+    ap.add_argument("--main", default="http://localhost:8000")
+    ap.add_argument("--micro", default="http://localhost:8001")
+    ap.add_argument("--start", action="store_true", help="start the flavor's micro and main servers locally")
+    ap.add_argument("--mix", help="operation weights, e.g. onboard=1,get_student=4 (default per flavor)")
+    ap.add_argument("--concurrency", type=int, default=16, help="workers (closed loop) / max in flight (open loop)")
+    ap.add_argument("--rate", type=float, default=0, help="open loop: arrivals per second (0 = closed loop)")
+    ap.add_argument("--duration", type=float, default=30, help="seconds")
+    ap.add_argument("--warmup", type=float, default=2, help="seconds of closed-loop traffic before measuring")
+    ap.add_argument("--course", default="CS-101", help="course for onboarding (must have no prerequisites)")
+    ap.add_argument("--timeout", type=float, default=10, help="per-request timeout in seconds")
+    ap.add_argument("--seed", type=int, default=2009)
+    args = ap.parse_args()
+
+    ops = Ops(args).table()
+    mix = parse_mix(args.mix or DEFAULT_MIX["rest" if args.flavor.startswith("rest") else args.flavor])
+    unknown = set(mix) - set(ops)
+    if unknown:
+        ap.error(f"unknown operation(s) for {args.flavor}: {', '.join(sorted(unknown))} "
+                 f"(choose from {', '.join(sorted(ops))})")
+
+    procs = start_servers(args.flavor) if args.start else []
+    try:
+        if args.warmup > 0:
+            run(argparse.Namespace(**dict(vars(args), duration=args.warmup, rate=0)), ops, mix)
+        mode = f"open loop {args.rate:g}/s" if args.rate > 0 else "closed loop"
+        print(f"{args.flavor}: {mode}, concurrency {args.concurrency}, {args.duration:g}s, mix {mix}")
+        results, elapsed = run(args, ops, mix)
+        report(results, elapsed)
+    finally:
+        for p in procs:
+            p.terminate()
+            p.wait()
+
+if __name__ == "__main__":
+    main()